@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+"""
+Connection pool benchmark for BookBloom.
+Drives the app in process (httpx ASGI transport) against a temporary copy of
+the sample database and reports requests/second with the pool open versus one
+connection per query.
+
+Usage:
+    python benchmarks/bench_db_pool.py --requests 2000 --concurrency 32
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+import tempfile
+import time
+
+import httpx
+
+# Add bookbloom package to Python path
+BOOKBLOOM_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "bookbloom")
+sys.path.insert(0, BOOKBLOOM_DIR)
+
+# pylint: disable=import-error,wrong-import-position
+from backend.main import app  # noqa: E402
+from backend.database import db  # noqa: E402
+from backend.rate_limit import admission  # noqa: E402
+from scripts.init_db import create_database  # noqa: E402
+
+
+async def run_requests(total: int, concurrency: int) -> float:
+    """Issue `total` catalog/detail requests with `concurrency` workers; return req/s."""
+    paths = iter(f"/api/books/{(i % 10) + 1}" if i % 4 else "/api/books" for i in range(total))
+    transport = httpx.ASGITransport(app=app)
+
+    async def worker(client):
+        for path in paths:
+            response = await client.get(path)
+            response.raise_for_status()
+
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        started = time.perf_counter()
+        await asyncio.gather(*(worker(client) for _ in range(concurrency)))
+        return total / (time.perf_counter() - started)
+
+
+async def bench(total: int, concurrency: int, pool_size: int) -> dict:
+    """Run the workload once per connection strategy.
+
+    Every client shares one address, so rate limits are off for the runs.
+    """
+    results = {}
+    db.pool_size = pool_size
+    enabled, admission.enabled = admission.enabled, False
+    try:
+        results["per-call connections"] = await run_requests(total, concurrency)
+        await db.connect()
+        try:
+            results[f"pool of {pool_size}"] = await run_requests(total, concurrency)
+        finally:
+            await db.disconnect()
+    finally:
+        admission.enabled = enabled
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark pooled vs per-call SQLite connections")
+    parser.add_argument("--requests", type=int, default=2000, help="Requests per run (default: 2000)")
+    parser.add_argument("--concurrency", type=int, default=32, help="Concurrent clients (default: 32)")
+    parser.add_argument("--pool-size", type=int, default=4, help="Pool size (default: 4)")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db.db_path = create_database(os.path.join(tmp, "bookbloom.db"))
+        results = asyncio.run(bench(args.requests, args.concurrency, args.pool_size))
+
+    baseline = next(iter(results.values()))
+    for name, rps in results.items():
+        print(f"{name:<22} {rps:8.1f} req/s  ({rps / baseline:.2f}x)")
+
+
+if __name__ == "__main__":
+    main()
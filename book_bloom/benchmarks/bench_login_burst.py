@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+"""
+Login burst benchmark for BookBloom.
+Fires a burst of concurrent logins while a steady stream of catalog requests
+runs, and reports catalog latency during the burst. `--inline` verifies
+passwords on the event loop (the old behaviour) for comparison.
+
+Usage:
+    python benchmarks/bench_login_burst.py --logins 40
+    python benchmarks/bench_login_burst.py --logins 40 --inline
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+import tempfile
+import time
+
+import httpx
+
+# Add bookbloom package to Python path
+BOOKBLOOM_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "bookbloom")
+sys.path.insert(0, BOOKBLOOM_DIR)
+
+# pylint: disable=import-error,wrong-import-position
+from backend.main import app  # noqa: E402
+from backend.database import db  # noqa: E402
+from backend.rate_limit import admission  # noqa: E402
+from scripts.init_db import create_database  # noqa: E402
+
+EMAIL = "burst@example.com"
+PASSWORD = "burst-password"
+
+
+def percentile(samples, pct):
+    """Nearest-rank percentile of a list of samples."""
+    ordered = sorted(samples)
+    rank = max(0, min(len(ordered) - 1, round(pct / 100 * len(ordered)) - 1))
+    return ordered[rank]
+
+
+async def run_burst(logins: int, catalog_clients: int):
+    """Return (catalog latencies, login wall time) for one burst."""
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=120) as client:
+        await client.post("/api/register", json={
+            "first_name": "Burst", "last_name": "User", "email": EMAIL, "password": PASSWORD,
+        })
+        latencies = []
+        burst_done = asyncio.Event()
+
+        async def browse():
+            while not burst_done.is_set():
+                started = time.perf_counter()
+                response = await client.get("/api/books/1")
+                response.raise_for_status()
+                latencies.append(time.perf_counter() - started)
+                await asyncio.sleep(0.005)
+
+        async def login_burst():
+            started = time.perf_counter()
+            await asyncio.gather(*(
+                client.post("/api/login", json={"email": EMAIL, "password": PASSWORD})
+                for _ in range(logins)
+            ))
+            burst_done.set()
+            return time.perf_counter() - started
+
+        browsers = [asyncio.create_task(browse()) for _ in range(catalog_clients)]
+        burst_seconds = await login_burst()
+        await asyncio.gather(*browsers)
+        return latencies, burst_seconds
+
+
+async def bench(logins: int, catalog_clients: int):
+    """Run the burst with the app lifespan (pool, login slots) active.
+
+    Every client shares one address, so rate limits are off for the run; the
+    login slots (`BOOKBLOOM_LOGIN_CONCURRENCY`) still apply.
+    """
+    enabled, admission.enabled = admission.enabled, False
+    try:
+        async with app.router.lifespan_context(app):
+            return await run_burst(logins, catalog_clients)
+    finally:
+        admission.enabled = enabled
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Catalog latency during a login burst")
+    parser.add_argument("--logins", type=int, default=40, help="Concurrent logins (default: 40)")
+    parser.add_argument("--catalog-clients", type=int, default=4, help="Concurrent catalog readers (default: 4)")
+    parser.add_argument("--inline", action="store_true", help="Verify bcrypt on the event loop (old behaviour)")
+    args = parser.parse_args()
+
+    if args.inline:
+        async def inline_check_password(plain, hashed):
+            return db.verify_password(plain, hashed)
+        db.check_password = inline_check_password
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db.db_path = create_database(os.path.join(tmp, "bookbloom.db"))
+        latencies, burst_seconds = asyncio.run(bench(args.logins, args.catalog_clients))
+
+    mode = "inline bcrypt" if args.inline else "bcrypt worker pool"
+    print(f"{mode}: {args.logins} logins in {burst_seconds:.2f}s")
+    print(f"catalog requests during burst: {len(latencies)}")
+    print(f"catalog latency p50: {percentile(latencies, 50) * 1000:.1f} ms")
+    print(f"catalog latency p99: {percentile(latencies, 99) * 1000:.1f} ms")
+    print(f"catalog latency max: {max(latencies) * 1000:.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
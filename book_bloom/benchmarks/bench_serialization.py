@@ -0,0 +1,153 @@
+#!/usr/bin/env python3
+"""
+Catalog serialization benchmark for BookBloom.
+Seeds a temporary database with a large synthetic catalog, then times encoding
+full listing pages with the old path (a Book model per row, then FastAPI's
+jsonable_encoder), pydantic's TypeAdapter in one pass, and the orjson fast
+path. Finally it walks the whole catalog through GET /api/books in process.
+
+Usage:
+    python benchmarks/bench_serialization.py --books 50000 --page-size 500
+"""
+
+import argparse
+import asyncio
+import os
+import random
+import sqlite3
+import sys
+import tempfile
+import time
+from typing import List
+
+import httpx
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+from pydantic import TypeAdapter
+
+# Add bookbloom package to Python path
+BOOKBLOOM_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "bookbloom")
+sys.path.insert(0, BOOKBLOOM_DIR)
+
+# pylint: disable=import-error,wrong-import-position
+from backend.main import app  # noqa: E402
+from backend.database import db  # noqa: E402
+from backend.models import Book  # noqa: E402
+from backend.serialization import dumps_books  # noqa: E402
+from scripts.init_db import create_database  # noqa: E402
+
+STATES = ("good", "fair", "normal", "like new")
+CATEGORIES = ("Fiction", "Fantasy", "Mystery", "Romance", "Science", "History")
+
+
+def seed_catalog(db_path: str, books: int):
+    """Append `books` synthetic rows to the sample database."""
+    rng = random.Random(42)
+    rows = (
+        (f"Title {rng.randrange(10**9):09d}", f"Author {rng.randrange(5000)}", f"SYN{i:012d}",
+         rng.randrange(1800, 2025), round(rng.uniform(3, 80), 2), rng.choice(CATEGORIES),
+         rng.choice(STATES))
+        for i in range(books)
+    )
+    conn = sqlite3.connect(db_path)
+    with conn:
+        conn.executemany(
+            "INSERT INTO books (title, author, isbn, year_of_release, price, category, state) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?)",
+            rows,
+        )
+    conn.close()
+
+
+def legacy_encode(rows) -> bytes:
+    """The previous path: Book(**row) per row, then jsonable_encoder and json.dumps."""
+    return JSONResponse(jsonable_encoder([Book(**row) for row in rows])).body
+
+
+BOOKS_ADAPTER = TypeAdapter(List[Book])
+
+
+def adapter_encode(rows) -> bytes:
+    """Validate and serialize the page in one pydantic call."""
+    return BOOKS_ADAPTER.dump_json(BOOKS_ADAPTER.validate_python(rows))
+
+
+def time_encoder(encode, pages, repeat: int) -> float:
+    """Return rows encoded per second."""
+    started = time.perf_counter()
+    for _ in range(repeat):
+        for page in pages:
+            encode(page)
+    elapsed = time.perf_counter() - started
+    return sum(len(page) for page in pages) * repeat / elapsed
+
+
+async def walk_catalog(page_size: int) -> tuple:
+    """Follow X-Next-Cursor through the whole catalog; return (rows, seconds, bytes)."""
+    transport = httpx.ASGITransport(app=app)
+    rows = size = 0
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        started = time.perf_counter()
+        params = {"limit": page_size}
+        while True:
+            response = await client.get("/api/books", params=params)
+            response.raise_for_status()
+            rows += len(response.json())
+            size += len(response.content)
+            cursor = response.headers.get("x-next-cursor")
+            if not cursor:
+                break
+            params = {"limit": page_size, "cursor": cursor}
+        return rows, time.perf_counter() - started, size
+
+
+async def fetch_pages(page_size: int, max_pages: int) -> list:
+    """Load listing pages straight from the database layer."""
+    pages, after = [], None
+    for _ in range(max_pages):
+        page, after = await db.get_books_page(page_size, after)
+        pages.append(page)
+        if after is None:
+            break
+    return pages
+
+
+async def bench(page_size: int, repeat: int) -> None:
+    await db.connect()
+    try:
+        pages = await fetch_pages(page_size, max_pages=20)
+        assert legacy_encode(pages[0]) == dumps_books(pages[0]), "fast path changed the output"
+
+        results = {
+            "Book models + jsonable_encoder": time_encoder(legacy_encode, pages, repeat),
+            "TypeAdapter single pass": time_encoder(adapter_encode, pages, repeat),
+            "orjson fast path": time_encoder(dumps_books, pages, repeat),
+        }
+        baseline = next(iter(results.values()))
+        print(f"Encoding {len(pages)} pages of {page_size} rows x{repeat}:")
+        for name, rate in results.items():
+            print(f"  {name:<32} {rate:12,.0f} rows/s  ({rate / baseline:.1f}x)")
+
+        db.invalidate_books()
+        rows, seconds, size = await walk_catalog(page_size)
+        print(f"GET /api/books full walk: {rows:,} rows in {seconds:.2f}s "
+              f"({rows / seconds:,.0f} rows/s, {size / 1e6:.1f} MB)")
+    finally:
+        await db.disconnect()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark catalog listing serialization")
+    parser.add_argument("--books", type=int, default=50000, help="Synthetic books to add (default: 50000)")
+    parser.add_argument("--page-size", type=int, default=500, help="Rows per page (default: 500)")
+    parser.add_argument("--repeat", type=int, default=3, help="Encoding passes (default: 3)")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db.db_path = create_database(os.path.join(tmp, "bookbloom.db"))
+        seed_catalog(db.db_path, args.books)
+        asyncio.run(bench(args.page_size, args.repeat))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+"""
+Cold-start benchmark for BookBloom.
+Starts fresh interpreters that import backend.main and run the app lifespan
+(schema check, connection pool) against a temporary database, and reports
+the median time to ready. `--profile` adds a `python -X importtime` breakdown
+of the slowest imports, grouped by top-level package, plus the cumulative
+cost of the optional modules the app loads lazily (or cannot avoid loading).
+
+Usage:
+    python benchmarks/bench_startup.py --runs 10
+    python benchmarks/bench_startup.py --profile --top 15
+"""
+
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+from collections import defaultdict
+
+BOOKBLOOM_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "bookbloom")
+# Heavy modules to report; the first three are kept off the import path, while
+# email_validator is imported by FastAPI's OpenAPI models (and EmailStr)
+WATCHED_MODULES = ("jose", "passlib", "bcrypt", "email_validator")
+
+# Runs in the child interpreter; prints import and ready times in seconds
+STARTUP_PROBE = """
+import asyncio, sys, time
+started = time.perf_counter()
+sys.path.insert(0, {bookbloom_dir!r})
+from backend.database import db
+from backend.main import app
+imported = time.perf_counter()
+db.db_path = {db_path!r}
+
+async def start():
+    async with app.router.lifespan_context(app):
+        return time.perf_counter()
+
+ready = asyncio.run(start())
+lazy = [name for name in {watched!r} if name in sys.modules]
+print(imported - started, ready - started, ",".join(lazy) or "-")
+"""
+
+
+def measure(db_path: str, runs: int):
+    """Return (import seconds, ready seconds, eagerly imported heavy modules) per run."""
+    probe = STARTUP_PROBE.format(bookbloom_dir=BOOKBLOOM_DIR, db_path=db_path, watched=WATCHED_MODULES)
+    results = []
+    for _ in range(runs):
+        output = subprocess.run([sys.executable, "-c", probe], check=True,
+                                capture_output=True, text=True).stdout.split()
+        results.append((float(output[-3]), float(output[-2]), output[-1]))
+    return results
+
+
+def import_profile(top: int):
+    """Self import time (ms) per top-level package, slowest first, and the
+    cumulative time (ms) of each watched module that was imported."""
+    stderr = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import backend.main"],
+        cwd=BOOKBLOOM_DIR, check=True, capture_output=True, text=True,
+    ).stderr
+    self_times = defaultdict(int)
+    watched = {}
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        name = name.strip()
+        self_times[name.split(".")[0]] += int(self_us)
+        if name in WATCHED_MODULES:
+            watched[name] = int(cumulative_us) / 1000
+    ranked = sorted(self_times.items(), key=lambda item: item[1], reverse=True)
+    return [(package, micros / 1000) for package, micros in ranked[:top]], watched
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure BookBloom cold-start time")
+    parser.add_argument("--runs", type=int, default=10, help="Fresh interpreters to start (default: 10)")
+    parser.add_argument("--profile", action="store_true", help="Show an import-time breakdown")
+    parser.add_argument("--top", type=int, default=12, help="Packages in the breakdown (default: 12)")
+    args = parser.parse_args()
+
+    sys.path.insert(0, BOOKBLOOM_DIR)
+    # pylint: disable=import-error,import-outside-toplevel
+    from scripts.init_db import create_database
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = os.path.join(tmp, "bookbloom.db")
+        create_database(db_path)
+        results = measure(db_path, args.runs)
+
+    import_times = [imported for imported, _, _ in results]
+    ready_times = [ready for _, ready, _ in results]
+    print(f"import backend.main  median {statistics.median(import_times) * 1000:7.1f} ms  "
+          f"min {min(import_times) * 1000:7.1f} ms")
+    print(f"ready (lifespan run) median {statistics.median(ready_times) * 1000:7.1f} ms  "
+          f"min {min(ready_times) * 1000:7.1f} ms")
+    print(f"loaded at startup: {results[0][2]} (jose/passlib/bcrypt load on first use; "
+          f"email_validator is imported by FastAPI)")
+
+    if args.profile:
+        packages, watched = import_profile(args.top)
+        print("\nSelf import time by package:")
+        for package, millis in packages:
+            print(f"  {package:<24} {millis:7.1f} ms")
+        print("\nWatched modules imported at startup (cumulative):")
+        for name in WATCHED_MODULES:
+            cost = f"{watched[name]:7.1f} ms" if name in watched else "    not loaded"
+            print(f"  {name:<24} {cost}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,414 @@
+#!/usr/bin/env python3
+"""
+Load test and performance regression check for BookBloom.
+Seeds a synthetic catalog and user set, then drives the API with concurrent
+httpx clients through four scenarios (catalog browsing, search, a login
+burst and cart add/view/checkout) and reports throughput and p50/p95/p99
+latency per scenario. Results can be saved as a JSON baseline and later runs
+compared against it; the comparison exits non-zero on a regression.
+
+The app runs in process (httpx ASGI transport) against a seeded temporary
+database unless --url points at a running server; seed that server's
+database first with --seed-only --db PATH.
+
+Usage:
+    python benchmarks/load_test.py --books 200000 --save-baseline baseline.json
+    python benchmarks/load_test.py --books 200000 --compare baseline.json
+    python benchmarks/load_test.py --seed-only --db bookbloom/data/bookbloom.db
+    python benchmarks/load_test.py --url http://127.0.0.1:8000 --scenarios browse,search
+"""
+
+import argparse
+import asyncio
+import csv
+import json
+import os
+import platform
+import random
+import sqlite3
+import sys
+import tempfile
+import time
+from dataclasses import dataclass, field
+from typing import Callable, Dict, List, Optional
+
+import httpx
+
+# Add bookbloom package to Python path
+BOOKBLOOM_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "bookbloom")
+sys.path.insert(0, BOOKBLOOM_DIR)
+
+# pylint: disable=import-error,wrong-import-position
+from backend.database import pwd_context  # noqa: E402
+from backend.facets import PRICE_BANDS  # noqa: E402
+from scripts.import_books import VALID_STATES, import_books  # noqa: E402
+from scripts.init_db import create_database  # noqa: E402
+
+PASSWORD = "load-test-password"
+USER_EMAIL = "load{}@example.com"
+CATEGORIES = ("Fiction", "Science", "History", "Fantasy", "Biography", "Poetry", "Travel", "Children")
+WORDS = (
+    "river", "shadow", "garden", "empire", "winter", "silent", "golden", "journey", "ocean",
+    "forest", "memory", "crown", "storm", "letters", "city", "night", "glass", "orchard",
+    "harbor", "mountain", "secret", "paper", "stone", "summer", "kingdom", "light",
+)
+SURNAMES = ("Austen", "Baldwin", "Calvino", "Duras", "Eliot", "Faulkner", "Gaskell", "Hurston",
+            "Ishiguro", "Joyce", "Kafka", "Lessing", "Morrison", "Nabokov", "Orwell", "Pym")
+REGRESSION_TOLERANCE = 0.2
+
+
+def percentile(samples: List[float], pct: float) -> float:
+    """Nearest-rank percentile of a list of samples."""
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    rank = max(0, min(len(ordered) - 1, round(pct / 100 * len(ordered)) - 1))
+    return ordered[rank]
+
+
+# Seeding
+
+def synthetic_books(count: int, seed: int = 42):
+    """Yield `count` reproducible book records for scripts/import_books.py."""
+    rng = random.Random(seed)
+    for number in range(count):
+        yield {
+            "title": " ".join(rng.choice(WORDS).capitalize() for _ in range(rng.randint(2, 4))),
+            "author": f"{rng.choice(WORDS).capitalize()} {rng.choice(SURNAMES)}",
+            "isbn": f"979{number:010d}",
+            "year_of_release": rng.randint(1900, 2024),
+            "price": round(rng.uniform(2, 80), 2),
+            "category": rng.choice(CATEGORIES),
+            "state": rng.choice(sorted(VALID_STATES)),
+        }
+
+
+def seed_database(db_path: str, books: int, users: int, progress=print) -> str:
+    """Create the schema and load `books` synthetic books and `users` users."""
+    create_database(db_path)
+    if books:
+        with tempfile.TemporaryDirectory() as tmp:
+            feed = os.path.join(tmp, "books.csv")
+            with open(feed, "w", newline="", encoding="utf-8") as handle:
+                writer = csv.DictWriter(handle, fieldnames=list(next(synthetic_books(1))))
+                writer.writeheader()
+                writer.writerows(synthetic_books(books))
+            import_books(feed, db_path, progress=lambda line: None)
+        progress(f"Seeded {books:,} synthetic books")
+
+    # Every load-test user shares one bcrypt hash; hashing per user would dominate seeding
+    password_hash = pwd_context.hash(PASSWORD)
+    conn = sqlite3.connect(db_path)
+    try:
+        with conn:
+            conn.executemany(
+                "INSERT OR IGNORE INTO users (first_name, last_name, email, password_hash) VALUES (?, ?, ?, ?)",
+                ((f"Load{number}", "Tester", USER_EMAIL.format(number), password_hash) for number in range(users)),
+            )
+    finally:
+        conn.close()
+    progress(f"Seeded {users:,} users (password: {PASSWORD})")
+    return db_path
+
+
+# Measurement
+
+@dataclass
+class ScenarioResult:
+    """Latencies and failures recorded for one scenario."""
+
+    name: str
+    latencies: List[float] = field(default_factory=list)
+    requests: int = 0
+    errors: int = 0
+    seconds: float = 0.0
+
+    async def timed(self, client: httpx.AsyncClient, method: str, url: str, **kwargs) -> Optional[httpx.Response]:
+        """Issue one request, recording its latency; None if it failed."""
+        self.requests += 1
+        started = time.perf_counter()
+        try:
+            response = await client.request(method, url, **kwargs)
+        except httpx.HTTPError:
+            self.errors += 1
+            return None
+        self.latencies.append(time.perf_counter() - started)
+        if response.status_code >= 400:
+            self.errors += 1
+            return None
+        return response
+
+    def summary(self) -> Dict[str, float]:
+        return {
+            "requests": self.requests,
+            "errors": self.errors,
+            "seconds": round(self.seconds, 3),
+            "throughput_rps": round(self.requests / self.seconds, 1) if self.seconds else 0.0,
+            "p50_ms": round(percentile(self.latencies, 50) * 1000, 2),
+            "p95_ms": round(percentile(self.latencies, 95) * 1000, 2),
+            "p99_ms": round(percentile(self.latencies, 99) * 1000, 2),
+        }
+
+
+@dataclass
+class LoadConfig:
+    """How hard to push each scenario."""
+
+    requests: int = 2000
+    concurrency: int = 32
+    logins: int = 64
+    users: int = 200
+
+
+async def run_workers(result: ScenarioResult, concurrency: int, iterations: int, step: Callable):
+    """Run `step(worker_index, rng)` `iterations` times across `concurrency` workers."""
+    remaining = iter(range(iterations))
+
+    async def worker(index: int):
+        rng = random.Random(index)
+        for _ in remaining:
+            await step(index, rng)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker(index) for index in range(concurrency)))
+    result.seconds = time.perf_counter() - started
+
+
+# Scenarios
+
+async def browse(client: httpx.AsyncClient, config: LoadConfig) -> ScenarioResult:
+    """Catalog mix: first pages, next pages, filtered pages, facets and book details."""
+    result = ScenarioResult("browse")
+    first = await client.get("/api/books", params={"limit": 50})
+    max_id = int(first.headers.get("x-total-count", "10"))
+    cursors = [first.headers["x-next-cursor"]] if "x-next-cursor" in first.headers else []
+    bands = [name for name, _, _ in PRICE_BANDS]
+
+    async def step(_, rng):
+        roll = rng.random()
+        if roll < 0.25:
+            response = await result.timed(client, "GET", "/api/books", params={"limit": 50})
+        elif roll < 0.4 and cursors:
+            response = await result.timed(client, "GET", "/api/books",
+                                          params={"limit": 50, "cursor": rng.choice(cursors)})
+        elif roll < 0.55:
+            response = await result.timed(client, "GET", "/api/books", params={
+                "limit": 50, "category": rng.choice(CATEGORIES), "price_band": rng.choice(bands),
+            })
+        elif roll < 0.65:
+            response = await result.timed(client, "GET", "/api/books/facets")
+        else:
+            response = await result.timed(client, "GET", f"/api/books/{rng.randint(1, max_id)}")
+        if response is not None and "x-next-cursor" in response.headers and len(cursors) < 1000:
+            cursors.append(response.headers["x-next-cursor"])
+
+    await run_workers(result, config.concurrency, config.requests, step)
+    return result
+
+
+async def search(client: httpx.AsyncClient, config: LoadConfig) -> ScenarioResult:
+    """Full-text searches of one or two words, some with a category filter."""
+    result = ScenarioResult("search")
+
+    async def step(_, rng):
+        terms = " ".join(rng.sample(WORDS, rng.randint(1, 2)))
+        params = {"search": terms, "limit": 20}
+        if rng.random() < 0.3:
+            params["category"] = rng.choice(CATEGORIES)
+        await result.timed(client, "GET", "/api/books", params=params)
+
+    await run_workers(result, config.concurrency, config.requests, step)
+    return result
+
+
+async def login_burst(client: httpx.AsyncClient, config: LoadConfig) -> ScenarioResult:
+    """`logins` simultaneous logins by different users."""
+    result = ScenarioResult("login_burst")
+    started = time.perf_counter()
+    await asyncio.gather(*(
+        result.timed(client, "POST", "/api/login", json={
+            "email": USER_EMAIL.format(number % config.users), "password": PASSWORD,
+        })
+        for number in range(config.logins)
+    ))
+    result.seconds = time.perf_counter() - started
+    return result
+
+
+async def cart_checkout(client: httpx.AsyncClient, config: LoadConfig) -> ScenarioResult:
+    """Each worker is a signed-in user adding books, viewing the cart and checking out."""
+    result = ScenarioResult("cart_checkout")
+    shoppers = min(config.concurrency, config.users)
+    # Sign in outside the measured window; logins have their own scenario
+    headers = []
+    for number in range(shoppers):
+        response = await client.post("/api/login", json={"email": USER_EMAIL.format(number), "password": PASSWORD})
+        response.raise_for_status()
+        headers.append({"Authorization": f"Bearer {response.json()['access_token']}"})
+    max_id = int((await client.get("/api/books", params={"limit": 1})).headers.get("x-total-count", "10"))
+
+    async def step(index, rng):
+        auth = headers[index]
+        for _ in range(3):
+            await result.timed(client, "POST", "/api/cart/add", headers=auth,
+                               json={"book_id": rng.randint(1, max_id), "quantity": rng.randint(1, 2)})
+        await result.timed(client, "GET", "/api/cart", headers=auth)
+        await result.timed(client, "POST", "/api/checkout", headers=auth)
+
+    # Five requests per checkout
+    await run_workers(result, shoppers, max(1, config.requests // 5), step)
+    return result
+
+
+SCENARIOS = {
+    "browse": browse,
+    "search": search,
+    "login_burst": login_burst,
+    "cart_checkout": cart_checkout,
+}
+
+
+async def run_scenarios(client: httpx.AsyncClient, names: List[str], config: LoadConfig,
+                        progress=print) -> Dict[str, Dict[str, float]]:
+    """Run the named scenarios one after another; return their summaries."""
+    summaries = {}
+    for name in names:
+        result = await SCENARIOS[name](client, config)
+        summaries[name] = result.summary()
+        progress(format_summary(name, summaries[name]))
+    return summaries
+
+
+async def run_in_process(names: List[str], config: LoadConfig, progress=print,
+                         rate_limit: bool = False) -> Dict[str, Dict[str, float]]:
+    """Drive the app through its lifespan with the ASGI transport.
+
+    Every simulated user shares one client address, so per-client rate limits
+    are off unless `rate_limit` is set.
+    """
+    # pylint: disable=import-outside-toplevel
+    from backend.main import app
+    from backend.rate_limit import admission
+
+    enabled, admission.enabled = admission.enabled, rate_limit
+    try:
+        async with app.router.lifespan_context(app):
+            transport = httpx.ASGITransport(app=app)
+            async with httpx.AsyncClient(transport=transport, base_url="http://load-test", timeout=120) as client:
+                return await run_scenarios(client, names, config, progress)
+    finally:
+        admission.enabled = enabled
+
+
+async def run_against(url: str, names: List[str], config: LoadConfig, progress=print) -> Dict[str, Dict[str, float]]:
+    """Drive a running server over HTTP."""
+    limits = httpx.Limits(max_connections=max(config.concurrency, config.logins))
+    async with httpx.AsyncClient(base_url=url, timeout=120, limits=limits) as client:
+        return await run_scenarios(client, names, config, progress)
+
+
+# Baselines
+
+def format_summary(name: str, summary: Dict[str, float]) -> str:
+    return (f"{name:<14} {summary['requests']:>6} req  {summary['throughput_rps']:>8.1f} req/s  "
+            f"p50 {summary['p50_ms']:>7.1f} ms  p95 {summary['p95_ms']:>7.1f} ms  "
+            f"p99 {summary['p99_ms']:>7.1f} ms  errors {summary['errors']}")
+
+
+def compare_results(baseline: Dict, current: Dict, tolerance: float = REGRESSION_TOLERANCE) -> List[str]:
+    """Describe every scenario that got slower than `baseline` by more than `tolerance`.
+
+    A regression is throughput falling, or p95/p99 latency rising, by more than
+    the tolerance fraction, or errors appearing where the baseline had none.
+    """
+    regressions = []
+    for name, now in current["scenarios"].items():
+        before = baseline["scenarios"].get(name)
+        if before is None:
+            continue
+        if before["throughput_rps"] and now["throughput_rps"] < before["throughput_rps"] * (1 - tolerance):
+            regressions.append(f"{name}: throughput {before['throughput_rps']} -> {now['throughput_rps']} req/s")
+        for key in ("p95_ms", "p99_ms"):
+            if before[key] and now[key] > before[key] * (1 + tolerance):
+                regressions.append(f"{name}: {key} {before[key]} -> {now[key]}")
+        if now["errors"] and not before["errors"]:
+            regressions.append(f"{name}: {now['errors']} errors (baseline had none)")
+    return regressions
+
+
+def build_report(scenarios: Dict[str, Dict[str, float]], config: LoadConfig, target: str, books: int) -> Dict:
+    """Results plus the settings they were measured with."""
+    return {
+        "recorded_at": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        "target": target,
+        "python": platform.python_version(),
+        "cpu_count": os.cpu_count(),
+        "config": {**config.__dict__, "books": books},
+        "scenarios": scenarios,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load test the BookBloom API")
+    parser.add_argument("--url", default=None, help="Running server to test (default: the app in process)")
+    parser.add_argument("--db", default=None, help="Database to seed (default: a temporary file)")
+    parser.add_argument("--seed-only", action="store_true", help="Seed --db and exit")
+    parser.add_argument("--books", type=int, default=100_000, help="Synthetic books to seed (default: 100000)")
+    parser.add_argument("--users", type=int, default=200, help="Synthetic users to seed (default: 200)")
+    parser.add_argument("--scenarios", default=",".join(SCENARIOS),
+                        help=f"Comma-separated subset of: {', '.join(SCENARIOS)}")
+    parser.add_argument("--requests", type=int, default=2000, help="Requests per scenario (default: 2000)")
+    parser.add_argument("--concurrency", type=int, default=32, help="Concurrent clients (default: 32)")
+    parser.add_argument("--logins", type=int, default=64, help="Simultaneous logins in the burst (default: 64)")
+    parser.add_argument("--rate-limit", action="store_true",
+                        help="Keep per-client rate limits on in process (all users share one address)")
+    parser.add_argument("--save-baseline", metavar="PATH", help="Write the results as a JSON baseline")
+    parser.add_argument("--compare", metavar="PATH", help="Compare against a JSON baseline")
+    parser.add_argument("--tolerance", type=float, default=REGRESSION_TOLERANCE,
+                        help="Allowed slowdown before a regression is reported (default: 0.2)")
+    args = parser.parse_args()
+
+    names = [name.strip() for name in args.scenarios.split(",") if name.strip()]
+    unknown = [name for name in names if name not in SCENARIOS]
+    if unknown:
+        parser.error(f"unknown scenarios: {', '.join(unknown)}")
+    if args.seed_only and not args.db:
+        parser.error("--seed-only needs --db")
+    config = LoadConfig(requests=args.requests, concurrency=args.concurrency,
+                        logins=args.logins, users=args.users)
+
+    if args.seed_only:
+        seed_database(args.db, args.books, args.users)
+        return 0
+
+    if args.url:
+        scenarios = asyncio.run(run_against(args.url, names, config))
+        target = args.url
+    else:
+        # pylint: disable=import-outside-toplevel
+        from backend.database import db
+
+        with tempfile.TemporaryDirectory() as tmp:
+            db.db_path = seed_database(args.db or os.path.join(tmp, "bookbloom.db"), args.books, args.users)
+            scenarios = asyncio.run(run_in_process(names, config, rate_limit=args.rate_limit))
+        target = "in-process"
+
+    report = build_report(scenarios, config, target, args.books)
+    if args.save_baseline:
+        with open(args.save_baseline, "w", encoding="utf-8") as handle:
+            json.dump(report, handle, indent=2)
+        print(f"Baseline written to {args.save_baseline}")
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as handle:
+            baseline = json.load(handle)
+        regressions = compare_results(baseline, report, args.tolerance)
+        for line in regressions:
+            print(f"REGRESSION {line}")
+        if regressions:
+            return 1
+        print(f"No regressions against {args.compare} (tolerance {args.tolerance:.0%})")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
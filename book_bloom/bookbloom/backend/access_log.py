@@ -0,0 +1,43 @@
+"""
+Access-log sampling for BookBloom production servers.
+Logging every request costs a formatted line and a write per request; under
+load we keep a sample of successful requests and every error.
+"""
+
+import copy
+import logging
+import random
+
+
+class SampledAccessFilter(logging.Filter):
+    """Pass `rate` of uvicorn access records, plus every 4xx/5xx response."""
+
+    def __init__(self, rate: float = 1.0):
+        super().__init__()
+        self.rate = rate
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if self.rate >= 1.0:
+            return True
+        # uvicorn.access args: (client_addr, method, full_path, http_version, status_code)
+        args = record.args if isinstance(record.args, tuple) else ()
+        if len(args) == 5 and int(args[4]) >= 400:
+            return True
+        return random.random() < self.rate
+
+
+def build_log_config(sample_rate: float) -> dict:
+    """uvicorn's default logging config with the access log sampled at `sample_rate`.
+
+    Passed to uvicorn as `log_config`, so every worker process installs it.
+    """
+    # pylint: disable=import-outside-toplevel
+    from uvicorn.config import LOGGING_CONFIG
+
+    config = copy.deepcopy(LOGGING_CONFIG)
+    config.setdefault("filters", {})["sampled_access"] = {
+        "()": f"{__name__}.SampledAccessFilter",
+        "rate": sample_rate,
+    }
+    config["loggers"]["uvicorn.access"]["filters"] = ["sampled_access"]
+    return config
@@ -3,11 +3,13 @@ Authentication utilities for BookBloom application.
 Handles JWT token creation and validation.
 """
 
+import os
+import time
 from datetime import datetime, timedelta
 from typing import Optional
-from jose import JWTError, jwt
 from fastapi import HTTPException, status, Depends
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
+from .cache import AsyncTTLCache
 from .database import db
 from .models import User
 
@@ -18,8 +20,25 @@ ACCESS_TOKEN_EXPIRE_MINUTES = 30
 
 security = HTTPBearer()
 
+# Verified token -> User. An entry never outlives the token's `exp`, so a cache
+# hit can skip both JWT verification and the user lookup.
+USER_CACHE_TTL = float(os.environ.get("BOOKBLOOM_USER_CACHE_TTL", "60"))
+user_cache = AsyncTTLCache(maxsize=int(os.environ.get("BOOKBLOOM_USER_CACHE_SIZE", "10000")),
+                           ttl=USER_CACHE_TTL)
+
+def evict_token(token: str):
+    """Forget the cached user for a token (e.g. on logout)."""
+    user_cache.invalidate(token)
+
+def evict_user(email: str) -> int:
+    """Forget every cached token of a user after their account changes."""
+    return user_cache.invalidate_where(lambda _token, user: user.email == email)
+
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
     """Create JWT access token."""
+    # python-jose pulls in its crypto backends; import it on first use
+    from jose import jwt  # pylint: disable=import-outside-toplevel
+    
     to_encode = data.copy()
     if expires_delta:
         expire = datetime.utcnow() + expires_delta
@@ -38,8 +57,14 @@ async def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(s
         headers={"WWW-Authenticate": "Bearer"},
     )
     
+    token = credentials.credentials
+    cached_user = user_cache.get(token)
+    if cached_user is not None:
+        return cached_user
+    
+    from jose import JWTError, jwt  # pylint: disable=import-outside-toplevel
+    
     try:
-        token = credentials.credentials
         payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
         email: str = payload.get("sub")
         if email is None:
@@ -51,11 +76,18 @@ async def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(s
     if user_data is None:
         raise credentials_exception
     
-    return User(
+    user = User(
         id=user_data["id"],
         first_name=user_data["first_name"],
         last_name=user_data["last_name"],
         email=user_data["email"],
         social_handle_url=user_data["social_handle_url"],
         created_at=user_data["created_at"]
-    )
\ No newline at end of file
+    )
+    
+    ttl = USER_CACHE_TTL
+    if payload.get("exp") is not None:
+        ttl = min(ttl, payload["exp"] - time.time())
+    if ttl > 0:
+        user_cache.set(token, user, ttl=ttl)
+    return user
\ No newline at end of file
@@ -0,0 +1,138 @@
+"""
+In-process caching for BookBloom.
+Provides an asyncio read-through cache with TTL, LRU eviction and request coalescing.
+"""
+
+import asyncio
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Hashable, Optional, Tuple
+
+_MISSING = object()
+
+
+def _retrieve_exception(task: asyncio.Future):
+    """Keep a failed load quiet when every caller waiting on it was cancelled."""
+    if not task.cancelled():
+        task.exception()
+
+
+class AsyncTTLCache:
+    """Read-through cache for a single event loop.
+
+    - Entries expire `ttl` seconds after they are stored.
+    - At most `maxsize` entries are kept; the least recently used is evicted.
+    - Concurrent misses for the same key share one loader call, which keeps
+      running for the others if the caller that started it is cancelled.
+    - `invalidate`/`clear` also stop in-flight loads from storing stale values.
+    """
+
+    def __init__(self, maxsize: int = 1024, ttl: float = 60.0):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._entries: "OrderedDict[Hashable, Tuple[float, Any]]" = OrderedDict()
+        self._inflight: Dict[Hashable, asyncio.Future] = {}
+        self._generation = 0
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+        self.evictions = 0
+
+    def _lookup(self, key: Hashable) -> Any:
+        entry = self._entries.get(key)
+        if entry is None:
+            return _MISSING
+        expires_at, value = entry
+        if expires_at <= time.monotonic():
+            del self._entries[key]
+            return _MISSING
+        self._entries.move_to_end(key)
+        return value
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        """Return a fresh cached value or `default`, without loading."""
+        value = self._lookup(key)
+        if value is _MISSING:
+            self.misses += 1
+            return default
+        self.hits += 1
+        return value
+
+    def set(self, key: Hashable, value: Any, ttl: Optional[float] = None):
+        """Store a value, evicting least recently used entries beyond maxsize.
+
+        `ttl` shortens (or overrides) the cache-wide TTL for this entry.
+        """
+        expires_in = self.ttl if ttl is None else ttl
+        self._entries[key] = (time.monotonic() + expires_in, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    async def get_or_load(self, key: Hashable, loader: Callable[[], Awaitable[Any]]) -> Any:
+        """Return the cached value for `key`, calling `loader` once on a miss."""
+        value = self._lookup(key)
+        if value is not _MISSING:
+            self.hits += 1
+            return value
+
+        pending = self._inflight.get(key)
+        if pending is not None:
+            self.coalesced += 1
+            return await asyncio.shield(pending)
+
+        self.misses += 1
+        # The load runs in its own task so that cancelling the caller that
+        # started it (a client disconnect) does not fail everyone sharing it
+        task = asyncio.ensure_future(self._load(key, loader, self._generation))
+        task.add_done_callback(_retrieve_exception)
+        self._inflight[key] = task
+        return await asyncio.shield(task)
+
+    async def _load(self, key: Hashable, loader: Callable[[], Awaitable[Any]], generation: int) -> Any:
+        try:
+            value = await loader()
+        finally:
+            if self._inflight.get(key) is asyncio.current_task():
+                del self._inflight[key]
+        if generation == self._generation:
+            self.set(key, value)
+        return value
+
+    def invalidate(self, key: Hashable):
+        """Drop one key."""
+        self._entries.pop(key, None)
+        self._inflight.pop(key, None)
+        self._generation += 1
+
+    def invalidate_where(self, predicate: Callable[[Hashable, Any], bool]) -> int:
+        """Drop every entry whose (key, value) matches; return how many were dropped."""
+        doomed = [key for key, (_, value) in self._entries.items() if predicate(key, value)]
+        for key in doomed:
+            del self._entries[key]
+        self._generation += 1
+        return len(doomed)
+
+    def clear(self):
+        """Drop every entry."""
+        self._entries.clear()
+        self._inflight.clear()
+        self._generation += 1
+
+    def stats(self) -> Dict[str, Any]:
+        """Counters for sizing the cache."""
+        lookups = self.hits + self.misses + self.coalesced
+        return {
+            "size": len(self._entries),
+            "maxsize": self.maxsize,
+            "ttl_seconds": self.ttl,
+            "hits": self.hits,
+            "misses": self.misses,
+            "coalesced": self.coalesced,
+            "evictions": self.evictions,
+            "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+        }
+
+    def __len__(self) -> int:
+        return len(self._entries)
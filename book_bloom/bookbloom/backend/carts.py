@@ -0,0 +1,267 @@
+"""
+Cart storage for BookBloom.
+Keeps carts outside the web process so they survive restarts and are shared
+by every uvicorn worker. SQLite is the default backend; a Redis-compatible
+backend is available for deployments that already run Redis.
+"""
+
+import json
+import os
+from abc import ABC, abstractmethod
+from collections import defaultdict
+from typing import Any, Dict, List, Optional, Tuple
+
+from .database import Database, db
+
+CART_BACKEND = os.environ.get("BOOKBLOOM_CART_BACKEND", "sqlite")
+REDIS_URL = os.environ.get("BOOKBLOOM_REDIS_URL", "redis://localhost:6379/0")
+
+# One row per (user, book); the upsert adds to the quantity in a single statement
+# so concurrent adds from different workers never lose an update.
+UPSERT_CART_ITEM = """
+    INSERT INTO cart_items (user_id, book_id, quantity) VALUES (?, ?, ?)
+    ON CONFLICT(user_id, book_id) DO UPDATE SET quantity = quantity + excluded.quantity
+    RETURNING quantity
+"""
+UPDATE_CART_QUANTITY = "UPDATE cart_items SET quantity = ? WHERE user_id = ? AND book_id = ?"
+DELETE_CART_ITEM = "DELETE FROM cart_items WHERE user_id = ? AND book_id = ?"
+# Ordered lines are bound as a JSON array of [book_id, quantity] pairs. Lines
+# ordered in full are deleted first, as quantities must stay positive.
+DELETE_FULLY_ORDERED_CART_ITEMS = """
+    DELETE FROM cart_items
+    WHERE user_id = ? AND quantity <= (
+        SELECT json_extract(line.value, '$[1]') FROM json_each(?) AS line
+        WHERE json_extract(line.value, '$[0]') = cart_items.book_id
+    )
+"""
+SUBTRACT_CART_QUANTITIES = """
+    UPDATE cart_items SET quantity = cart_items.quantity - json_extract(line.value, '$[1]')
+    FROM json_each(?) AS line
+    WHERE cart_items.user_id = ? AND cart_items.book_id = json_extract(line.value, '$[0]')
+"""
+CLEAR_CART = "DELETE FROM cart_items WHERE user_id = ?"
+SELECT_CART = "SELECT book_id, quantity FROM cart_items WHERE user_id = ? ORDER BY rowid"
+
+# HSET only if the field exists, in one server-side step, so a line removed
+# concurrently (delete, checkout) is not written back
+SET_EXISTING_FIELD_SCRIPT = """
+if redis.call('HEXISTS', KEYS[1], ARGV[1]) == 1 then
+    redis.call('HSET', KEYS[1], ARGV[1], ARGV[2])
+    return 1
+end
+return 0
+"""
+# Take ordered quantities off their lines, dropping lines that reach zero, in
+# one server-side step; returns the lines left over as [field, quantity, ...]
+SUBTRACT_FIELDS_SCRIPT = """
+local left = {}
+for i = 1, #ARGV, 2 do
+    if redis.call('HEXISTS', KEYS[1], ARGV[i]) == 1 then
+        local quantity = redis.call('HINCRBY', KEYS[1], ARGV[i], -tonumber(ARGV[i + 1]))
+        if quantity <= 0 then
+            redis.call('HDEL', KEYS[1], ARGV[i])
+        else
+            table.insert(left, ARGV[i])
+            table.insert(left, quantity)
+        end
+    end
+end
+return left
+"""
+
+CartLines = List[Tuple[int, int]]
+
+
+class CartStore(ABC):
+    """Interface shared by the cart backends.
+
+    Carts are lists of `(book_id, quantity)` pairs in the order books were added.
+    """
+
+    # True if carts live in the BookBloom database, so checkout can empty them
+    # in the order transaction
+    in_database = False
+
+    @abstractmethod
+    async def add(self, user_id: int, book_id: int, quantity: int) -> int:
+        """Add `quantity` copies of a book, creating the line if needed; return the new quantity."""
+
+    @abstractmethod
+    async def set_quantity(self, user_id: int, book_id: int, quantity: int) -> bool:
+        """Set the quantity of an existing line; False if the book is not in the cart."""
+
+    @abstractmethod
+    async def remove(self, user_id: int, book_id: int) -> bool:
+        """Remove a line; False if the book was not in the cart."""
+
+    @abstractmethod
+    async def remove_ordered(self, user_id: int, lines: CartLines) -> CartLines:
+        """Take ordered quantities off the cart; return the lines that keep some.
+
+        A line whose quantity was raised while checking out keeps the difference.
+        """
+
+    @abstractmethod
+    async def items(self, user_id: int) -> CartLines:
+        """Return the user's cart lines."""
+
+    @abstractmethod
+    async def clear(self, user_id: int):
+        """Empty the user's cart."""
+
+
+class SQLiteCartStore(CartStore):
+    """Carts in the `cart_items` table of the BookBloom database."""
+
+    in_database = True
+
+    def __init__(self, database: Database):
+        self.database = database
+
+    async def _write(self, sql: str, params: tuple) -> int:
+        async with self.database.connection() as conn:
+            cursor = await conn.execute(sql, params)
+            await conn.commit()
+            return cursor.rowcount
+
+    async def add(self, user_id: int, book_id: int, quantity: int) -> int:
+        async with self.database.connection() as conn:
+            async with conn.execute(UPSERT_CART_ITEM, (user_id, book_id, quantity)) as cursor:
+                (new_quantity,) = await cursor.fetchone()
+            await conn.commit()
+        return new_quantity
+
+    async def set_quantity(self, user_id: int, book_id: int, quantity: int) -> bool:
+        return await self._write(UPDATE_CART_QUANTITY, (quantity, user_id, book_id)) > 0
+
+    async def remove(self, user_id: int, book_id: int) -> bool:
+        return await self._write(DELETE_CART_ITEM, (user_id, book_id)) > 0
+
+    async def remove_ordered(self, user_id: int, lines: CartLines) -> CartLines:
+        book_ids = [book_id for book_id, _ in lines]
+        async with self.database.connection() as conn:
+            await conn.execute("BEGIN IMMEDIATE")
+            await conn.execute(DELETE_FULLY_ORDERED_CART_ITEMS, (user_id, json.dumps(lines)))
+            await conn.execute(SUBTRACT_CART_QUANTITIES, (json.dumps(lines), user_id))
+            async with conn.execute(SELECT_CART, (user_id,)) as cursor:
+                left = [(book_id, quantity) for book_id, quantity in await cursor.fetchall()
+                        if book_id in book_ids]
+            await conn.commit()
+        return left
+
+    async def items(self, user_id: int) -> CartLines:
+        async with self.database.connection() as conn:
+            async with conn.execute(SELECT_CART, (user_id,)) as cursor:
+                return [(book_id, quantity) for book_id, quantity in await cursor.fetchall()]
+
+    async def clear(self, user_id: int):
+        await self._write(CLEAR_CART, (user_id,))
+
+
+class RedisCartStore(CartStore):
+    """Carts as Redis hashes (`bookbloom:cart:<user_id>` -> book_id: quantity).
+
+    Works with any client exposing the asyncio `redis` commands used here
+    (`hincrby`, `eval`, `hdel`, `hgetall`, `delete`). Adds use HINCRBY, and
+    quantity updates and checkout removals Lua scripts, so all are atomic on
+    the server.
+    """
+
+    def __init__(self, client: Any, prefix: str = "bookbloom:cart:"):
+        self.client = client
+        self.prefix = prefix
+
+    def _key(self, user_id: int) -> str:
+        return f"{self.prefix}{user_id}"
+
+    async def add(self, user_id: int, book_id: int, quantity: int) -> int:
+        return int(await self.client.hincrby(self._key(user_id), str(book_id), quantity))
+
+    async def set_quantity(self, user_id: int, book_id: int, quantity: int) -> bool:
+        updated = await self.client.eval(
+            SET_EXISTING_FIELD_SCRIPT, 1, self._key(user_id), str(book_id), quantity
+        )
+        return int(updated) == 1
+
+    async def remove(self, user_id: int, book_id: int) -> bool:
+        return await self.client.hdel(self._key(user_id), str(book_id)) > 0
+
+    async def remove_ordered(self, user_id: int, lines: CartLines) -> CartLines:
+        if not lines:
+            return []
+        args = [value for book_id, quantity in lines for value in (str(book_id), quantity)]
+        left = await self.client.eval(SUBTRACT_FIELDS_SCRIPT, 1, self._key(user_id), *args)
+        return [(int(book_id), int(quantity)) for book_id, quantity in zip(left[::2], left[1::2])]
+
+    async def items(self, user_id: int) -> CartLines:
+        lines = await self.client.hgetall(self._key(user_id))
+        # Clients without decode_responses return bytes; int() accepts both
+        return [(int(book_id), int(quantity)) for book_id, quantity in lines.items()]
+
+    async def clear(self, user_id: int):
+        await self.client.delete(self._key(user_id))
+
+
+class LocalRedis:
+    """In-process stand-in for the Redis commands RedisCartStore uses.
+
+    Handy for tests and single-process development; it is not shared between
+    workers. `eval` only knows the scripts RedisCartStore sends.
+    """
+
+    def __init__(self):
+        self._hashes: Dict[str, Dict[str, int]] = defaultdict(dict)
+
+    async def hincrby(self, key: str, field: str, amount: int = 1) -> int:
+        value = self._hashes[key].get(field, 0) + amount
+        self._hashes[key][field] = value
+        return value
+
+    async def eval(self, script: str, numkeys: int, *keys_and_args) -> Any:
+        if script not in (SET_EXISTING_FIELD_SCRIPT, SUBTRACT_FIELDS_SCRIPT) or numkeys != 1:
+            raise NotImplementedError("LocalRedis only runs RedisCartStore's scripts")
+        key, *args = keys_and_args
+        fields_of_key = self._hashes.get(key, {})
+        if script == SET_EXISTING_FIELD_SCRIPT:
+            field, value = args
+            if field not in fields_of_key:
+                return 0
+            fields_of_key[field] = int(value)
+            return 1
+        left: List[Any] = []
+        for field, amount in zip(args[::2], args[1::2]):
+            if field not in fields_of_key:
+                continue
+            fields_of_key[field] -= int(amount)
+            if fields_of_key[field] <= 0:
+                del fields_of_key[field]
+            else:
+                left.extend((field, fields_of_key[field]))
+        return left
+
+    async def hdel(self, key: str, *fields: str) -> int:
+        fields_of_key = self._hashes.get(key, {})
+        return sum(fields_of_key.pop(field, None) is not None for field in fields)
+
+    async def hgetall(self, key: str) -> Dict[str, int]:
+        return dict(self._hashes.get(key, {}))
+
+    async def delete(self, *keys: str) -> int:
+        return sum(self._hashes.pop(key, None) is not None for key in keys)
+
+
+def create_cart_store(backend: Optional[str] = None, database: Database = db) -> CartStore:
+    """Build the configured cart store (`BOOKBLOOM_CART_BACKEND`: sqlite, redis or local)."""
+    backend = backend or CART_BACKEND
+    if backend == "sqlite":
+        return SQLiteCartStore(database)
+    if backend == "local":
+        return RedisCartStore(LocalRedis())
+    if backend == "redis":
+        try:
+            # pylint: disable=import-outside-toplevel
+            from redis import asyncio as redis_asyncio
+        except ImportError as exc:
+            raise RuntimeError("BOOKBLOOM_CART_BACKEND=redis requires the 'redis' package") from exc
+        return RedisCartStore(redis_asyncio.from_url(REDIS_URL))
+    raise ValueError(f"Unknown cart backend: {backend}")
@@ -0,0 +1,140 @@
+"""
+Response compression for BookBloom.
+Compresses JSON and text API responses with brotli (when installed) or gzip,
+picked from Accept-Encoding. Static assets are not compressed per request;
+they are precompressed by scripts/precompress_static.py and served by
+CachedStaticFiles.
+"""
+
+import gzip
+import os
+from typing import Iterable, Optional, Tuple
+
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+try:
+    import brotli
+except ImportError:  # brotli is optional; gzip is always available
+    brotli = None
+
+# Responses smaller than this are sent as-is: compression would save little
+MIN_COMPRESS_SIZE = int(os.environ.get("BOOKBLOOM_COMPRESS_MIN_SIZE", "1024"))
+# Per-request levels favour speed; precompressed assets use the maximum levels
+GZIP_LEVEL = 6
+BROTLI_QUALITY = 4
+
+COMPRESSIBLE_TYPES = ("application/json", "text/", "application/javascript", "image/svg+xml")
+# Sent chunk by chunk as produced; buffering would hold events back
+STREAMING_TYPES = ("text/event-stream",)
+
+
+def available_encodings() -> Tuple[str, ...]:
+    """Content codings this process can produce, best first."""
+    return ("br", "gzip") if brotli is not None else ("gzip",)
+
+
+def choose_encoding(accept_encoding: str, offered: Iterable[str]) -> Optional[str]:
+    """Pick the offered coding the client prefers (highest q, then offer order)."""
+    weights = {}
+    for part in accept_encoding.lower().split(","):
+        coding, _, params = part.strip().partition(";")
+        quality = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                quality = float(params[2:])
+            except ValueError:
+                quality = 0.0
+        if coding:
+            weights[coding] = quality
+    best, best_quality = None, 0.0
+    for coding in offered:
+        quality = weights.get(coding, weights.get("*", 0.0))
+        if quality > best_quality:
+            best, best_quality = coding, quality
+    return best
+
+
+def compress(body: bytes, encoding: str) -> bytes:
+    """Compress `body` with a per-request level."""
+    if encoding == "br":
+        return brotli.compress(body, quality=BROTLI_QUALITY)
+    return gzip.compress(body, compresslevel=GZIP_LEVEL, mtime=0)
+
+
+def is_compressible(content_type: str) -> bool:
+    return content_type.startswith(COMPRESSIBLE_TYPES)
+
+
+class CompressionMiddleware:
+    """ASGI middleware compressing buffered responses above `minimum_size`.
+
+    Skips paths under `exclude_paths`, responses that already have a
+    Content-Encoding, non-text content types and event streams (which are
+    forwarded unbuffered). ETags of compressed responses become weak, since
+    the bytes differ from the identity encoding.
+    """
+
+    def __init__(self, app: ASGIApp, minimum_size: int = MIN_COMPRESS_SIZE,
+                 exclude_paths: Tuple[str, ...] = ("/static",)):
+        self.app = app
+        self.minimum_size = minimum_size
+        self.exclude_paths = exclude_paths
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http" or scope["path"].startswith(self.exclude_paths):
+            await self.app(scope, receive, send)
+            return
+        encoding = choose_encoding(
+            Headers(scope=scope).get("accept-encoding", ""), available_encodings()
+        )
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+
+        start: Optional[Message] = None
+        chunks = []
+        streaming = False
+
+        async def send_compressed(message: Message):
+            nonlocal start, streaming
+            if message["type"] == "http.response.start":
+                content_type = Headers(raw=message["headers"]).get("content-type", "")
+                if content_type.startswith(STREAMING_TYPES):
+                    streaming = True
+                    await send(message)
+                else:
+                    start = message
+                return
+            if streaming or message["type"] != "http.response.body":
+                await send(message)
+                return
+            chunks.append(message.get("body", b""))
+            if message.get("more_body", False):
+                return
+            await self._finish(start, b"".join(chunks), encoding, send)
+
+        await self.app(scope, receive, send_compressed)
+
+    async def _finish(self, start: Message, body: bytes, encoding: str, send: Send):
+        headers = MutableHeaders(raw=start["headers"])
+        if (
+            start["status"] in (204, 304)
+            or "content-encoding" in headers
+            or len(body) < self.minimum_size
+            or not is_compressible(headers.get("content-type", ""))
+        ):
+            await send(start)
+            await send({"type": "http.response.body", "body": body})
+            return
+
+        body = compress(body, encoding)
+        headers["Content-Encoding"] = encoding
+        headers["Content-Length"] = str(len(body))
+        headers.add_vary_header("Accept-Encoding")
+        etag = headers.get("etag")
+        if etag and not etag.startswith("W/"):
+            headers["ETag"] = f"W/{etag}"
+        await send(start)
+        await send({"type": "http.response.body", "body": body})
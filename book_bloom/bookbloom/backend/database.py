@@ -4,124 +4,575 @@ Handles SQLite database interactions using aiosqlite.
 """
 
 import aiosqlite
+import asyncio
+import json
 import os
-from typing import List, Optional, Dict, Any
+import re
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import asynccontextmanager
+from typing import List, Optional, Dict, Any, AsyncIterator, Tuple
 from decimal import Decimal
 from datetime import datetime
-from passlib.context import CryptContext
 import warnings
 
+from .cache import AsyncTTLCache
+from .facets import BookFilter
+from .metrics import record_query
+
 # Suppress bcrypt version warnings for compatibility
 warnings.filterwarnings("ignore", message=".*bcrypt version.*")
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+
+class LazyCryptContext:
+    """passlib CryptContext built (and passlib/bcrypt imported) on first use.
+
+    Keeps the import off the startup path of workers that never hash.
+    """
+
+    def __init__(self, **settings):
+        self._settings = settings
+        self._context = None
+
+    def __getattr__(self, name):
+        if self._context is None:
+            # pylint: disable=import-outside-toplevel
+            from passlib.context import CryptContext
+            self._context = CryptContext(**self._settings)
+        return getattr(self._context, name)
+
+
+pwd_context = LazyCryptContext(schemes=["bcrypt"], deprecated="auto")
+
+# bcrypt releases the GIL, so hashing in a thread pool sized to the cores keeps
+# the event loop free and still uses every core.
+PASSWORD_WORKERS = int(os.environ.get("BOOKBLOOM_PASSWORD_WORKERS", str(os.cpu_count() or 1)))
+password_executor = ThreadPoolExecutor(
+    max_workers=PASSWORD_WORKERS, thread_name_prefix="bookbloom-bcrypt"
+)
+
+# Applied to every pooled connection when it is opened.
+CONNECTION_PRAGMAS = (
+    "PRAGMA journal_mode=WAL",
+    "PRAGMA synchronous=NORMAL",
+    "PRAGMA mmap_size=268435456",
+    "PRAGMA cache_size=-16000",
+    "PRAGMA temp_store=MEMORY",
+    "PRAGMA busy_timeout=5000",
+    "PRAGMA foreign_keys=ON",
+)
+
+# sqlite3 keeps an LRU of prepared statements per connection keyed on the SQL
+# text, so long-lived connections plus constant query strings reuse them.
+STATEMENT_CACHE_SIZE = 256
+
+DEFAULT_POOL_SIZE = int(os.environ.get("BOOKBLOOM_DB_POOL_SIZE", "4"))
+
+# Book rows change rarely, so reads go through in-process caches
+BOOK_CACHE_TTL = float(os.environ.get("BOOKBLOOM_BOOK_CACHE_TTL", "60"))
+BOOK_CACHE_SIZE = int(os.environ.get("BOOKBLOOM_BOOK_CACHE_SIZE", "10000"))
+LISTING_CACHE_SIZE = int(os.environ.get("BOOKBLOOM_LISTING_CACHE_SIZE", "256"))
+# How long a worker trusts its copy of the catalog version before re-reading it;
+# bounds how stale listings and ETags can be after another worker writes.
+CATALOG_VERSION_TTL = float(os.environ.get("BOOKBLOOM_CATALOG_VERSION_TTL", "1"))
+
+BOOK_COLUMN_NAMES = ("id", "title", "author", "isbn", "year_of_release", "price", "category", "state")
+BOOK_COLUMNS = ", ".join(BOOK_COLUMN_NAMES)
+USER_COLUMNS = "id, first_name, last_name, email, password_hash, social_handle_url, created_at"
+
+# Listing/search templates; {filters} takes " AND ..." conditions from a BookFilter
+SELECT_BOOKS = f"SELECT {BOOK_COLUMNS} FROM books WHERE 1{{filters}} ORDER BY title"
+SEARCH_BOOKS = f"""
+    SELECT {BOOK_COLUMNS}
+    FROM books
+    WHERE (LOWER(title) LIKE LOWER(?) OR LOWER(author) LIKE LOWER(?)){{filters}}
+    ORDER BY title
+"""
+# Ranked full-text search over the books_fts index (see scripts/init_db.py).
+# Title matches weigh twice as much as author matches in the bm25 ranking.
+FTS_SEARCH_BOOKS = """
+    SELECT b.id, b.title, b.author, b.isbn, b.year_of_release, b.price, b.category, b.state
+    FROM books_fts
+    JOIN books b ON b.id = books_fts.rowid
+    WHERE books_fts MATCH ?{filters}
+    ORDER BY bm25(books_fts, 2.0, 1.0), b.title
+    LIMIT ?
+"""
+HAS_FTS_INDEX = "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'books_fts'"
+MAX_SEARCH_RESULTS = 200
+
+# Cheap O(log n) upper bound on the row count; exact unless books were deleted.
+# MIN and MAX sit in separate subqueries: SQLite only reads a single end of the
+# index when the aggregate is alone in its query, otherwise it scans the table.
+ESTIMATE_BOOK_COUNT = "SELECT COALESCE((SELECT MAX(id) FROM books) - (SELECT MIN(id) FROM books) + 1, 0)"
+
+SELECT_BOOK_BY_ID = f"SELECT {BOOK_COLUMNS} FROM books WHERE id = ?"
+# One statement for any number of ids: the id list is bound as a JSON array.
+SELECT_BOOKS_BY_IDS = f"SELECT {BOOK_COLUMNS} FROM books WHERE id IN (SELECT value FROM json_each(?))"
+SELECT_FACETS = "SELECT facet, value, count FROM book_facets ORDER BY facet, count DESC, value"
+SELECT_CATALOG_VERSION = "SELECT version, updated_at FROM catalog_version WHERE id = 1"
+SELECT_USER_BY_EMAIL = f"SELECT {USER_COLUMNS} FROM users WHERE email = ?"
+SELECT_USER_BY_ID = f"SELECT {USER_COLUMNS} FROM users WHERE id = ?"
+INSERT_USER = """
+    INSERT INTO users (first_name, last_name, email, password_hash, social_handle_url)
+    VALUES (?, ?, ?, ?, ?)
+"""
+
+
+def _and(conditions: List[str]) -> str:
+    """Render extra WHERE conditions for the {filters} slot of a query template."""
+    return "".join(f" AND {condition}" for condition in conditions)
+
+
+def build_fts_query(search: str) -> Optional[str]:
+    """Turn free text into an FTS5 query: every word must match as a prefix."""
+    terms = re.findall(r"\w+", search.lower())
+    if not terms:
+        return None
+    return " ".join(f'"{term}"*' for term in terms)
+
+
+async def open_connection(db_path: str) -> aiosqlite.Connection:
+    """Open a connection with the BookBloom PRAGMAs applied."""
+    conn = await aiosqlite.connect(db_path, cached_statements=STATEMENT_CACHE_SIZE)
+    for pragma in CONNECTION_PRAGMAS:
+        await conn.execute(pragma)
+    return conn
+
+
+class _TimedStatement:
+    """A pending aiosqlite statement that reports its duration to the metrics.
+
+    Awaiting it times the execute call; `async with` also covers the fetches
+    made inside the block.
+    """
+
+    __slots__ = ("_pending", "_started")
+
+    def __init__(self, pending):
+        self._pending = pending
+        self._started = 0.0
+
+    def __await__(self):
+        started = time.perf_counter()
+        try:
+            return (yield from self._pending.__await__())
+        finally:
+            record_query(time.perf_counter() - started)
+
+    async def __aenter__(self):
+        self._started = time.perf_counter()
+        try:
+            return await self._pending.__aenter__()
+        except BaseException:
+            record_query(time.perf_counter() - self._started)
+            raise
+
+    async def __aexit__(self, exc_type, exc, tb):
+        try:
+            return await self._pending.__aexit__(exc_type, exc, tb)
+        finally:
+            record_query(time.perf_counter() - self._started)
+
+
+class InstrumentedConnection:
+    """Connection wrapper counting and timing statements for /metrics."""
+
+    __slots__ = ("_conn",)
+
+    def __init__(self, conn: aiosqlite.Connection):
+        self._conn = conn
+
+    def execute(self, sql: str, parameters=None) -> _TimedStatement:
+        return _TimedStatement(self._conn.execute(sql, parameters))
+
+    def executemany(self, sql: str, parameters) -> _TimedStatement:
+        return _TimedStatement(self._conn.executemany(sql, parameters))
+
+    async def commit(self):
+        started = time.perf_counter()
+        try:
+            await self._conn.commit()
+        finally:
+            record_query(time.perf_counter() - started)
+
+    def __getattr__(self, name):
+        return getattr(self._conn, name)
+
+
+class ConnectionPool:
+    """Bounded set of persistent aiosqlite connections.
+
+    Connections are opened once (each owns one worker thread) and handed out
+    through a queue, so callers wait for a free connection instead of opening
+    the file again.
+    """
+
+    def __init__(self, db_path: str, size: int = DEFAULT_POOL_SIZE):
+        if size < 1:
+            raise ValueError("Pool size must be at least 1")
+        self.db_path = db_path
+        self.size = size
+        self._connections: List[aiosqlite.Connection] = []
+        self._idle: Optional[asyncio.Queue] = None
+
+    @property
+    def is_open(self) -> bool:
+        return self._idle is not None
+
+    async def open(self):
+        """Open all connections in the pool."""
+        if self.is_open:
+            return
+        idle: asyncio.Queue = asyncio.Queue()
+        try:
+            for _ in range(self.size):
+                conn = await open_connection(self.db_path)
+                self._connections.append(conn)
+                idle.put_nowait(conn)
+        except Exception:
+            await self.close()
+            raise
+        self._idle = idle
+
+    async def close(self):
+        """Close every connection in the pool."""
+        connections, self._connections = self._connections, []
+        self._idle = None
+        for conn in connections:
+            await conn.close()
+
+    @asynccontextmanager
+    async def acquire(self) -> AsyncIterator[aiosqlite.Connection]:
+        """Borrow a connection; it is returned to the pool on exit."""
+        idle = self._idle
+        conn = await idle.get()
+        try:
+            yield conn
+        finally:
+            if conn.in_transaction:
+                # Never hand out a connection with a half-finished transaction.
+                await conn.rollback()
+            idle.put_nowait(conn)
+
 
 class Database:
-    def __init__(self, db_path: str = None):
+    def __init__(self, db_path: str = None, pool_size: int = DEFAULT_POOL_SIZE):
         if db_path is None:
             # Default to data/bookbloom.db relative to project root
             project_root = os.path.dirname(os.path.dirname(__file__))
             self.db_path = os.path.join(project_root, 'data', 'bookbloom.db')
         else:
             self.db_path = db_path
-    
+        self.pool_size = pool_size
+        self.pool: Optional[ConnectionPool] = None
+        self._has_fts: Optional[bool] = None
+        # Cached values are shared between callers and must be treated as read-only
+        self.book_cache = AsyncTTLCache(BOOK_CACHE_SIZE, BOOK_CACHE_TTL)
+        self.listing_cache = AsyncTTLCache(LISTING_CACHE_SIZE, BOOK_CACHE_TTL)
+        self.version_cache = AsyncTTLCache(1, CATALOG_VERSION_TTL)
+        # Last catalog version read; book_cache holds rows as of this version
+        self._catalog_version: Optional[int] = None
+
+    async def connect(self):
+        """Open the connection pool (called from the app lifespan)."""
+        if self.pool is None or not self.pool.is_open:
+            self.invalidate_books()
+            self._catalog_version = None
+            self._has_fts = None
+            self.pool = ConnectionPool(self.db_path, self.pool_size)
+            await self.pool.open()
+
+    async def disconnect(self):
+        """Close the connection pool."""
+        if self.pool is not None:
+            await self.pool.close()
+            self.pool = None
+
+    @asynccontextmanager
+    async def connection(self) -> AsyncIterator[InstrumentedConnection]:
+        """Yield a pooled connection, or a one-off connection if no pool is open.
+
+        Statements run through it are counted and timed against the current
+        request (see backend/metrics.py).
+        """
+        if self.pool is not None and self.pool.is_open:
+            async with self.pool.acquire() as conn:
+                yield InstrumentedConnection(conn)
+        else:
+            conn = await open_connection(self.db_path)
+            try:
+                yield InstrumentedConnection(conn)
+            finally:
+                await conn.close()
+
     async def get_connection(self):
-        """Get database connection."""
+        """Get a new standalone database connection."""
         return aiosqlite.connect(self.db_path)
+
+    # Cache invalidation hooks
+    def invalidate_books(self, book_ids: Optional[List[int]] = None):
+        """Forget cached books after a write.
+
+        Pass the IDs that changed, or nothing to drop every cached book. Cached
+        listings, searches, counts and the catalog version are always dropped
+        since any book write can change them.
+        """
+        if book_ids is None:
+            self.book_cache.clear()
+        else:
+            for book_id in book_ids:
+                self.book_cache.invalidate(book_id)
+        self.listing_cache.clear()
+        self.version_cache.clear()
+
+    def cache_stats(self) -> Dict[str, Dict[str, Any]]:
+        """Hit/miss counters for the book caches."""
+        return {
+            "books": self.book_cache.stats(),
+            "listings": self.listing_cache.stats(),
+            "catalog_version": self.version_cache.stats(),
+        }
+
+    async def get_catalog_version(self) -> Tuple[int, int]:
+        """Return (version, unix time of the last change) of the book catalog.
+
+        Triggers bump the version on every book write, in any process. Listing
+        cache keys include it, and reading a new version drops the book cache,
+        so a write by another worker or script is picked up once this worker
+        re-reads the version (every CATALOG_VERSION_TTL seconds).
+        """
+        return await self.version_cache.get_or_load("catalog", self._query_catalog_version)
+    
+    async def _query_catalog_version(self) -> Tuple[int, int]:
+        async with self.connection() as db:
+            async with db.execute(SELECT_CATALOG_VERSION) as cursor:
+                row = await cursor.fetchone()
+        version, updated_at = (row[0], row[1]) if row else (0, 0)
+        if version != self._catalog_version:
+            # Books changed outside this worker; cached rows may be stale
+            if self._catalog_version is not None:
+                self.book_cache.clear()
+            self._catalog_version = version
+        return version, updated_at
     
     # Book operations
-    async def get_books(self, search: Optional[str] = None) -> List[Dict[str, Any]]:
-        """Get all books or search by title/author."""
-        async with await self.get_connection() as db:
+    async def get_books(self, search: Optional[str] = None,
+                        limit: int = MAX_SEARCH_RESULTS,
+                        book_filter: BookFilter = BookFilter()) -> List[Dict[str, Any]]:
+        """Get all books or search by title/author.
+
+        Searches use the FTS5 index (ranked, word-prefix matching) when it
+        exists and fall back to a LIKE scan on databases created without it.
+        Search results are capped at `limit` (at most MAX_SEARCH_RESULTS) and
+        narrowed by `book_filter`.
+        """
+        version, _ = await self.get_catalog_version()
+        return await self.listing_cache.get_or_load(
+            ("search", version, search, limit, book_filter),
+            lambda: self._query_books(search, limit, book_filter),
+        )
+    
+    async def _query_books(self, search: Optional[str], limit: int,
+                           book_filter: BookFilter) -> List[Dict[str, Any]]:
+        async with self.connection() as db:
             if search:
-                query = """
-                    SELECT id, title, author, isbn, year_of_release, price, category, state 
-                    FROM books 
-                    WHERE LOWER(title) LIKE LOWER(?) OR LOWER(author) LIKE LOWER(?)
-                    ORDER BY title
-                """
-                search_term = f"%{search}%"
-                cursor = await db.execute(query, (search_term, search_term))
+                if self._has_fts is None:
+                    async with db.execute(HAS_FTS_INDEX) as cursor:
+                        self._has_fts = await cursor.fetchone() is not None
+                fts_query = build_fts_query(search) if self._has_fts else None
+                if fts_query:
+                    conditions, filter_params = book_filter.where("b")
+                    query = FTS_SEARCH_BOOKS.format(filters=_and(conditions))
+                    params = (fts_query, *filter_params, min(limit, MAX_SEARCH_RESULTS))
+                elif self._has_fts:
+                    return []
+                else:
+                    search_term = f"%{search}%"
+                    conditions, filter_params = book_filter.where()
+                    query = SEARCH_BOOKS.format(filters=_and(conditions))
+                    params = (search_term, search_term, *filter_params)
             else:
-                query = """
-                    SELECT id, title, author, isbn, year_of_release, price, category, state 
-                    FROM books 
-                    ORDER BY title
-                """
-                cursor = await db.execute(query)
-            
-            rows = await cursor.fetchall()
-            columns = [description[0] for description in cursor.description]
+                conditions, filter_params = book_filter.where()
+                query, params = SELECT_BOOKS.format(filters=_and(conditions)), tuple(filter_params)
+            async with db.execute(query, params) as cursor:
+                rows = await cursor.fetchall()
+                columns = [description[0] for description in cursor.description]
             return [dict(zip(columns, row)) for row in rows]
     
+    async def get_books_page(
+        self,
+        limit: int,
+        after: Optional[Tuple[str, int]] = None,
+        fields: Optional[List[str]] = None,
+        book_filter: BookFilter = BookFilter(),
+    ) -> Tuple[List[Dict[str, Any]], Optional[Tuple[str, int]]]:
+        """Get one page of books ordered by (title, id) using keyset pagination.
+
+        Returns the rows (projected to `fields` if given) and the sort key to
+        pass as `after` for the next page, or None on the last page. A page is
+        a seek on idx_books_title, or on the (filter, title, id) index of a
+        category, state, price band or single-year filter, so cost does not grow
+        with depth. Open price or year ranges sort their matches by title on
+        every page (see BookFilter).
+        """
+        version, _ = await self.get_catalog_version()
+        key = ("page", version, limit, after, tuple(fields) if fields else None, book_filter)
+        return await self.listing_cache.get_or_load(
+            key, lambda: self._query_books_page(limit, after, fields, book_filter)
+        )
+    
+    async def _query_books_page(
+        self,
+        limit: int,
+        after: Optional[Tuple[str, int]],
+        fields: Optional[List[str]],
+        book_filter: BookFilter,
+    ) -> Tuple[List[Dict[str, Any]], Optional[Tuple[str, int]]]:
+        columns = list(fields or BOOK_COLUMN_NAMES)
+        unknown = set(columns) - set(BOOK_COLUMN_NAMES)
+        if unknown:
+            raise ValueError(f"Unknown book columns: {sorted(unknown)}")
+        select = ", ".join(dict.fromkeys(["id", "title", *columns]))
+        
+        conditions, params = book_filter.where()
+        if after is not None:
+            conditions.append("(title, id) > (?, ?)")
+            params += [after[0], after[1]]
+        where = f" WHERE {' AND '.join(conditions)}" if conditions else ""
+        query = f"SELECT {select} FROM books{where} ORDER BY title, id LIMIT ?"
+        params = (*params, limit + 1)
+        
+        async with self.connection() as db:
+            async with db.execute(query, params) as cursor:
+                rows = await cursor.fetchall()
+                names = [description[0] for description in cursor.description]
+        
+        records = [dict(zip(names, row)) for row in rows[:limit]]
+        next_after = None
+        if len(rows) > limit:
+            next_after = (records[-1]["title"], records[-1]["id"])
+        return [{col: record[col] for col in columns} for record in records], next_after
+    
+    async def get_facets(self) -> Dict[str, List[Dict[str, Any]]]:
+        """Book counts per category, state and price band, largest first.
+
+        Reads the trigger-maintained book_facets table: one small query no
+        matter how large the catalog is.
+        """
+        version, _ = await self.get_catalog_version()
+        return await self.listing_cache.get_or_load(("facets", version), self._query_facets)
+    
+    async def _query_facets(self) -> Dict[str, List[Dict[str, Any]]]:
+        facets: Dict[str, List[Dict[str, Any]]] = {}
+        async with self.connection() as db:
+            async with db.execute(SELECT_FACETS) as cursor:
+                async for facet, value, count in cursor:
+                    facets.setdefault(facet, []).append({"value": value, "count": count})
+        return facets
+    
+    async def estimate_book_count(self) -> int:
+        """Estimate the number of books without scanning the table."""
+        version, _ = await self.get_catalog_version()
+        return await self.listing_cache.get_or_load(("count", version), self._query_book_count)
+    
+    async def _query_book_count(self) -> int:
+        async with self.connection() as db:
+            async with db.execute(ESTIMATE_BOOK_COUNT) as cursor:
+                row = await cursor.fetchone()
+        return int(row[0])
+    
     async def get_book_by_id(self, book_id: int) -> Optional[Dict[str, Any]]:
         """Get a single book by ID."""
-        async with await self.get_connection() as db:
-            query = """
-                SELECT id, title, author, isbn, year_of_release, price, category, state 
-                FROM books 
-                WHERE id = ?
-            """
-            cursor = await db.execute(query, (book_id,))
-            row = await cursor.fetchone()
-            
-            if row:
-                columns = [description[0] for description in cursor.description]
-                return dict(zip(columns, row))
+        await self.get_catalog_version()  # drops cached books if the catalog moved
+        return await self.book_cache.get_or_load(book_id, lambda: self._query_book_by_id(book_id))
+    
+    async def _query_book_by_id(self, book_id: int) -> Optional[Dict[str, Any]]:
+        async with self.connection() as db:
+            async with db.execute(SELECT_BOOK_BY_ID, (book_id,)) as cursor:
+                row = await cursor.fetchone()
+                if row:
+                    columns = [description[0] for description in cursor.description]
+                    return dict(zip(columns, row))
             return None
     
+    async def get_books_by_ids(self, book_ids: List[int]) -> Dict[int, Dict[str, Any]]:
+        """Get many books in a single query, keyed by ID (unknown IDs are omitted).
+
+        Cached books are served from the book cache; only the rest are queried.
+        """
+        await self.get_catalog_version()  # drops cached books if the catalog moved
+        found: Dict[int, Dict[str, Any]] = {}
+        missing = []
+        for book_id in dict.fromkeys(book_ids):
+            book = self.book_cache.get(book_id)
+            if book is not None:
+                found[book_id] = book
+            else:
+                missing.append(book_id)
+        if not missing:
+            return found
+        
+        async with self.connection() as db:
+            async with db.execute(SELECT_BOOKS_BY_IDS, (json.dumps(missing),)) as cursor:
+                rows = await cursor.fetchall()
+                columns = [description[0] for description in cursor.description]
+        for row in rows:
+            book = dict(zip(columns, row))
+            self.book_cache.set(book["id"], book)
+            found[book["id"]] = book
+        return {book_id: found[book_id] for book_id in dict.fromkeys(book_ids) if book_id in found}
+    
     # User operations
     async def create_user(self, first_name: str, last_name: str, email: str, 
                          password: str, social_handle_url: Optional[str] = None) -> Dict[str, Any]:
         """Create a new user."""
-        password_hash = pwd_context.hash(password)
+        password_hash = await self.hash_password(password)
         
-        async with await self.get_connection() as db:
-            query = """
-                INSERT INTO users (first_name, last_name, email, password_hash, social_handle_url)
-                VALUES (?, ?, ?, ?, ?)
-            """
-            cursor = await db.execute(query, (first_name, last_name, email, password_hash, social_handle_url))
+        async with self.connection() as db:
+            cursor = await db.execute(
+                INSERT_USER, (first_name, last_name, email, password_hash, social_handle_url)
+            )
             await db.commit()
             
             user_id = cursor.lastrowid
-            return await self.get_user_by_id(user_id)
+        return await self.get_user_by_id(user_id)
     
     async def get_user_by_email(self, email: str) -> Optional[Dict[str, Any]]:
         """Get user by email."""
-        async with await self.get_connection() as db:
-            query = """
-                SELECT id, first_name, last_name, email, password_hash, social_handle_url, created_at
-                FROM users 
-                WHERE email = ?
-            """
-            cursor = await db.execute(query, (email,))
-            row = await cursor.fetchone()
-            
-            if row:
-                columns = [description[0] for description in cursor.description]
-                return dict(zip(columns, row))
+        async with self.connection() as db:
+            async with db.execute(SELECT_USER_BY_EMAIL, (email,)) as cursor:
+                row = await cursor.fetchone()
+                if row:
+                    columns = [description[0] for description in cursor.description]
+                    return dict(zip(columns, row))
             return None
     
     async def get_user_by_id(self, user_id: int) -> Optional[Dict[str, Any]]:
         """Get user by ID."""
-        async with await self.get_connection() as db:
-            query = """
-                SELECT id, first_name, last_name, email, password_hash, social_handle_url, created_at
-                FROM users 
-                WHERE id = ?
-            """
-            cursor = await db.execute(query, (user_id,))
-            row = await cursor.fetchone()
-            
-            if row:
-                columns = [description[0] for description in cursor.description]
-                return dict(zip(columns, row))
+        async with self.connection() as db:
+            async with db.execute(SELECT_USER_BY_ID, (user_id,)) as cursor:
+                row = await cursor.fetchone()
+                if row:
+                    columns = [description[0] for description in cursor.description]
+                    return dict(zip(columns, row))
             return None
     
     def verify_password(self, plain_password: str, hashed_password: str) -> bool:
         """Verify password against hash."""
         return pwd_context.verify(plain_password, hashed_password)
+    
+    async def hash_password(self, password: str) -> str:
+        """Hash a password on the bcrypt worker pool."""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(password_executor, pwd_context.hash, password)
+    
+    async def check_password(self, plain_password: str, hashed_password: str) -> bool:
+        """Verify a password on the bcrypt worker pool without blocking the event loop."""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            password_executor, self.verify_password, plain_password, hashed_password
+        )
 
 # Global database instance
 db = Database()
\ No newline at end of file
@@ -0,0 +1,245 @@
+"""
+Live updates for BookBloom.
+An in-process pub/sub hub fans events out to per-user topics, and
+GET /api/events streams them as server-sent events. Cart mutations publish
+the changed line, so open pages apply it instead of refetching the cart; a
+watcher publishes catalog changes (from any worker or a bulk import). Each
+worker has its own hub, so a stream only sees events published by its worker;
+the mutation responses carry the same deltas for the tab that made them.
+"""
+
+import asyncio
+import os
+from collections import defaultdict
+from typing import Any, AsyncIterator, Dict, Iterable, Optional, Set
+
+from .serialization import book_payload, decimal_text, dumps
+
+# Events a slow stream may fall behind by before it is told to resync
+EVENT_QUEUE_SIZE = int(os.environ.get("BOOKBLOOM_EVENT_QUEUE_SIZE", "64"))
+# Comment line sent on idle streams so proxies keep them open
+HEARTBEAT_SECONDS = float(os.environ.get("BOOKBLOOM_EVENT_HEARTBEAT", "15"))
+# Streams end after this long and the client reconnects; bounds how long a
+# draining worker waits for open streams on shutdown
+STREAM_MAX_AGE = float(os.environ.get("BOOKBLOOM_EVENT_STREAM_MAX_AGE", "300"))
+# How often the catalog version is checked while anyone is listening
+CATALOG_POLL_SECONDS = float(os.environ.get("BOOKBLOOM_CATALOG_POLL_INTERVAL", "2"))
+# Client reconnect delay sent with every stream (SSE `retry:` field)
+RECONNECT_MILLISECONDS = 3000
+
+CATALOG_TOPIC = "catalog"
+RESYNC = {"type": "resync"}
+
+Event = Dict[str, Any]
+
+
+def user_topic(user_id: int) -> str:
+    """Topic carrying one user's cart events."""
+    return f"user:{user_id}"
+
+
+# Cart deltas carry absolute state, so applying one twice (from the mutation
+# response and from the stream) is harmless.
+def cart_set_event(book: Dict[str, Any], quantity: int) -> Event:
+    """A cart line now holds `quantity` copies; `item` matches a GET /api/cart entry."""
+    return {
+        "type": "cart",
+        "op": "set",
+        "book_id": book["id"],
+        "quantity": quantity,
+        "item": {
+            "book": book_payload(book),
+            "quantity": quantity,
+            "subtotal": decimal_text(float(book.get("price") or 0) * quantity),
+        },
+    }
+
+
+def cart_remove_event(book_ids: Iterable[int]) -> Event:
+    """These lines are no longer in the cart."""
+    return {"type": "cart", "op": "remove", "book_ids": list(book_ids)}
+
+
+class Subscription:
+    """One stream's bounded event queue, subscribed to one or more topics."""
+
+    def __init__(self, hub: "EventHub", topics: Iterable[str], maxsize: int):
+        self.hub = hub
+        self.topics = tuple(topics)
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize)
+        self.closed = False
+        self.ending = False
+
+    def deliver(self, event: Optional[Event]) -> bool:
+        """Queue an event (None closes the stream); False if the queue overflowed."""
+        if self.ending:
+            return True
+        if event is None:
+            # The stream must end even if its reader is behind, so the backlog
+            # makes way for the sentinel and later events are ignored
+            self.ending = True
+            self._drain()
+            self.queue.put_nowait(None)
+            return True
+        try:
+            self.queue.put_nowait(event)
+            return True
+        except asyncio.QueueFull:
+            # Deltas were lost: replace the backlog with one resync request
+            self._drain()
+            self.queue.put_nowait(RESYNC)
+            return False
+
+    def _drain(self):
+        while not self.queue.empty():
+            self.queue.get_nowait()
+
+    async def get(self, timeout: Optional[float] = None) -> Optional[Event]:
+        """Next event; raises asyncio.TimeoutError after `timeout` seconds."""
+        return await asyncio.wait_for(self.queue.get(), timeout)
+
+    def close(self):
+        self.hub.unsubscribe(self)
+
+    def __enter__(self) -> "Subscription":
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+class EventHub:
+    """In-process publish/subscribe over named topics."""
+
+    def __init__(self, queue_size: int = EVENT_QUEUE_SIZE):
+        self.queue_size = queue_size
+        self._topics: Dict[str, Set[Subscription]] = defaultdict(set)
+        self.published = 0
+        self.delivered = 0
+        self.overflows = 0
+
+    def subscribe(self, *topics: str) -> Subscription:
+        """Start receiving events for `topics`; use as a context manager."""
+        subscription = Subscription(self, topics, self.queue_size)
+        for topic in subscription.topics:
+            self._topics[topic].add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription):
+        subscription.closed = True
+        for topic in subscription.topics:
+            subscribers = self._topics.get(topic)
+            if subscribers is not None:
+                subscribers.discard(subscription)
+                if not subscribers:
+                    del self._topics[topic]
+
+    def has_subscribers(self, topic: str) -> bool:
+        return bool(self._topics.get(topic))
+
+    def publish(self, topic: str, event: Event) -> int:
+        """Send an event to every subscriber of `topic`; return how many got it."""
+        self.published += 1
+        subscribers = self._topics.get(topic, ())
+        for subscription in subscribers:
+            if not subscription.deliver(event):
+                self.overflows += 1
+        self.delivered += len(subscribers)
+        return len(subscribers)
+
+    def close_all(self):
+        """End every open stream (app shutdown)."""
+        for subscription in {sub for subs in self._topics.values() for sub in subs}:
+            subscription.deliver(None)
+
+    @property
+    def subscriptions(self) -> int:
+        return len({sub for subs in self._topics.values() for sub in subs})
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "subscriptions": self.subscriptions,
+            "published": self.published,
+            "delivered": self.delivered,
+            "overflows": self.overflows,
+        }
+
+
+def format_sse(event: Event) -> bytes:
+    """Encode an event as one SSE message (`event:` is the event's type)."""
+    return b"event: %s\ndata: %s\n\n" % (event.get("type", "message").encode(), dumps(event))
+
+
+async def event_stream(subscription: Subscription, heartbeat: float = HEARTBEAT_SECONDS,
+                       max_age: float = STREAM_MAX_AGE) -> AsyncIterator[bytes]:
+    """SSE body for a subscription; unsubscribes when the client goes away."""
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + max_age
+    try:
+        yield f"retry: {RECONNECT_MILLISECONDS}\n\n".encode()
+        while True:
+            remaining = deadline - loop.time()
+            if remaining <= 0:
+                return
+            try:
+                event = await subscription.get(min(heartbeat, remaining))
+            except asyncio.TimeoutError:
+                yield b": keep-alive\n\n"
+                continue
+            if event is None:
+                return
+            yield format_sse(event)
+    finally:
+        subscription.close()
+
+
+class CatalogWatcher:
+    """Publishes a `catalog` event whenever the catalog version changes.
+
+    The version is bumped by triggers on every book write, in any process, so
+    this also catches other workers and bulk imports. It is only read while
+    some stream is subscribed to the catalog topic.
+    """
+
+    def __init__(self, hub: EventHub, read_version, interval: float = CATALOG_POLL_SECONDS):
+        self.hub = hub
+        self.read_version = read_version
+        self.interval = interval
+        self._task: Optional[asyncio.Task] = None
+        self._version: Optional[int] = None
+
+    async def start(self):
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def check(self):
+        """Read the version once and publish if it moved since the last read."""
+        version, updated_at = await self.read_version()
+        if self._version is not None and version != self._version:
+            self.hub.publish(CATALOG_TOPIC, {"type": "catalog", "version": version, "updated_at": updated_at})
+        self._version = version
+
+    async def _run(self):
+        while True:
+            await asyncio.sleep(self.interval)
+            if not self.hub.has_subscribers(CATALOG_TOPIC):
+                # Nobody listening; re-read from scratch when someone subscribes
+                self._version = None
+                continue
+            try:
+                await self.check()
+            except Exception:  # pylint: disable=broad-except
+                # A failed read (e.g. database busy) is retried next interval
+                continue
+
+
+hub = EventHub()
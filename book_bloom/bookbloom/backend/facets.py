@@ -0,0 +1,87 @@
+"""
+Catalog facets for BookBloom.
+Defines the price bands and facet names shared by the schema (count table and
+triggers in scripts/init_db.py) and the API, and the filters /api/books
+accepts.
+"""
+
+from dataclasses import dataclass
+from typing import List, Optional, Tuple
+
+# (name, inclusive lower bound, exclusive upper bound); None means unbounded
+PRICE_BANDS: Tuple[Tuple[str, Optional[float], Optional[float]], ...] = (
+    ("under-10", None, 10.0),
+    ("10-20", 10.0, 20.0),
+    ("20-50", 20.0, 50.0),
+    ("50-plus", 50.0, None),
+)
+
+# Facets counted in the book_facets table
+FACETS = ("category", "state", "price")
+
+
+def price_band_sql(column: str) -> str:
+    """SQL CASE expression mapping a price column to its PRICE_BANDS name (NULL if unpriced)."""
+    branches = " ".join(
+        f"WHEN {column} < {upper} THEN '{name}'" for name, _, upper in PRICE_BANDS if upper is not None
+    )
+    return f"CASE WHEN {column} IS NULL THEN NULL {branches} ELSE '{PRICE_BANDS[-1][0]}' END"
+
+
+def facet_value_sql(facet: str, row: str) -> str:
+    """SQL expression for a facet's value on a books row (`new.`, `old.` or `books.`)."""
+    if facet == "price":
+        return price_band_sql(f"{row}.price")
+    return f"{row}.{facet}"
+
+
+@dataclass(frozen=True)
+class BookFilter:
+    """Indexed filters for catalog listings. Price upper bounds are exclusive.
+
+    `category`, `state`, `price_band` and a single year (`year_min ==
+    year_max`) are equality seeks on a (filter, title, id) index, so keyset
+    pages stay cheap at any depth. Open price and year ranges must sort their
+    matches by title on every page.
+    """
+
+    category: Optional[str] = None
+    state: Optional[str] = None
+    price_band: Optional[str] = None
+    price_min: Optional[float] = None
+    price_max: Optional[float] = None
+    year_min: Optional[int] = None
+    year_max: Optional[int] = None
+
+    @classmethod
+    def from_params(cls, category=None, state=None, price_band=None, price_min=None,
+                    price_max=None, year_min=None, year_max=None) -> "BookFilter":
+        """Build a filter from query parameters; `price_band` replaces the price bounds."""
+        if price_band is not None:
+            if price_band not in {name for name, _, _ in PRICE_BANDS}:
+                raise ValueError(f"Unknown price band: {price_band}")
+            price_min = price_max = None
+        return cls(category, state, price_band, price_min, price_max, year_min, year_max)
+
+    def __bool__(self) -> bool:
+        return any(value is not None for value in self.__dict__.values())
+
+    def where(self, alias: str = "") -> Tuple[List[str], List]:
+        """SQL conditions (ANDed) and their parameters; `alias` prefixes columns."""
+        prefix = f"{alias}." if alias else ""
+        conditions, params = [], []
+        single_year = self.year_min is not None and self.year_min == self.year_max
+        for column, operator, value in (
+            ("category", "=", self.category),
+            ("state", "=", self.state),
+            ("price_band", "=", self.price_band),
+            ("price", ">=", self.price_min),
+            ("price", "<", self.price_max),
+            ("year_of_release", "=", self.year_min if single_year else None),
+            ("year_of_release", ">=", None if single_year else self.year_min),
+            ("year_of_release", "<=", None if single_year else self.year_max),
+        ):
+            if value is not None:
+                conditions.append(f"{prefix}{column} {operator} ?")
+                params.append(value)
+        return conditions, params
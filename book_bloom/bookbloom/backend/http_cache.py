@@ -0,0 +1,151 @@
+"""
+HTTP caching helpers for BookBloom.
+Catalog responses carry strong ETags and Last-Modified derived from the
+catalog version, so clients revalidate with a 304 instead of re-downloading.
+Static assets get content-fingerprinted URLs that can be cached for a year.
+"""
+
+import hashlib
+import mimetypes
+import os
+import re
+from functools import cached_property
+from email.utils import formatdate, parsedate_to_datetime
+from typing import Dict, Optional
+
+from fastapi import Request, Response
+from fastapi.responses import FileResponse
+from fastapi.staticfiles import StaticFiles
+from starlette.datastructures import Headers
+from starlette.staticfiles import NotModifiedResponse
+
+from .compression import choose_encoding
+
+# API responses may be stored but must be revalidated; a 304 costs no body
+API_CACHE_CONTROL = "no-cache"
+# Fingerprinted URLs change whenever the file does, so they never go stale
+IMMUTABLE_CACHE_CONTROL = "public, max-age=31536000, immutable"
+
+# Precompressed variants written by scripts/precompress_static.py, best first
+PRECOMPRESSED_SUFFIXES = {"br": ".br", "gzip": ".gz"}
+
+_ASSET_REFERENCE = re.compile(r'(?P<attr>(?:href|src)=")/static/(?P<name>[^"?#]+)"')
+
+
+def catalog_etag(version: int, *parts: str) -> str:
+    """Strong ETag for a response determined by the catalog version and `parts`."""
+    digest = hashlib.sha1("\x1f".join(parts).encode("utf-8")).hexdigest()[:12]
+    return f'"v{version}-{digest}"'
+
+
+def validator_headers(etag: str, last_modified: Optional[int] = None,
+                      cache_control: str = API_CACHE_CONTROL) -> Dict[str, str]:
+    """ETag, Last-Modified and Cache-Control headers for a response."""
+    headers = {"ETag": etag, "Cache-Control": cache_control}
+    if last_modified:
+        headers["Last-Modified"] = formatdate(last_modified, usegmt=True)
+    return headers
+
+
+def is_not_modified(request: Request, etag: str, last_modified: Optional[int] = None) -> bool:
+    """True if the request's conditional headers match the current representation.
+
+    If-None-Match takes precedence over If-Modified-Since (RFC 9110).
+    """
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        candidates = {tag.strip().removeprefix("W/") for tag in if_none_match.split(",")}
+        return "*" in candidates or etag in candidates
+    if_modified_since = request.headers.get("if-modified-since")
+    if if_modified_since and last_modified:
+        try:
+            since = parsedate_to_datetime(if_modified_since).timestamp()
+        except (TypeError, ValueError):
+            return False
+        return int(last_modified) <= since
+    return False
+
+
+def not_modified_response(headers: Dict[str, str]) -> Response:
+    """Empty 304 carrying the validators."""
+    return Response(status_code=304, headers=headers)
+
+
+def fingerprint_assets(static_dir: str) -> Dict[str, str]:
+    """Map each file under `static_dir` (relative path) to a short content hash."""
+    manifest = {}
+    for root, _, files in os.walk(static_dir):
+        for name in files:
+            if name.endswith(tuple(PRECOMPRESSED_SUFFIXES.values())):
+                continue
+            path = os.path.join(root, name)
+            with open(path, "rb") as handle:
+                digest = hashlib.sha256(handle.read()).hexdigest()[:12]
+            manifest[os.path.relpath(path, static_dir).replace(os.sep, "/")] = digest
+    return manifest
+
+
+def fingerprint_html(html: str, manifest: Dict[str, str]) -> str:
+    """Rewrite /static/<name> references to /static/<name>?v=<hash>."""
+
+    def replace(match: re.Match) -> str:
+        digest = manifest.get(match.group("name"))
+        if digest is None:
+            return match.group(0)
+        return f'{match.group("attr")}/static/{match.group("name")}?v={digest}"'
+
+    return _ASSET_REFERENCE.sub(replace, html)
+
+
+class CachedStaticFiles(StaticFiles):
+    """StaticFiles that marks requests for the current fingerprint as immutable.
+
+    A `?v=` matching the file's content hash gets a one-year immutable
+    Cache-Control; anything else is served with `no-cache` so it revalidates
+    against the ETag StaticFiles already sends. When the client accepts it and
+    an up-to-date `.br`/`.gz` sibling exists, that file is sent instead.
+    """
+
+    @cached_property
+    def manifest(self) -> Dict[str, str]:
+        """Asset path -> content hash, computed on first use rather than at import."""
+        return fingerprint_assets(self.directory) if self.directory else {}
+
+    def _precompressed(self, full_path, stat_result, scope):
+        """Return (encoding, path, stat) of the variant to send, or None."""
+        accept_encoding = Headers(scope=scope).get("accept-encoding", "")
+        if not accept_encoding:
+            return None
+        variants = {}
+        for encoding, suffix in PRECOMPRESSED_SUFFIXES.items():
+            try:
+                variant_stat = os.stat(f"{full_path}{suffix}")
+            except OSError:
+                continue
+            # A variant older than its source is stale; ignore it
+            if variant_stat.st_mtime >= stat_result.st_mtime:
+                variants[encoding] = (f"{full_path}{suffix}", variant_stat)
+        encoding = choose_encoding(accept_encoding, variants)
+        return (encoding, *variants[encoding]) if encoding else None
+
+    def file_response(self, full_path, stat_result, scope, status_code=200):
+        variant = self._precompressed(full_path, stat_result, scope)
+        if variant is None:
+            response = super().file_response(full_path, stat_result, scope, status_code)
+        else:
+            encoding, variant_path, variant_stat = variant
+            media_type = mimetypes.guess_type(str(full_path))[0] or "text/plain"
+            response = FileResponse(variant_path, status_code=status_code,
+                                    stat_result=variant_stat, media_type=media_type)
+            response.headers["Content-Encoding"] = encoding
+            if self.is_not_modified(response.headers, Headers(scope=scope)):
+                response = NotModifiedResponse(response.headers)
+        if any(os.path.exists(f"{full_path}{suffix}") for suffix in PRECOMPRESSED_SUFFIXES.values()):
+            response.headers["Vary"] = "Accept-Encoding"
+        relative = os.path.relpath(full_path, self.directory).replace(os.sep, "/")
+        version = Request(scope).query_params.get("v")
+        if version is not None and version == self.manifest.get(relative):
+            response.headers["Cache-Control"] = IMMUTABLE_CACHE_CONTROL
+        else:
+            response.headers["Cache-Control"] = API_CACHE_CONTROL
+        return response
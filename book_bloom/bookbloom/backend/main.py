@@ -3,27 +3,89 @@ Main FastAPI application for BookBloom.
 Implements all required API endpoints.
 """
 
-from fastapi import FastAPI, HTTPException, Depends, status
-from fastapi.staticfiles import StaticFiles
-from fastapi.responses import FileResponse
+from fastapi import FastAPI, HTTPException, Depends, Query, Request, status
+from fastapi.responses import HTMLResponse, PlainTextResponse, StreamingResponse
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.security import HTTPAuthorizationCredentials
+from contextlib import asynccontextmanager
 from datetime import timedelta
 from typing import List, Optional, Dict, Any
+import asyncio
+import logging
 import os
 
 from .models import (
     Book, BookCreate, User, UserCreate, UserLogin, Token, 
-    CartItem, CartResponse
+    CartItem, CartResponse, Order
 )
 from .database import db
-from .auth import create_access_token, get_current_user, ACCESS_TOKEN_EXPIRE_MINUTES
+from scripts.init_db import ensure_database
+from .carts import create_cart_store
+from .orders import EmptyOrderError, OrderWriterStopped, order_writer
+from .facets import PRICE_BANDS, BookFilter
+from .serialization import FastJSONResponse, book_payload, dumps, dumps_books
+from .compression import CompressionMiddleware
+from .events import (
+    CATALOG_TOPIC, RESYNC, CatalogWatcher, cart_remove_event, cart_set_event,
+    event_stream, hub as event_hub, user_topic
+)
+from .metrics import MetricsMiddleware, registry as metrics_registry
+from .rate_limit import AdmissionMiddleware, admission
+from .http_cache import (
+    CachedStaticFiles, catalog_etag, fingerprint_html, is_not_modified,
+    not_modified_response, validator_headers
+)
+from .pagination import (
+    DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE, InvalidPageRequest,
+    decode_cursor, encode_cursor, parse_fields
+)
+from .auth import (
+    create_access_token, get_current_user, evict_token, evict_user, security, user_cache,
+    ACCESS_TOKEN_EXPIRE_MINUTES
+)
+
+# Bound concurrent logins so a burst queues briefly instead of flooding the
+# bcrypt workers; requests that wait too long get 503 and can retry.
+LOGIN_CONCURRENCY = int(os.environ.get("BOOKBLOOM_LOGIN_CONCURRENCY", str(2 * (os.cpu_count() or 1))))
+LOGIN_QUEUE_TIMEOUT = float(os.environ.get("BOOKBLOOM_LOGIN_QUEUE_TIMEOUT", "5"))
+
+logger = logging.getLogger("bookbloom")
+
+# Publishes catalog changes to open /api/events streams
+catalog_watcher = CatalogWatcher(event_hub, db.get_catalog_version)
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Open the database connection pool for the lifetime of the app."""
+    # Created here so the semaphore belongs to the serving event loop
+    app.state.login_slots = asyncio.Semaphore(LOGIN_CONCURRENCY)
+    user_cache.clear()
+    admission.reset()
+    # One PRAGMA user_version read when the schema is current (run.py has
+    # already checked); creates or upgrades it if uvicorn was started directly.
+    await asyncio.to_thread(ensure_database, db.db_path)
+    await db.connect()
+    await order_writer.start()
+    await catalog_watcher.start()
+    try:
+        yield
+    finally:
+        event_hub.close_all()
+        await catalog_watcher.stop()
+        await order_writer.stop()
+        await db.disconnect()
 
 app = FastAPI(
     title="BookBloom API",
     description="Books Reborn, Knowledge Renewed - E-commerce API for book catalog",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan
 )
 
+# Rate limits and load shedding run first, before any routing or database work.
+# Added before CORS so that 429/503 responses still carry CORS headers.
+app.add_middleware(AdmissionMiddleware, controller=admission)
+
 # CORS middleware for frontend communication
 app.add_middleware(
     CORSMiddleware,
@@ -31,23 +93,45 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["ETag", "Link", "X-Next-Cursor", "X-Total-Count"],
 )
 
-# In-memory cart storage (in production, use Redis or database)
-user_carts: Dict[int, List[CartItem]] = {}
+# Compress JSON/text API responses; /static serves precompressed files instead
+app.add_middleware(CompressionMiddleware)
+
+# Outermost, so latency covers compression and CORS too; see GET /metrics
+app.add_middleware(MetricsMiddleware)
+
+# Carts live outside the process so every worker sees the same cart
+cart_store = create_cart_store()
 
 # Mount static files
 static_path = os.path.join(os.path.dirname(os.path.dirname(__file__)), "static")
-os.makedirs(static_path, exist_ok=True)
-app.mount("/static", StaticFiles(directory=static_path), name="static")
+static_files = CachedStaticFiles(directory=static_path)
+app.mount("/static", static_files, name="static")
+
+frontend_path = os.path.join(os.path.dirname(os.path.dirname(__file__)), "frontend", "index.html")
+_frontend_page: Dict[str, str] = {}
+
+def render_frontend() -> Dict[str, str]:
+    """index.html with fingerprinted asset URLs, and its ETag (built once)."""
+    if not _frontend_page:
+        with open(frontend_path, encoding="utf-8") as handle:
+            html = fingerprint_html(handle.read(), static_files.manifest)
+        _frontend_page["html"] = html
+        _frontend_page["etag"] = catalog_etag(0, html)
+    return _frontend_page
 
 # Serve frontend
 @app.get("/")
-async def serve_frontend():
+async def serve_frontend(request: Request):
     """Serve the main frontend page."""
-    frontend_path = os.path.join(os.path.dirname(os.path.dirname(__file__)), "frontend", "index.html")
     if os.path.exists(frontend_path):
-        return FileResponse(frontend_path)
+        page = render_frontend()
+        headers = validator_headers(page["etag"])
+        if is_not_modified(request, page["etag"]):
+            return not_modified_response(headers)
+        return HTMLResponse(page["html"], headers=headers)
     return {"message": "BookBloom API - Books Reborn, Knowledge Renewed"}
 
 # Authentication endpoints
@@ -71,6 +155,9 @@ async def register_user(user: UserCreate):
             password=user.password,
             social_handle_url=user.social_handle_url
         )
+        # Tokens cached for an earlier account with this email (deleted
+        # outside the app) must not resolve to that account's record
+        evict_user(user_data["email"])
         
         return User(
             id=user_data["id"],
@@ -87,11 +174,26 @@ async def register_user(user: UserCreate):
         )
 
 @app.post("/api/login", response_model=Token)
-async def login_user(user_login: UserLogin):
+async def login_user(user_login: UserLogin, request: Request):
     """Authenticate user and return JWT token."""
-    user_data = await db.get_user_by_email(user_login.email)
+    login_slots = request.app.state.login_slots
+    try:
+        await asyncio.wait_for(login_slots.acquire(), timeout=LOGIN_QUEUE_TIMEOUT)
+    except asyncio.TimeoutError:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Too many login attempts in progress, please retry",
+            headers={"Retry-After": "1"},
+        )
+    try:
+        user_data = await db.get_user_by_email(user_login.email)
+        valid = bool(user_data) and await db.check_password(
+            user_login.password, user_data["password_hash"]
+        )
+    finally:
+        login_slots.release()
     
-    if not user_data or not db.verify_password(user_login.password, user_data["password_hash"]):
+    if not valid:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Invalid email or password",
@@ -106,27 +208,134 @@ async def login_user(user_login: UserLogin):
     
     return {"access_token": access_token, "token_type": "bearer"}
 
+@app.post("/api/logout")
+async def logout_user(credentials: HTTPAuthorizationCredentials = Depends(security)):
+    """Drop the server-side cache entry for the caller's token."""
+    evict_token(credentials.credentials)
+    return {"message": "Logged out"}
+
 @app.get("/api/me", response_model=User)
 async def get_current_user_info(current_user: User = Depends(get_current_user)):
     """Get current user information."""
     return current_user
 
 # Book catalog endpoints
-@app.get("/api/books", response_model=List[Book])
-async def get_books(search: Optional[str] = None):
-    """Get all books or search by title/author."""
+async def count_filtered_books(book_filter: BookFilter, category: Optional[str],
+                               state: Optional[str], price_band: Optional[str]) -> Optional[int]:
+    """Catalog size estimate, or the exact count for a single-facet filter (else None)."""
+    if not book_filter:
+        return await db.estimate_book_count()
+    selected = [(facet, value) for facet, value in
+                (("category", category), ("state", state), ("price", price_band)) if value is not None]
+    # Any other filter (or a second facet) means the facet table cannot answer
+    if len(selected) != 1 or book_filter != BookFilter.from_params(category, state, price_band):
+        return None
+    facet, value = selected[0]
+    counts = (await db.get_facets()).get(facet, [])
+    return next((entry["count"] for entry in counts if entry["value"] == value), 0)
+
+@app.get("/api/books/facets")
+async def get_book_facets(request: Request):
+    """Book counts per category, state and price band, from the facet-count table."""
+    version, last_modified = await db.get_catalog_version()
+    headers = validator_headers(catalog_etag(version, "facets"), last_modified)
+    if is_not_modified(request, headers["ETag"], last_modified):
+        return not_modified_response(headers)
+    
+    facets = await db.get_facets()
+    band_order = [name for name, _, _ in PRICE_BANDS]
+    body = {
+        "category": facets.get("category", []),
+        "state": facets.get("state", []),
+        "price": sorted(facets.get("price", []), key=lambda entry: band_order.index(entry["value"])),
+        "price_bands": [
+            {"value": name, "min": lower, "max": upper} for name, lower, upper in PRICE_BANDS
+        ],
+    }
+    return FastJSONResponse(body, headers=headers)
+
+@app.get("/api/books", response_model=None, responses={200: {"model": List[Book]}})
+async def get_books(
+    request: Request,
+    search: Optional[str] = None,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
+    fields: Optional[str] = None,
+    category: Optional[str] = None,
+    state: Optional[str] = None,
+    price_band: Optional[str] = None,
+    price_min: Optional[float] = Query(None, ge=0),
+    price_max: Optional[float] = Query(None, ge=0),
+    year_min: Optional[int] = None,
+    year_max: Optional[int] = None,
+):
+    """Get a page of books or search by title/author.
+    
+    Listings are keyset-paginated on (title, id): pass the `X-Next-Cursor`
+    header value as `cursor` (or follow `Link: rel="next"`) for the next page.
+    `fields` is a comma-separated column projection. `X-Total-Count` holds a
+    cheap estimate of the catalog size (the exact facet count when filtering
+    on a single category, state or price band).
+    
+    `category`, `state`, `price_band` (see /api/books/facets), `price_min`
+    (inclusive), `price_max` (exclusive), `year_min` and `year_max` filter the
+    listing or search using the facet indexes.
+    
+    Rows are encoded straight to JSON with orjson (see backend/serialization.py)
+    instead of building a Book model per row. Responses carry an ETag derived
+    from the catalog version and the query, so revalidation returns 304.
+    """
+    try:
+        columns = parse_fields(fields)
+        after = decode_cursor(cursor) if cursor else None
+        book_filter = BookFilter.from_params(
+            category, state, price_band, price_min, price_max, year_min, year_max
+        )
+    except (InvalidPageRequest, ValueError) as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
+    
+    version, last_modified = await db.get_catalog_version()
+    headers = validator_headers(catalog_etag(version, request.url.query), last_modified)
+    if is_not_modified(request, headers["ETag"], last_modified):
+        return not_modified_response(headers)
+    
     try:
-        books_data = await db.get_books(search)
-        return [Book(**book_data) for book_data in books_data]
+        if search:
+            books_data = await db.get_books(search, limit=limit, book_filter=book_filter)
+            next_after = None
+            if columns:
+                books_data = [{col: book[col] for col in columns} for book in books_data]
+        else:
+            books_data, next_after = await db.get_books_page(limit, after, columns, book_filter)
+            total = await count_filtered_books(book_filter, category, state, price_band)
+            if total is not None:
+                headers["X-Total-Count"] = str(total)
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail="Failed to retrieve books"
         )
+    
+    if next_after:
+        next_cursor = encode_cursor(*next_after)
+        next_url = request.url.include_query_params(cursor=next_cursor)
+        headers["X-Next-Cursor"] = next_cursor
+        headers["Link"] = f'<{next_url}>; rel="next"'
+    
+    body = dumps_books(books_data) if columns is None else dumps(books_data)
+    return FastJSONResponse(body, headers=headers)
 
-@app.get("/api/books/{book_id}", response_model=Book)
-async def get_book(book_id: int):
+@app.get("/api/books/{book_id}", response_model=None, responses={200: {"model": Book}})
+async def get_book(book_id: int, request: Request):
     """Get a specific book by ID."""
+    version, last_modified = await db.get_catalog_version()
+    headers = validator_headers(catalog_etag(version, str(book_id)), last_modified)
+    if is_not_modified(request, headers["ETag"], last_modified):
+        return not_modified_response(headers)
+    
     book_data = await db.get_book_by_id(book_id)
     if not book_data:
         raise HTTPException(
@@ -134,7 +343,66 @@ async def get_book(book_id: int):
             detail="Book not found"
         )
     
-    return Book(**book_data)
+    return FastJSONResponse(dumps(book_payload(book_data)), headers=headers)
+
+@app.get("/api/cache/stats")
+async def get_cache_stats():
+    """Report book cache hit/miss counters for sizing."""
+    return db.cache_stats()
+
+def _cache_samples(counter: str):
+    """Per-cache samples of one AsyncTTLCache.stats() counter for /metrics."""
+    caches = dict(db.cache_stats(), users=user_cache.stats())
+    return [((("cache", name),), stats[counter]) for name, stats in sorted(caches.items())]
+
+for _counter, _kind in (("hits", "counter"), ("misses", "counter"), ("evictions", "counter"), ("size", "gauge")):
+    metrics_registry.add_collector(
+        f"bookbloom_cache_{_counter}" + ("_total" if _kind == "counter" else ""),
+        _kind,
+        f"In-process cache {_counter}.",
+        lambda counter=_counter: _cache_samples(counter),
+    )
+
+for _counter in ("orders", "batches", "failures"):
+    metrics_registry.add_collector(
+        f"bookbloom_order_{_counter}_total",
+        "counter",
+        f"Checkout group commit {_counter}.",
+        lambda counter=_counter: [((), order_writer.stats()[counter])],
+    )
+
+metrics_registry.add_collector(
+    "bookbloom_rate_limited_total", "counter", "Requests rejected with 429 by rate limit rule.",
+    lambda: [((("rule", rule),), count) for rule, count in sorted(admission.rate_limited.items())],
+)
+metrics_registry.add_collector(
+    "bookbloom_admission_shed_total", "counter", "Requests rejected with 503 by the concurrency limit.",
+    lambda: [((), admission.shed)],
+)
+metrics_registry.add_collector(
+    "bookbloom_admission_queued", "gauge", "Requests waiting for an in-flight slot.",
+    lambda: [((), admission.queued)],
+)
+
+metrics_registry.add_collector(
+    "bookbloom_event_streams", "gauge", "Open /api/events streams.",
+    lambda: [((), event_hub.subscriptions)],
+)
+metrics_registry.add_collector(
+    "bookbloom_events_published_total", "counter", "Live update events published.",
+    lambda: [((), event_hub.published)],
+)
+metrics_registry.add_collector(
+    "bookbloom_event_overflows_total", "counter", "Streams that fell behind and were sent a resync.",
+    lambda: [((), event_hub.overflows)],
+)
+
+@app.get("/metrics", include_in_schema=False)
+async def get_metrics():
+    """Request, database and cache metrics in the Prometheus text format."""
+    return PlainTextResponse(
+        metrics_registry.render(), media_type="text/plain; version=0.0.4; charset=utf-8"
+    )
 
 # Cart management endpoints
 @app.post("/api/cart/add")
@@ -143,6 +411,12 @@ async def add_to_cart(
     current_user: User = Depends(get_current_user)
 ):
     """Add book to user's cart."""
+    if cart_item.quantity <= 0:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Quantity must be positive"
+        )
+    
     # Verify book exists
     book_data = await db.get_book_by_id(cart_item.book_id)
     if not book_data:
@@ -151,58 +425,56 @@ async def add_to_cart(
             detail="Book not found"
         )
     
-    # Initialize user cart if not exists
-    if current_user.id not in user_carts:
-        user_carts[current_user.id] = []
-    
-    # Check if book already in cart
-    for item in user_carts[current_user.id]:
-        if item.book_id == cart_item.book_id:
-            item.quantity += cart_item.quantity
-            break
-    else:
-        user_carts[current_user.id].append(cart_item)
+    quantity = await cart_store.add(current_user.id, cart_item.book_id, cart_item.quantity)
     
-    return {"message": "Book added to cart successfully"}
+    return {
+        "message": "Book added to cart successfully",
+        "cart_delta": publish_cart_event(current_user.id, cart_set_event(book_data, quantity)),
+    }
 
-@app.get("/api/cart", response_model=List[CartResponse])
-async def get_cart(current_user: User = Depends(get_current_user)):
-    """Get user's cart contents."""
-    if current_user.id not in user_carts:
+def publish_cart_event(user_id: int, event: Dict[str, Any]) -> Dict[str, Any]:
+    """Push a cart delta to the user's open streams and return it for the response."""
+    event_hub.publish(user_topic(user_id), event)
+    return event
+
+async def build_cart(user_id: int) -> List[CartResponse]:
+    """Price a user's cart with one bulk book lookup."""
+    lines = await cart_store.items(user_id)
+    if not lines:
         return []
+    books_by_id = await db.get_books_by_ids([book_id for book_id, _ in lines])
     
     cart_items = []
-    for cart_item in user_carts[current_user.id]:
-        book_data = await db.get_book_by_id(cart_item.book_id)
+    for book_id, quantity in lines:
+        book_data = books_by_id.get(book_id)
         if book_data:
             book = Book(**book_data)
-            subtotal = float(book.price or 0) * cart_item.quantity
+            subtotal = float(book.price or 0) * quantity
             cart_items.append(CartResponse(
                 book=book,
-                quantity=cart_item.quantity,
+                quantity=quantity,
                 subtotal=subtotal
             ))
     
     return cart_items
 
+@app.get("/api/cart", response_model=List[CartResponse])
+async def get_cart(current_user: User = Depends(get_current_user)):
+    """Get user's cart contents."""
+    return await build_cart(current_user.id)
+
 @app.delete("/api/cart/{book_id}")
 async def remove_from_cart(
     book_id: int, 
     current_user: User = Depends(get_current_user)
 ):
     """Remove book from user's cart."""
-    if current_user.id not in user_carts:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Cart is empty"
-        )
+    await cart_store.remove(current_user.id, book_id)
     
-    user_carts[current_user.id] = [
-        item for item in user_carts[current_user.id] 
-        if item.book_id != book_id
-    ]
-    
-    return {"message": "Book removed from cart"}
+    return {
+        "message": "Book removed from cart",
+        "cart_delta": publish_cart_event(current_user.id, cart_remove_event([book_id])),
+    }
 
 @app.put("/api/cart/{book_id}")
 async def update_cart_quantity(
@@ -211,20 +483,17 @@ async def update_cart_quantity(
     current_user: User = Depends(get_current_user)
 ):
     """Update quantity of book in cart."""
-    if current_user.id not in user_carts:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Cart is empty"
-        )
-    
     if quantity <= 0:
         # Remove item if quantity is 0 or negative
         return await remove_from_cart(book_id, current_user)
     
-    for item in user_carts[current_user.id]:
-        if item.book_id == book_id:
-            item.quantity = quantity
-            return {"message": "Cart updated successfully"}
+    if await cart_store.set_quantity(current_user.id, book_id, quantity):
+        book_data = await db.get_book_by_id(book_id)
+        event = cart_set_event(book_data, quantity) if book_data else cart_remove_event([book_id])
+        return {
+            "message": "Cart updated successfully",
+            "cart_delta": publish_cart_event(current_user.id, event),
+        }
     
     raise HTTPException(
         status_code=status.HTTP_404_NOT_FOUND,
@@ -233,28 +502,80 @@ async def update_cart_quantity(
 
 @app.post("/api/checkout")
 async def checkout(current_user: User = Depends(get_current_user)):
-    """Process checkout (placeholder implementation)."""
-    if current_user.id not in user_carts or not user_carts[current_user.id]:
+    """Place an order for the cart and empty it."""
+    # Database carts are read and emptied inside the order transaction; other
+    # stores are read here and the ordered quantities taken off after the commit
+    lines = None
+    if not cart_store.in_database:
+        lines = await cart_store.items(current_user.id)
+        if not lines:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Cart is empty"
+            )
+    
+    # Priced from the books table and written in one (group-committed) transaction
+    try:
+        order = await order_writer.place(current_user.id, lines)
+    except EmptyOrderError:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Cart is empty"
         )
-    
-    # Calculate total
-    total = 0.0
-    cart_items = await get_cart(current_user)
-    for item in cart_items:
-        total += float(item.subtotal)
-    
-    # Clear cart (simulate successful order)
-    user_carts[current_user.id] = []
+    except OrderWriterStopped:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Server is shutting down, please retry",
+            headers={"Retry-After": "1"},
+        )
+    # Only the ordered lines leave the cart; books added meanwhile stay
+    cart_delta = cart_remove_event(book_id for book_id, _ in order["lines"])
+    if not cart_store.in_database:
+        try:
+            left = await cart_store.remove_ordered(current_user.id, order["lines"])
+        except Exception:  # pylint: disable=broad-except
+            # The order is committed: report success rather than invite a
+            # second checkout, and let the client refetch the cart
+            logger.exception("Order %s placed but its cart lines were not removed", order["id"])
+            cart_delta = None
+        else:
+            if left:
+                # Quantities raised during checkout keep the difference;
+                # have every tab refetch rather than describe it
+                event_hub.publish(user_topic(current_user.id), RESYNC)
+                cart_delta = None
     
     return {
         "message": "Order processed successfully",
-        "total": total,
-        "order_id": f"ORDER_{current_user.id}_{int(os.urandom(4).hex(), 16)}"
+        "total": float(order["total"]),
+        "order_id": order["id"],
+        "cart_delta": publish_cart_event(current_user.id, cart_delta) if cart_delta else None,
     }
 
+@app.get("/api/orders", response_model=List[Order])
+async def list_orders(
+    limit: int = Query(20, ge=1, le=100),
+    current_user: User = Depends(get_current_user)
+):
+    """Get the user's most recent orders."""
+    return await order_writer.get_orders(current_user.id, limit)
+
+# Live updates
+@app.get("/api/events")
+async def stream_events(current_user: User = Depends(get_current_user)):
+    """Server-sent events: `cart` deltas for the user and `catalog` changes.
+    
+    `cart` events hold absolute line state (`op` is set or remove) and
+    match the `cart_delta` returned by the cart endpoints. `resync` means
+    events were dropped and the cart should be refetched.
+    """
+    subscription = event_hub.subscribe(user_topic(current_user.id), CATALOG_TOPIC)
+    return StreamingResponse(
+        event_stream(subscription),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
 if __name__ == "__main__":
     import uvicorn
     uvicorn.run(app, host="127.0.0.1", port=8000)
\ No newline at end of file
@@ -0,0 +1,211 @@
+"""
+Request and database metrics for BookBloom.
+Middleware records per-route latency histograms, in-flight requests and the
+database queries each request made; /metrics renders them in the Prometheus
+text exposition format. Everything is in-process, so with several workers
+each process reports its own series.
+"""
+
+import contextvars
+import os
+import time
+from bisect import bisect_left
+from collections import defaultdict
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+# Seconds; covers cached reads (~1 ms) up to bcrypt logins and bulk checkouts
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUERY_COUNT_BUCKETS = (0, 1, 2, 3, 5, 10, 25, 50, 100)
+
+# Add a Server-Timing header (db time/count, app time) to every response
+SERVER_TIMING = os.environ.get("BOOKBLOOM_SERVER_TIMING", "0").lower() in ("1", "true", "yes")
+
+Labels = Tuple[Tuple[str, str], ...]
+Sample = Tuple[str, Labels, float]
+
+
+class Histogram:
+    """Cumulative-bucket histogram keyed by label set."""
+
+    def __init__(self, buckets: Iterable[float]):
+        self.buckets = tuple(buckets)
+        self._counts: Dict[Labels, List[int]] = defaultdict(lambda: [0] * (len(self.buckets) + 1))
+        self._sums: Dict[Labels, float] = defaultdict(float)
+
+    def observe(self, labels: Labels, value: float):
+        self._counts[labels][bisect_left(self.buckets, value)] += 1
+        self._sums[labels] += value
+
+    def samples(self, name: str) -> Iterable[Sample]:
+        for labels, counts in sorted(self._counts.items()):
+            cumulative = 0
+            for bound, count in zip(self.buckets, counts):
+                cumulative += count
+                yield f"{name}_bucket", labels + (("le", _format_value(bound)),), cumulative
+            cumulative += counts[-1]
+            yield f"{name}_bucket", labels + (("le", "+Inf"),), cumulative
+            yield f"{name}_count", labels, cumulative
+            yield f"{name}_sum", labels, self._sums[labels]
+
+
+class RequestStats:
+    """Database work done while serving one request."""
+
+    __slots__ = ("queries", "query_seconds")
+
+    def __init__(self):
+        self.queries = 0
+        self.query_seconds = 0.0
+
+
+_current_request: contextvars.ContextVar[Optional[RequestStats]] = contextvars.ContextVar(
+    "bookbloom_request_stats", default=None
+)
+
+
+class MetricsRegistry:
+    """Process-wide metric store rendered by /metrics."""
+
+    def __init__(self):
+        self.requests: Dict[Labels, int] = defaultdict(int)
+        self.latency = Histogram(LATENCY_BUCKETS)
+        self.in_flight = 0
+        self.db_queries: Dict[Labels, int] = defaultdict(int)
+        self.db_seconds: Dict[Labels, float] = defaultdict(float)
+        self.db_queries_per_request = Histogram(QUERY_COUNT_BUCKETS)
+        self._collectors: List[Tuple[str, str, str, Callable[[], Iterable[Tuple[Labels, float]]]]] = []
+
+    def add_collector(self, name: str, kind: str, help_text: str,
+                      collect: Callable[[], Iterable[Tuple[Labels, float]]]):
+        """Register a metric whose samples are read at scrape time (e.g. cache counters)."""
+        self._collectors.append((name, kind, help_text, collect))
+
+    def record_query(self, seconds: float):
+        """Count one database statement against the current request, if any."""
+        stats = _current_request.get()
+        if stats is not None:
+            stats.queries += 1
+            stats.query_seconds += seconds
+
+    def observe_request(self, method: str, route: str, status: int, seconds: float, stats: RequestStats):
+        route_labels = (("method", method), ("route", route))
+        self.requests[route_labels + (("status", str(status)),)] += 1
+        self.latency.observe(route_labels, seconds)
+        self.db_queries[route_labels] += stats.queries
+        self.db_seconds[route_labels] += stats.query_seconds
+        self.db_queries_per_request.observe(route_labels, stats.queries)
+
+    def render(self) -> str:
+        """Prometheus text exposition (version 0.0.4)."""
+        lines: List[str] = []
+
+        def family(name: str, kind: str, help_text: str, samples: Iterable[Sample]):
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} {kind}")
+            lines.extend(f"{sample}{_format_labels(labels)} {_format_value(value)}"
+                         for sample, labels, value in samples)
+
+        def simple(name: str, values: Dict[Labels, float]) -> Iterable[Sample]:
+            return ((name, labels, value) for labels, value in sorted(values.items()))
+
+        family("bookbloom_http_requests_total", "counter", "HTTP requests by route and status.",
+               simple("bookbloom_http_requests_total", self.requests))
+        family("bookbloom_http_request_duration_seconds", "histogram", "HTTP request latency.",
+               self.latency.samples("bookbloom_http_request_duration_seconds"))
+        family("bookbloom_http_requests_in_flight", "gauge", "Requests being served.",
+               [("bookbloom_http_requests_in_flight", (), self.in_flight)])
+        family("bookbloom_db_queries_total", "counter", "Database statements run by route.",
+               simple("bookbloom_db_queries_total", self.db_queries))
+        family("bookbloom_db_query_seconds_total", "counter", "Time spent in database statements by route.",
+               simple("bookbloom_db_query_seconds_total", self.db_seconds))
+        family("bookbloom_db_queries_per_request", "histogram", "Database statements per request.",
+               self.db_queries_per_request.samples("bookbloom_db_queries_per_request"))
+        for name, kind, help_text, collect in self._collectors:
+            family(name, kind, help_text, ((name, labels, value) for labels, value in collect()))
+        return "\n".join(lines) + "\n"
+
+
+def _format_labels(labels: Labels) -> str:
+    if not labels:
+        return ""
+    escaped = (
+        (key, value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n"))
+        for key, value in labels
+    )
+    return "{" + ",".join(f'{key}="{value}"' for key, value in escaped) + "}"
+
+
+def _format_value(value: float) -> str:
+    if isinstance(value, int) or float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+registry = MetricsRegistry()
+
+
+def record_query(seconds: float):
+    """Module-level shortcut used by the Database instrumentation."""
+    registry.record_query(seconds)
+
+
+class MetricsMiddleware:
+    """ASGI middleware timing each request and attributing its database work.
+
+    Routes are labelled by their path template (`/api/books/{book_id}`), paths
+    under `mounts` by the mount prefix and anything else as `unmatched`, which
+    keeps label cardinality bounded.
+    """
+
+    def __init__(self, app: ASGIApp, metrics: MetricsRegistry = registry,
+                 mounts: Tuple[str, ...] = ("/static",), server_timing: bool = SERVER_TIMING):
+        self.app = app
+        self.metrics = metrics
+        self.mounts = mounts
+        self.server_timing = server_timing
+
+    def _route(self, scope: Scope) -> str:
+        route = scope.get("route")
+        if route is not None and hasattr(route, "path"):
+            return route.path
+        for mount in self.mounts:
+            if scope["path"].startswith(mount):
+                return mount
+        return "unmatched"
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        stats = RequestStats()
+        token = _current_request.set(stats)
+        started = time.perf_counter()
+        status = 500
+        self.metrics.in_flight += 1
+
+        async def send_with_timing(message: Message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                if self.server_timing:
+                    elapsed_ms = (time.perf_counter() - started) * 1000
+                    headers = MutableHeaders(scope=message)
+                    headers.append(
+                        "Server-Timing",
+                        f'db;dur={stats.query_seconds * 1000:.2f};desc="{stats.queries} queries", '
+                        f"app;dur={elapsed_ms:.2f}",
+                    )
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            self.metrics.in_flight -= 1
+            _current_request.reset(token)
+            self.metrics.observe_request(
+                scope["method"], self._route(scope), status, time.perf_counter() - started, stats
+            )
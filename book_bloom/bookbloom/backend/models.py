@@ -4,7 +4,7 @@ Defines data models for API requests and responses.
 """
 
 from pydantic import BaseModel, EmailStr
-from typing import Optional
+from typing import List, Optional
 from datetime import datetime
 from decimal import Decimal
 
@@ -60,4 +60,16 @@ class CartItem(BaseModel):
 class CartResponse(BaseModel):
     book: Book
     quantity: int
-    subtotal: Decimal
\ No newline at end of file
+    subtotal: Decimal
+
+class OrderItem(BaseModel):
+    book_id: int
+    title: str
+    quantity: int
+    unit_price: Decimal
+
+class Order(BaseModel):
+    id: int
+    total: Decimal
+    created_at: datetime
+    items: List[OrderItem]
@@ -0,0 +1,258 @@
+"""
+Order persistence for BookBloom.
+Checkout writes an `orders` row and its `order_items` in one transaction,
+pricing every line from `books` in a single INSERT ... SELECT. Concurrent
+checkouts are group-committed: a writer task collects the orders that arrive
+within a short window and writes them in one transaction, so a flash sale
+costs one write lock and one commit per batch rather than per order.
+"""
+
+import asyncio
+import json
+import os
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional
+
+from .carts import SELECT_CART, CartLines
+from .database import Database, db
+
+# How long the writer waits for more checkouts before committing a batch, and
+# the most orders one transaction may hold.
+ORDER_BATCH_WINDOW = float(os.environ.get("BOOKBLOOM_ORDER_BATCH_WINDOW_MS", "2")) / 1000
+ORDER_BATCH_SIZE = int(os.environ.get("BOOKBLOOM_ORDER_BATCH_SIZE", "64"))
+
+INSERT_ORDER = "INSERT INTO orders (user_id) VALUES (?)"
+# Cart lines are bound as a JSON array of [book_id, quantity] pairs; books that
+# no longer exist simply drop out of the join.
+INSERT_ORDER_ITEMS = """
+    INSERT INTO order_items (order_id, book_id, title, quantity, unit_price)
+    SELECT ?, b.id, b.title, json_extract(line.value, '$[1]'), COALESCE(b.price, 0)
+    FROM json_each(?) AS line
+    JOIN books b ON b.id = json_extract(line.value, '$[0]')
+    RETURNING book_id, title, quantity, unit_price
+"""
+SET_ORDER_TOTAL = """
+    UPDATE orders
+    SET total = (SELECT ROUND(SUM(quantity * unit_price), 2) FROM order_items WHERE order_id = ?)
+    WHERE id = ?
+    RETURNING total, created_at
+"""
+# Only the ordered lines are removed; books added while checking out stay
+DELETE_ORDERED_CART_ITEMS = """
+    DELETE FROM cart_items
+    WHERE user_id = ? AND book_id IN (SELECT json_extract(value, '$[0]') FROM json_each(?))
+"""
+SELECT_ORDERS = "SELECT id, total, created_at FROM orders WHERE user_id = ? ORDER BY id DESC LIMIT ?"
+SELECT_ORDER_ITEMS = """
+    SELECT order_id, book_id, title, quantity, unit_price
+    FROM order_items
+    WHERE order_id IN (SELECT value FROM json_each(?))
+    ORDER BY order_id, book_id
+"""
+
+
+class EmptyOrderError(ValueError):
+    """None of the cart's books could be ordered."""
+
+
+class OrderWriterStopped(RuntimeError):
+    """The writer is shutting down and did not write the order."""
+
+
+@dataclass
+class PendingOrder:
+    """A checkout waiting for the next batch commit."""
+
+    user_id: int
+    lines: Optional[CartLines]
+    future: asyncio.Future = field(repr=False)
+
+
+class OrderWriter:
+    """Writes orders, group-committing concurrent checkouts.
+
+    Call `start()` from the app lifespan; until then (or after `stop()`) each
+    order is written in its own transaction.
+    """
+
+    def __init__(self, database: Database, batch_size: int = ORDER_BATCH_SIZE,
+                 batch_window: float = ORDER_BATCH_WINDOW):
+        if batch_size < 1:
+            raise ValueError("Batch size must be at least 1")
+        self.database = database
+        self.batch_size = batch_size
+        self.batch_window = batch_window
+        self._queue: Optional[asyncio.Queue] = None
+        self._task: Optional[asyncio.Task] = None
+        self._stopping = False
+        self.orders = 0
+        self.batches = 0
+        self.failures = 0
+        self.largest_batch = 0
+
+    @property
+    def is_running(self) -> bool:
+        return self._task is not None
+
+    async def start(self):
+        """Start the batching writer task on the running event loop."""
+        if self.is_running:
+            return
+        self._queue = asyncio.Queue()
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        """Write whatever is queued, then stop the writer task.
+
+        Checkouts placed while stopping fail with OrderWriterStopped.
+        """
+        if not self.is_running:
+            return
+        self._stopping = True
+        try:
+            self._queue.put_nowait(None)
+            await self._task
+        finally:
+            # Anything still queued (behind the sentinel, or left by a failed
+            # task) was never written; fail it rather than leave it waiting
+            while not self._queue.empty():
+                pending = self._queue.get_nowait()
+                if pending is not None and not pending.future.done():
+                    self.failures += 1
+                    pending.future.set_exception(OrderWriterStopped("The order writer has stopped"))
+            self._queue = None
+            self._task = None
+            self._stopping = False
+
+    async def place(self, user_id: int, lines: Optional[CartLines] = None) -> Dict[str, Any]:
+        """Write an order and return it once committed.
+
+        Without `lines`, the user's `cart_items` are read and the ordered lines
+        deleted inside the order transaction, so a change made meanwhile is
+        either in the order or left in the cart. The result's `lines` are the
+        `(book_id, quantity)` pairs ordered. Raises EmptyOrderError if no line
+        could be ordered and OrderWriterStopped while the writer is stopping.
+        """
+        if self._stopping:
+            raise OrderWriterStopped("The order writer is stopping")
+        pending = PendingOrder(user_id, lines, asyncio.get_running_loop().create_future())
+        if self.is_running:
+            self._queue.put_nowait(pending)
+        else:
+            await self._write_batch([pending])
+        return await pending.future
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        stopping = False
+        while not stopping:
+            first = await self._queue.get()
+            if first is None:
+                break
+            batch = [first]
+            deadline = loop.time() + self.batch_window
+            while len(batch) < self.batch_size:
+                try:
+                    pending = self._queue.get_nowait()
+                except asyncio.QueueEmpty:
+                    remaining = deadline - loop.time()
+                    if remaining <= 0:
+                        break
+                    try:
+                        pending = await asyncio.wait_for(self._queue.get(), remaining)
+                    except asyncio.TimeoutError:
+                        break
+                if pending is None:
+                    stopping = True
+                    break
+                batch.append(pending)
+            await self._write_batch(batch)
+
+    async def _write_batch(self, batch: List[PendingOrder]):
+        """Write every order of `batch` in one transaction and settle their futures.
+
+        Each order runs in a savepoint, so one bad order fails alone.
+        """
+        outcomes: List[Any] = []
+        try:
+            async with self.database.connection() as conn:
+                await conn.execute("BEGIN IMMEDIATE")
+                for pending in batch:
+                    await conn.execute("SAVEPOINT order_write")
+                    try:
+                        outcomes.append(await self._insert(conn, pending))
+                        await conn.execute("RELEASE order_write")
+                    except Exception as exc:  # pylint: disable=broad-except
+                        await conn.execute("ROLLBACK TO order_write")
+                        await conn.execute("RELEASE order_write")
+                        outcomes.append(exc)
+                await conn.commit()
+        except Exception as exc:  # pylint: disable=broad-except
+            # Nothing was committed, so every order in the batch failed
+            outcomes = [exc] * len(batch)
+
+        self.batches += 1
+        self.largest_batch = max(self.largest_batch, len(batch))
+        for pending, outcome in zip(batch, outcomes):
+            if isinstance(outcome, Exception):
+                self.failures += 1
+                if not pending.future.done():
+                    pending.future.set_exception(outcome)
+            else:
+                self.orders += 1
+                if not pending.future.done():
+                    pending.future.set_result(outcome)
+
+    @staticmethod
+    async def _insert(conn, pending: PendingOrder) -> Dict[str, Any]:
+        lines = pending.lines
+        if lines is None:
+            async with conn.execute(SELECT_CART, (pending.user_id,)) as cursor:
+                lines = [(book_id, quantity) for book_id, quantity in await cursor.fetchall()]
+            if not lines:
+                raise EmptyOrderError("The cart is empty")
+        lines_json = json.dumps(lines)
+        cursor = await conn.execute(INSERT_ORDER, (pending.user_id,))
+        order_id = cursor.lastrowid
+        async with conn.execute(INSERT_ORDER_ITEMS, (order_id, lines_json)) as cursor:
+            items = [
+                {"book_id": book_id, "title": title, "quantity": quantity, "unit_price": unit_price}
+                for book_id, title, quantity, unit_price in await cursor.fetchall()
+            ]
+        if not items:
+            raise EmptyOrderError("None of the books in the cart are available")
+        async with conn.execute(SET_ORDER_TOTAL, (order_id, order_id)) as cursor:
+            total, created_at = await cursor.fetchone()
+        if pending.lines is None:
+            await conn.execute(DELETE_ORDERED_CART_ITEMS, (pending.user_id, lines_json))
+        return {"id": order_id, "total": total, "created_at": created_at, "items": items, "lines": lines}
+
+    async def get_orders(self, user_id: int, limit: int = 20) -> List[Dict[str, Any]]:
+        """The user's most recent orders with their items (two queries)."""
+        async with self.database.connection() as conn:
+            async with conn.execute(SELECT_ORDERS, (user_id, limit)) as cursor:
+                orders = [
+                    {"id": order_id, "total": total, "created_at": created_at, "items": []}
+                    for order_id, total, created_at in await cursor.fetchall()
+                ]
+            if not orders:
+                return []
+            by_id = {order["id"]: order for order in orders}
+            async with conn.execute(SELECT_ORDER_ITEMS, (json.dumps(list(by_id)),)) as cursor:
+                for order_id, book_id, title, quantity, unit_price in await cursor.fetchall():
+                    by_id[order_id]["items"].append({
+                        "book_id": book_id, "title": title, "quantity": quantity, "unit_price": unit_price,
+                    })
+        return orders
+
+    def stats(self) -> Dict[str, int]:
+        """Counters for sizing the batch window."""
+        return {
+            "orders": self.orders,
+            "batches": self.batches,
+            "failures": self.failures,
+            "largest_batch": self.largest_batch,
+        }
+
+
+order_writer = OrderWriter(db)
@@ -0,0 +1,49 @@
+"""
+Pagination helpers for BookBloom list endpoints.
+Encodes keyset cursors and validates field projections.
+"""
+
+import base64
+import json
+from typing import List, Optional, Tuple
+
+from .database import BOOK_COLUMN_NAMES
+
+DEFAULT_PAGE_SIZE = 100
+MAX_PAGE_SIZE = 500
+
+
+class InvalidPageRequest(ValueError):
+    """Raised when a cursor or field list cannot be used."""
+
+
+def encode_cursor(title: str, book_id: int) -> str:
+    """Encode the (title, id) sort key of the last row as an opaque cursor."""
+    raw = json.dumps([title, book_id], separators=(",", ":")).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).rstrip(b"=").decode("ascii")
+
+
+def decode_cursor(cursor: str) -> Tuple[str, int]:
+    """Decode a cursor produced by encode_cursor."""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        title, book_id = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+    except (ValueError, TypeError, UnicodeError) as exc:
+        raise InvalidPageRequest("Invalid cursor") from exc
+    if not isinstance(title, str) or not isinstance(book_id, int):
+        raise InvalidPageRequest("Invalid cursor")
+    return title, book_id
+
+
+def parse_fields(fields: Optional[str]) -> Optional[List[str]]:
+    """Parse a comma-separated `fields=` projection into known book columns."""
+    if fields is None:
+        return None
+    requested = [name.strip() for name in fields.split(",") if name.strip()]
+    unknown = sorted(set(requested) - set(BOOK_COLUMN_NAMES))
+    if unknown:
+        raise InvalidPageRequest(f"Unknown fields: {', '.join(unknown)}")
+    if not requested:
+        raise InvalidPageRequest("fields must name at least one column")
+    # Keep the canonical column order and drop duplicates
+    return [name for name in BOOK_COLUMN_NAMES if name in requested]
@@ -0,0 +1,261 @@
+"""
+Rate limiting and admission control for BookBloom.
+Token buckets per client IP and route class cap how fast one client can hit
+the expensive endpoints (login runs bcrypt, search scans the catalog), and a
+global concurrency limit sheds load once the worker is saturated. Rejected
+requests get 429 (rate limited) or 503 (overloaded) with Retry-After, before
+any routing or database work happens. State is per process.
+"""
+
+import asyncio
+import math
+import os
+import time
+from collections import OrderedDict, defaultdict, deque
+from dataclasses import dataclass
+from typing import Deque, Dict, Optional, Tuple
+from urllib.parse import parse_qs
+
+from starlette.responses import JSONResponse
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+# Set BOOKBLOOM_RATE_LIMIT=0 to turn rate limiting and admission control off
+ENABLED = os.environ.get("BOOKBLOOM_RATE_LIMIT", "1").lower() not in ("0", "false", "no", "off")
+
+# Requests served at once per worker; more wait up to ADMISSION_TIMEOUT seconds
+# in a queue of at most MAX_QUEUE before being shed with 503. 0 disables.
+MAX_CONCURRENCY = int(os.environ.get("BOOKBLOOM_MAX_CONCURRENCY", "64"))
+MAX_QUEUE = int(os.environ.get("BOOKBLOOM_MAX_QUEUE", "128"))
+ADMISSION_TIMEOUT = float(os.environ.get("BOOKBLOOM_ADMISSION_TIMEOUT", "1"))
+
+# Token buckets tracked at once; the least recently seen clients are dropped first
+MAX_TRACKED_CLIENTS = int(os.environ.get("BOOKBLOOM_RATE_LIMIT_CLIENTS", "100000"))
+
+# Paths that are never limited (monitoring must keep working under load)
+EXEMPT_PATHS = ("/metrics",)
+# Long-lived streams are rate limited but do not hold an in-flight slot, which
+# would otherwise be taken for the whole life of the connection
+STREAM_PATHS = ("/api/events",)
+
+PERIODS = {"s": 1, "second": 1, "m": 60, "minute": 60, "h": 3600, "hour": 3600}
+
+
+@dataclass(frozen=True)
+class RateLimitRule:
+    """`limit` requests per `period` seconds per client for matching requests.
+
+    A client may burst up to `limit` requests, then gets one more every
+    `period / limit` seconds.
+    """
+
+    name: str
+    method: Optional[str]
+    path: str
+    limit: int
+    period: float
+    prefix: bool = False
+    query_param: Optional[str] = None
+
+    @property
+    def refill_per_second(self) -> float:
+        return self.limit / self.period
+
+    def matches(self, method: str, path: str, query: Dict[str, list]) -> bool:
+        if self.method is not None and method != self.method:
+            return False
+        if not (path.startswith(self.path) if self.prefix else path == self.path):
+            return False
+        return self.query_param is None or any(query.get(self.query_param, []))
+
+
+def parse_rate(text: str) -> Optional[Tuple[int, float]]:
+    """Parse "10/minute" or "20/s" into (limit, period seconds); None for "0"/"off"."""
+    text = text.strip().lower()
+    if text in ("", "0", "off", "none"):
+        return None
+    count, _, unit = text.partition("/")
+    if unit not in PERIODS:
+        raise ValueError(f"Invalid rate {text!r}; expected e.g. '10/minute' or '20/s'")
+    return int(count), float(PERIODS[unit])
+
+
+def _rule(name: str, default: str, method: Optional[str], path: str, **options) -> Optional[RateLimitRule]:
+    rate = parse_rate(os.environ.get(f"BOOKBLOOM_RATE_LIMIT_{name.upper()}", default))
+    return RateLimitRule(name, method, path, *rate, **options) if rate else None
+
+
+def default_rules() -> Tuple[RateLimitRule, ...]:
+    """Rules from BOOKBLOOM_RATE_LIMIT_<NAME> (e.g. "10/minute"); the first match applies."""
+    rules = (
+        _rule("login", "10/minute", "POST", "/api/login"),
+        _rule("register", "5/minute", "POST", "/api/register"),
+        _rule("search", "10/second", "GET", "/api/books", query_param="search"),
+        _rule("api", "100/second", None, "/api/", prefix=True),
+    )
+    return tuple(rule for rule in rules if rule is not None)
+
+
+class AdmissionController:
+    """Token buckets per (rule, client) plus a global in-flight limit."""
+
+    def __init__(self, rules: Tuple[RateLimitRule, ...] = (), max_concurrency: int = MAX_CONCURRENCY,
+                 max_queue: int = MAX_QUEUE, queue_timeout: float = ADMISSION_TIMEOUT,
+                 max_clients: int = MAX_TRACKED_CLIENTS, enabled: bool = ENABLED):
+        self.rules = rules
+        self.max_concurrency = max_concurrency
+        self.max_queue = max_queue
+        self.queue_timeout = queue_timeout
+        self.max_clients = max_clients
+        self.enabled = enabled
+        self._buckets: "OrderedDict[Tuple[str, str], list]" = OrderedDict()
+        self._waiters: Deque[asyncio.Future] = deque()
+        self.in_flight = 0
+        self.rate_limited: Dict[str, int] = defaultdict(int)
+        self.shed = 0
+        self.admitted = 0
+
+    def reset(self):
+        """Forget all buckets and counters (called at startup)."""
+        self._buckets.clear()
+        self._waiters.clear()
+        self.in_flight = 0
+        self.rate_limited.clear()
+        self.shed = 0
+        self.admitted = 0
+
+    @property
+    def queued(self) -> int:
+        return len(self._waiters)
+
+    def match(self, method: str, path: str, query_string: bytes) -> Optional[RateLimitRule]:
+        """The first rule that applies to a request, if any."""
+        query = parse_qs(query_string.decode("latin-1")) if query_string else {}
+        for rule in self.rules:
+            if rule.matches(method, path, query):
+                return rule
+        return None
+
+    def take(self, rule: RateLimitRule, client: str, now: Optional[float] = None) -> float:
+        """Spend one token; return 0 if allowed, else seconds until a token is available."""
+        now = time.monotonic() if now is None else now
+        key = (rule.name, client)
+        bucket = self._buckets.get(key)
+        if bucket is None:
+            bucket = self._buckets[key] = [float(rule.limit), now]
+            if len(self._buckets) > self.max_clients:
+                self._buckets.popitem(last=False)
+        else:
+            self._buckets.move_to_end(key)
+            tokens, updated = bucket
+            bucket[0] = min(float(rule.limit), tokens + (now - updated) * rule.refill_per_second)
+            bucket[1] = now
+        if bucket[0] >= 1:
+            bucket[0] -= 1
+            return 0.0
+        self.rate_limited[rule.name] += 1
+        return (1 - bucket[0]) / rule.refill_per_second
+
+    async def acquire(self) -> bool:
+        """Take an in-flight slot, waiting in the bounded queue; False if shed."""
+        if self.max_concurrency <= 0:
+            return True
+        if self.in_flight < self.max_concurrency and not self._waiters:
+            self.in_flight += 1
+            return True
+        if len(self._waiters) >= self.max_queue:
+            self.shed += 1
+            return False
+        waiter = asyncio.get_running_loop().create_future()
+        self._waiters.append(waiter)
+        try:
+            await asyncio.wait_for(waiter, self.queue_timeout)
+            return True
+        except asyncio.TimeoutError:
+            if waiter.done() and not waiter.cancelled():
+                # The slot was handed over as the timeout fired; give it back
+                self.release()
+            self.shed += 1
+            return False
+        except asyncio.CancelledError:
+            # Client went away while queued
+            if waiter.done() and not waiter.cancelled():
+                self.release()
+            raise
+        finally:
+            if waiter in self._waiters:
+                self._waiters.remove(waiter)
+
+    def release(self):
+        """Free a slot, handing it straight to the oldest waiter if there is one."""
+        if self.max_concurrency <= 0:
+            return
+        while self._waiters:
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                waiter.set_result(None)
+                return
+        self.in_flight -= 1
+
+    def stats(self) -> Dict[str, object]:
+        return {
+            "in_flight": self.in_flight,
+            "queued": self.queued,
+            "admitted": self.admitted,
+            "shed": self.shed,
+            "rate_limited": dict(self.rate_limited),
+        }
+
+
+def _client_ip(scope: Scope) -> str:
+    client = scope.get("client")
+    return client[0] if client else "unknown"
+
+
+class AdmissionMiddleware:
+    """ASGI middleware applying an AdmissionController to HTTP requests."""
+
+    def __init__(self, app: ASGIApp, controller: AdmissionController, exempt_paths: Tuple[str, ...] = EXEMPT_PATHS,
+                 stream_paths: Tuple[str, ...] = STREAM_PATHS):
+        self.app = app
+        self.controller = controller
+        self.exempt_paths = exempt_paths
+        self.stream_paths = stream_paths
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        controller = self.controller
+        if scope["type"] != "http" or not controller.enabled or scope["path"] in self.exempt_paths:
+            await self.app(scope, receive, send)
+            return
+
+        rule = controller.match(scope["method"], scope["path"], scope.get("query_string", b""))
+        if rule is not None:
+            wait = controller.take(rule, _client_ip(scope))
+            if wait:
+                response = JSONResponse(
+                    {"detail": "Too many requests"},
+                    status_code=429,
+                    headers={"Retry-After": str(max(1, math.ceil(wait)))},
+                )
+                await response(scope, receive, send)
+                return
+
+        if scope["path"] in self.stream_paths:
+            await self.app(scope, receive, send)
+            return
+
+        if not await controller.acquire():
+            response = JSONResponse(
+                {"detail": "Server is busy, please retry"},
+                status_code=503,
+                headers={"Retry-After": "1"},
+            )
+            await response(scope, receive, send)
+            return
+        controller.admitted += 1
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            controller.release()
+
+
+admission = AdmissionController(default_rules())
@@ -0,0 +1,67 @@
+"""
+Fast JSON encoding for BookBloom list endpoints.
+Book rows from the database are encoded straight to JSON bytes with orjson,
+skipping the per-row pydantic model and FastAPI's jsonable_encoder pass. The
+output matches what `response_model=List[Book]` would produce.
+"""
+
+import json
+from decimal import Decimal
+from typing import Any, Iterable, List, Mapping, Optional
+
+from fastapi import Response
+from pydantic import TypeAdapter
+
+from .models import Book
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - orjson is a declared dependency
+    orjson = None
+
+# Wire order of Book fields (inherited fields first, then id)
+BOOK_RESPONSE_FIELDS = tuple(Book.model_fields)
+
+_books_adapter = TypeAdapter(List[Book])
+
+
+def decimal_text(value: Any) -> Optional[str]:
+    """Render a price the way pydantic serializes a Decimal field."""
+    if value is None or isinstance(value, str):
+        return value
+    text = str(value)
+    # str(float) and str(Decimal) only disagree on exponent notation
+    return text if "e" not in text else str(Decimal(text))
+
+
+def book_payload(row: Mapping[str, Any]) -> dict:
+    """Build the JSON object for one book row in Book field order."""
+    payload = {field: row.get(field) for field in BOOK_RESPONSE_FIELDS}
+    payload["price"] = decimal_text(payload["price"])
+    return payload
+
+
+def dumps(content: Any) -> bytes:
+    """Encode plain JSON-compatible data."""
+    if orjson is not None:
+        return orjson.dumps(content)
+    return json.dumps(content, separators=(",", ":"), ensure_ascii=False).encode("utf-8")
+
+
+def dumps_books(rows: Iterable[Mapping[str, Any]]) -> bytes:
+    """Encode book rows as a JSON array of Book objects in a single pass."""
+    if orjson is not None:
+        return orjson.dumps([book_payload(row) for row in rows])
+    # Without orjson, pydantic validates and serializes in one call in Rust
+    return _books_adapter.dump_json(_books_adapter.validate_python(list(rows)))
+
+
+class FastJSONResponse(Response):
+    """JSON response whose body is pre-encoded bytes or data encoded with orjson."""
+
+    media_type = "application/json"
+
+    def render(self, content: Any) -> bytes:
+        if isinstance(content, bytes):
+            return content
+        return dumps(content)
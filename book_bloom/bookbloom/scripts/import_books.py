@@ -0,0 +1,217 @@
+#!/usr/bin/env python3
+"""
+Bulk book import for BookBloom.
+Streams a CSV or JSONL feed into the books table in large batched
+transactions, upserting on isbn. Secondary indexes and the books triggers
+(full-text sync, facet counts, catalog version) are dropped for the load and rebuilt once
+at the end, which is far cheaper than maintaining them row by row.
+
+Usage:
+    python scripts/import_books.py feed.csv
+    python scripts/import_books.py feed.jsonl --batch-size 100000 --db data/bookbloom.db
+"""
+
+import argparse
+import csv
+import json
+import math
+import os
+import sqlite3
+import sys
+import time
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+# Make the bookbloom package importable when run as a script
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# pylint: disable=import-error,wrong-import-position
+from scripts.init_db import default_db_path, rebuild_facets  # noqa: E402
+
+IMPORT_COLUMNS = ("title", "author", "isbn", "year_of_release", "price", "category", "state")
+# SQLite INTEGER range; larger years would fail the insert (and the whole import)
+MAX_INTEGER = 2 ** 63 - 1
+VALID_STATES = {"good", "fair", "normal", "like new"}
+
+# Per-connection settings for the load only; they are gone when it closes.
+# The WAL journal is kept so the running app can keep reading during an import.
+FAST_LOAD_PRAGMAS = (
+    "PRAGMA journal_mode=WAL",
+    "PRAGMA synchronous=OFF",
+    "PRAGMA cache_size=-262144",
+    "PRAGMA temp_store=MEMORY",
+    "PRAGMA busy_timeout=30000",
+)
+
+UPSERT_BOOK = f"""
+    INSERT INTO books ({", ".join(IMPORT_COLUMNS)}) VALUES ({", ".join("?" * len(IMPORT_COLUMNS))})
+    ON CONFLICT(isbn) DO UPDATE SET
+        title = excluded.title,
+        author = excluded.author,
+        year_of_release = excluded.year_of_release,
+        price = excluded.price,
+        category = excluded.category,
+        state = excluded.state
+"""
+
+# Explicit (named) indexes and triggers on books; the UNIQUE(isbn) autoindex has
+# no SQL and stays, since the upsert needs it.
+SELECT_BOOK_INDEXES = (
+    "SELECT name, sql FROM sqlite_master WHERE type = 'index' AND tbl_name = 'books' AND sql IS NOT NULL"
+)
+SELECT_BOOK_TRIGGERS = "SELECT name, sql FROM sqlite_master WHERE type = 'trigger' AND tbl_name = 'books'"
+
+
+def _text(value) -> Optional[str]:
+    if value is None:
+        return None
+    value = str(value).strip()
+    return value or None
+
+
+def _number(value, kind):
+    try:
+        return kind(value) if _text(value) is not None else None
+    except (TypeError, ValueError):
+        return None
+
+
+def clean_record(record: Dict) -> Optional[Tuple]:
+    """Turn one feed record into an insert tuple, or None if it cannot be used."""
+    title, author = _text(record.get("title")), _text(record.get("author"))
+    if not title or not author:
+        return None
+    year = _number(record.get("year_of_release"), float)
+    price = _number(record.get("price"), float)
+    # "nan"/"inf" parse as floats but cannot be stored (int() raises on them)
+    if any(value is not None and not math.isfinite(value) for value in (year, price)):
+        return None
+    if year is not None and abs(year) > MAX_INTEGER:
+        return None
+    state = _text(record.get("state"))
+    state = state.lower() if state else None
+    return (
+        title,
+        author,
+        _text(record.get("isbn")),
+        int(year) if year is not None else None,
+        price,
+        _text(record.get("category")),
+        state if state in VALID_STATES else None,
+    )
+
+
+def read_records(path: str, file_format: Optional[str] = None) -> Iterator[Dict]:
+    """Stream records from a CSV (with header) or JSONL file."""
+    file_format = file_format or ("jsonl" if path.endswith((".jsonl", ".ndjson")) else "csv")
+    with open(path, newline="", encoding="utf-8") as handle:
+        if file_format == "csv":
+            yield from csv.DictReader(handle)
+        else:
+            for line in handle:
+                if line.strip():
+                    yield json.loads(line)
+
+
+def batched(rows: Iterable[Tuple], size: int) -> Iterator[List[Tuple]]:
+    """Group rows into lists of `size` for executemany."""
+    batch = []
+    for row in rows:
+        batch.append(row)
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def rebuild_derived_data(conn: sqlite3.Connection):
+    """Recompute what the dropped triggers would have maintained."""
+    has_fts = conn.execute("SELECT 1 FROM sqlite_master WHERE name = 'books_fts'").fetchone()
+    if has_fts:
+        conn.execute("INSERT INTO books_fts(books_fts) VALUES ('rebuild')")
+    has_facets = conn.execute("SELECT 1 FROM sqlite_master WHERE name = 'book_facets'").fetchone()
+    if has_facets:
+        rebuild_facets(conn.cursor())
+    has_version = conn.execute("SELECT 1 FROM sqlite_master WHERE name = 'catalog_version'").fetchone()
+    if has_version:
+        # One bump for the whole import tells every app worker to drop its listings
+        conn.execute(
+            "UPDATE catalog_version SET version = version + 1, "
+            "updated_at = CAST(strftime('%s', 'now') AS INTEGER) WHERE id = 1"
+        )
+
+
+def import_books(path: str, db_path: Optional[str] = None, batch_size: int = 50_000,
+                 file_format: Optional[str] = None, progress=print) -> Dict[str, float]:
+    """Load a feed into the books table; return row counts and timing."""
+    db_path = db_path or default_db_path()
+    conn = sqlite3.connect(db_path, isolation_level=None)
+    for pragma in FAST_LOAD_PRAGMAS:
+        conn.execute(pragma)
+
+    started = time.perf_counter()
+    stats = {"read": 0, "imported": 0, "rejected": 0}
+
+    def clean_all():
+        for record in read_records(path, file_format):
+            stats["read"] += 1
+            row = clean_record(record)
+            if row is None:
+                stats["rejected"] += 1
+            else:
+                yield row
+
+    conn.execute("BEGIN IMMEDIATE")
+    try:
+        indexes = conn.execute(SELECT_BOOK_INDEXES).fetchall()
+        triggers = conn.execute(SELECT_BOOK_TRIGGERS).fetchall()
+        for name, _ in indexes:
+            conn.execute(f'DROP INDEX "{name}"')
+        for name, _ in triggers:
+            conn.execute(f'DROP TRIGGER "{name}"')
+
+        for batch in batched(clean_all(), batch_size):
+            conn.executemany(UPSERT_BOOK, batch)
+            stats["imported"] += len(batch)
+            elapsed = time.perf_counter() - started
+            progress(f"{stats['imported']:,} rows imported ({stats['imported'] / elapsed:,.0f} rows/s)")
+
+        progress("Rebuilding indexes and search index...")
+        for _, sql in indexes:
+            conn.execute(sql)
+        for _, sql in triggers:
+            conn.execute(sql)
+        rebuild_derived_data(conn)
+        conn.execute("COMMIT")
+    except BaseException:
+        conn.execute("ROLLBACK")
+        raise
+    finally:
+        conn.execute("PRAGMA optimize")
+        conn.close()
+
+    stats["seconds"] = time.perf_counter() - started
+    stats["rows_per_second"] = stats["imported"] / stats["seconds"] if stats["seconds"] else 0.0
+    return stats
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Bulk import books from a CSV or JSONL feed")
+    parser.add_argument("path", help="CSV (with header) or JSONL file")
+    parser.add_argument("--db", default=None, help="Database path (default: data/bookbloom.db)")
+    parser.add_argument("--format", choices=("csv", "jsonl"), default=None,
+                        help="Feed format (default: from the file extension)")
+    parser.add_argument("--batch-size", type=int, default=50_000, help="Rows per executemany (default: 50000)")
+    args = parser.parse_args()
+
+    if not os.path.exists(args.path):
+        parser.error(f"{args.path} does not exist")
+    stats = import_books(args.path, args.db, args.batch_size, args.format,
+                         progress=lambda line: print(line, file=sys.stderr))
+    print(f"Imported {stats['imported']:,} of {stats['read']:,} rows "
+          f"({stats['rejected']:,} rejected) in {stats['seconds']:.1f}s "
+          f"- {stats['rows_per_second']:,.0f} rows/s")
+
+
+if __name__ == "__main__":
+    main()
@@ -6,16 +6,183 @@ Creates SQLite database with books and users tables as per requirements.
 
 import sqlite3
 import os
+import sys
 from datetime import datetime
 
-def create_database():
-    """Create SQLite database with required tables."""
-    
-    # Create database directory if it doesn't exist
+# Make the bookbloom package importable when run as a script
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# pylint: disable=import-error,wrong-import-position
+from backend.facets import FACETS, facet_value_sql, price_band_sql  # noqa: E402
+
+# Bump whenever create_database() changes the schema; stored in PRAGMA user_version
+# so startup can skip initialization of an up-to-date database.
+SCHEMA_VERSION = 5
+
+def default_db_path() -> str:
+    """Path of the application database (bookbloom/data/bookbloom.db)."""
     db_dir = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'data')
     os.makedirs(db_dir, exist_ok=True)
+    return os.path.join(db_dir, 'bookbloom.db')
+
+def get_schema_version(db_path: str) -> int:
+    """Return the database's schema version (0 if it does not exist yet)."""
+    if not os.path.exists(db_path):
+        return 0
+    conn = sqlite3.connect(db_path)
+    try:
+        return conn.execute("PRAGMA user_version").fetchone()[0]
+    finally:
+        conn.close()
+
+def ensure_database(db_path: str = None) -> bool:
+    """Create or upgrade the database unless it is already at SCHEMA_VERSION.
+
+    Returns True if initialization ran.
+    """
+    db_path = db_path or default_db_path()
+    if get_schema_version(db_path) == SCHEMA_VERSION:
+        return False
+    create_database(db_path)
+    return True
+
+def create_search_index(cursor):
+    """Create the FTS5 index over book titles/authors and the triggers that sync it."""
+    cursor.execute("SELECT 1 FROM sqlite_master WHERE name = 'books_fts'")
+    exists = cursor.fetchone() is not None
+    
+    # External-content table: the text lives in books, the index in books_fts.
+    # prefix='2 3' adds prefix indexes so "tol*" style queries stay index lookups.
+    cursor.execute('''
+        CREATE VIRTUAL TABLE IF NOT EXISTS books_fts USING fts5(
+            title, author,
+            content='books', content_rowid='id',
+            tokenize='unicode61 remove_diacritics 2',
+            prefix='2 3'
+        )
+    ''')
+    cursor.execute('''
+        CREATE TRIGGER IF NOT EXISTS books_fts_ai AFTER INSERT ON books BEGIN
+            INSERT INTO books_fts(rowid, title, author) VALUES (new.id, new.title, new.author);
+        END
+    ''')
+    cursor.execute('''
+        CREATE TRIGGER IF NOT EXISTS books_fts_ad AFTER DELETE ON books BEGIN
+            INSERT INTO books_fts(books_fts, rowid, title, author)
+            VALUES ('delete', old.id, old.title, old.author);
+        END
+    ''')
+    cursor.execute('''
+        CREATE TRIGGER IF NOT EXISTS books_fts_au AFTER UPDATE OF title, author ON books BEGIN
+            INSERT INTO books_fts(books_fts, rowid, title, author)
+            VALUES ('delete', old.id, old.title, old.author);
+            INSERT INTO books_fts(rowid, title, author) VALUES (new.id, new.title, new.author);
+        END
+    ''')
+    
+    if not exists:
+        # Index rows that were inserted before the search index existed
+        cursor.execute("INSERT INTO books_fts(books_fts) VALUES ('rebuild')")
+
+def create_catalog_version(cursor):
+    """Create the catalog version counter and the triggers that bump it on book writes.
+
+    The API derives ETag/Last-Modified headers from it, so it lives in the
+    database where every worker process sees the same value.
+    """
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS catalog_version (
+            id INTEGER PRIMARY KEY CHECK(id = 1),
+            version INTEGER NOT NULL,
+            updated_at INTEGER NOT NULL
+        )
+    ''')
+    cursor.execute(
+        "INSERT OR IGNORE INTO catalog_version (id, version, updated_at) "
+        "VALUES (1, 1, CAST(strftime('%s', 'now') AS INTEGER))"
+    )
+    for name, event in (("ai", "INSERT"), ("ad", "DELETE"), ("au", "UPDATE")):
+        cursor.execute(f'''
+            CREATE TRIGGER IF NOT EXISTS books_version_{name} AFTER {event} ON books BEGIN
+                UPDATE catalog_version
+                SET version = version + 1, updated_at = CAST(strftime('%s', 'now') AS INTEGER)
+                WHERE id = 1;
+            END
+        ''')
+
+def rebuild_facets(cursor):
+    """Recount book_facets from the books table."""
+    cursor.execute("DELETE FROM book_facets")
+    for facet in FACETS:
+        value = facet_value_sql(facet, "books")
+        cursor.execute(f'''
+            INSERT INTO book_facets (facet, value, count)
+            SELECT '{facet}', {value}, COUNT(*) FROM books
+            WHERE {value} IS NOT NULL GROUP BY {value}
+        ''')
+
+def create_facets(cursor):
+    """Create the facet-count table and the triggers that keep it current.
+
+    Counts per category, state and price band are adjusted by one on every
+    book insert, delete or relevant update, so /api/books/facets reads a
+    few dozen rows instead of aggregating the catalog.
+    """
+    cursor.execute("SELECT 1 FROM sqlite_master WHERE name = 'book_facets'")
+    exists = cursor.fetchone() is not None
+    
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS book_facets (
+            facet TEXT NOT NULL,
+            value TEXT NOT NULL,
+            count INTEGER NOT NULL,
+            PRIMARY KEY (facet, value)
+        ) WITHOUT ROWID
+    ''')
+    
+    def add(row):
+        return "".join(f'''
+            INSERT INTO book_facets (facet, value, count)
+            SELECT '{facet}', {facet_value_sql(facet, row)}, 1
+            WHERE {facet_value_sql(facet, row)} IS NOT NULL
+            ON CONFLICT(facet, value) DO UPDATE SET count = count + 1;''' for facet in FACETS)
+    
+    def remove(row):
+        return "".join(f'''
+            UPDATE book_facets SET count = count - 1
+            WHERE facet = '{facet}' AND value = {facet_value_sql(facet, row)};''' for facet in FACETS) + '''
+            DELETE FROM book_facets WHERE count <= 0;'''
+    
+    cursor.execute(f"CREATE TRIGGER IF NOT EXISTS books_facets_ai AFTER INSERT ON books BEGIN {add('new')} END")
+    cursor.execute(f"CREATE TRIGGER IF NOT EXISTS books_facets_ad AFTER DELETE ON books BEGIN {remove('old')} END")
+    cursor.execute(
+        "CREATE TRIGGER IF NOT EXISTS books_facets_au AFTER UPDATE OF category, state, price ON books "
+        f"BEGIN {remove('old')} {add('new')} END"
+    )
+    
+    if not exists:
+        rebuild_facets(cursor)
+
+def create_price_band(cursor):
+    """Add the generated `price_band` column and its (price_band, title, id) index.
+
+    A price band filter is then an equality seek in title order, like category
+    and state, instead of a price range that has to be sorted by title.
+    """
+    columns = {row[1] for row in cursor.execute("PRAGMA table_xinfo(books)")}
+    if "price_band" not in columns:
+        cursor.execute(
+            f"ALTER TABLE books ADD COLUMN price_band TEXT "
+            f"GENERATED ALWAYS AS ({price_band_sql('price')}) VIRTUAL"
+        )
+    cursor.execute('CREATE INDEX IF NOT EXISTS idx_books_price_band_title ON books(price_band, title, id)')
+
+
+def create_database(db_path: str = None):
+    """Create SQLite database with required tables."""
     
-    db_path = os.path.join(db_dir, 'bookbloom.db')
+    if db_path is None:
+        db_path = default_db_path()
     
     # Connect to database (creates file if doesn't exist)
     conn = sqlite3.connect(db_path)
@@ -48,10 +215,56 @@ def create_database():
         )
     ''')
     
+    # Carts are stored here so they survive restarts and are shared by workers.
+    # One row per (user, book); quantity changes are upserts on that key.
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS cart_items (
+            user_id INTEGER NOT NULL REFERENCES users(id) ON DELETE CASCADE,
+            book_id INTEGER NOT NULL REFERENCES books(id) ON DELETE CASCADE,
+            quantity INTEGER NOT NULL CHECK(quantity > 0),
+            added_at DATETIME DEFAULT CURRENT_TIMESTAMP,
+            UNIQUE(user_id, book_id)
+        )
+    ''')
+    
+    # Placed orders. Items copy the title and unit price at checkout time, so
+    # an order reads the same after the catalog changes.
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS orders (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            user_id INTEGER NOT NULL REFERENCES users(id) ON DELETE CASCADE,
+            total DECIMAL NOT NULL DEFAULT 0,
+            created_at DATETIME DEFAULT CURRENT_TIMESTAMP
+        )
+    ''')
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS order_items (
+            order_id INTEGER NOT NULL REFERENCES orders(id) ON DELETE CASCADE,
+            book_id INTEGER NOT NULL,
+            title TEXT NOT NULL,
+            quantity INTEGER NOT NULL CHECK(quantity > 0),
+            unit_price DECIMAL NOT NULL,
+            PRIMARY KEY (order_id, book_id)
+        ) WITHOUT ROWID
+    ''')
+    
     # Create indexes for better performance
     cursor.execute('CREATE INDEX IF NOT EXISTS idx_books_title ON books(title)')
     cursor.execute('CREATE INDEX IF NOT EXISTS idx_books_author ON books(author)')
     cursor.execute('CREATE INDEX IF NOT EXISTS idx_users_email ON users(email)')
+    cursor.execute('CREATE INDEX IF NOT EXISTS idx_orders_user ON orders(user_id, id)')
+    # Filtered listings seek on (filter, title, id) and keep keyset order
+    cursor.execute('CREATE INDEX IF NOT EXISTS idx_books_category_title ON books(category, title, id)')
+    cursor.execute('CREATE INDEX IF NOT EXISTS idx_books_state_title ON books(state, title, id)')
+    cursor.execute('CREATE INDEX IF NOT EXISTS idx_books_year_title ON books(year_of_release, title, id)')
+    cursor.execute('DROP INDEX IF EXISTS idx_books_year')  # prefix of idx_books_year_title
+    create_price_band(cursor)
+    # Open price_min/price_max ranges
+    cursor.execute('CREATE INDEX IF NOT EXISTS idx_books_price ON books(price)')
+    
+    create_search_index(cursor)
+    create_catalog_version(cursor)
+    create_facets(cursor)
     
     conn.commit()
     
@@ -74,6 +287,7 @@ def create_database():
         VALUES (?, ?, ?, ?, ?, ?, ?)
     ''', sample_books)
     
+    cursor.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
     conn.commit()
     conn.close()
     
@@ -0,0 +1,63 @@
+#!/usr/bin/env python3
+"""
+Static asset precompression for BookBloom.
+Writes `.gz` (and `.br` when brotli is installed) siblings of every text
+asset in static/ at maximum compression, so the server never compresses
+them per request. Files whose variants are already up to date are skipped.
+"""
+
+import gzip
+import os
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+COMPRESSIBLE_EXTENSIONS = (".js", ".css", ".html", ".svg", ".json", ".txt", ".map")
+
+
+def default_static_dir() -> str:
+    """Path of the static asset directory (bookbloom/static)."""
+    return os.path.join(os.path.dirname(os.path.dirname(__file__)), "static")
+
+
+def _write_variant(path: str, data: bytes, suffix: str, compressor) -> bool:
+    """Write `path + suffix` unless it is newer than the source; True if written."""
+    target = f"{path}{suffix}"
+    if os.path.exists(target) and os.path.getmtime(target) >= os.path.getmtime(path):
+        return False
+    compressed = compressor(data)
+    if len(compressed) >= len(data):
+        return False
+    with open(target, "wb") as handle:
+        handle.write(compressed)
+    return True
+
+
+def precompress_static(static_dir: str = None) -> list:
+    """Precompress text assets under `static_dir`; return the variant paths written."""
+    static_dir = static_dir or default_static_dir()
+    compressors = {".gz": lambda data: gzip.compress(data, compresslevel=9, mtime=0)}
+    if brotli is not None:
+        compressors[".br"] = lambda data: brotli.compress(data, quality=11)
+
+    written = []
+    for root, _, files in os.walk(static_dir):
+        for name in files:
+            if not name.endswith(COMPRESSIBLE_EXTENSIONS):
+                continue
+            path = os.path.join(root, name)
+            with open(path, "rb") as handle:
+                data = handle.read()
+            for suffix, compressor in compressors.items():
+                if _write_variant(path, data, suffix, compressor):
+                    written.append(f"{path}{suffix}")
+    return written
+
+
+if __name__ == "__main__":
+    variants = precompress_static()
+    for variant in variants:
+        print(f"Wrote {variant} ({os.path.getsize(variant)} bytes)")
+    print(f"Precompressed {len(variants)} static variants")
@@ -5,7 +5,11 @@ class BookBloomApp {
         this.currentUser = null;
         this.authToken = localStorage.getItem('authToken');
         this.cart = [];
+        this.cartLoaded = false;
+        this.cartStale = false;  // catalog changed since the cart was fetched
+        this.events = null;  // AbortController of the open /api/events stream
         this.books = [];
+        this.nextBooksCursor = null;
         
         this.init();
     }
@@ -14,6 +18,7 @@ class BookBloomApp {
         this.bindEvents();
         this.checkAuthStatus();
         this.loadBooks();
+        this.loadFacets();
     }
     
     bindEvents() {
@@ -45,7 +50,13 @@ class BookBloomApp {
             e.preventDefault();
             if (this.authToken) {
                 this.showPage('cart-page');
-                this.loadCart();
+                // Kept current by cart deltas; fetched when not loaded yet or
+                // when the catalog changed since (prices may have moved)
+                if (this.cartLoaded && !this.cartStale) {
+                    this.renderCart();
+                } else {
+                    this.loadCart();
+                }
             } else {
                 alert('Please login to view your cart');
                 this.showPage('login-page');
@@ -83,15 +94,29 @@ class BookBloomApp {
         
         document.getElementById('clear-search-btn').addEventListener('click', () => {
             document.getElementById('search-input').value = '';
+            document.querySelectorAll('.filter-bar select').forEach(select => { select.value = ''; });
             this.loadBooks();
         });
         
+        document.querySelectorAll('.filter-bar select').forEach(select => {
+            select.addEventListener('change', () => this.performSearch());
+        });
+        
         document.getElementById('search-input').addEventListener('keypress', (e) => {
             if (e.key === 'Enter') {
                 this.performSearch();
             }
         });
         
+        document.getElementById('load-more-btn').addEventListener('click', () => {
+            this.loadMoreBooks();
+        });
+        
+        document.getElementById('refresh-catalog-btn').addEventListener('click', () => {
+            this.performSearch();
+            this.loadFacets();
+        });
+        
         // Cart actions
         document.getElementById('checkout-btn').addEventListener('click', () => {
             this.checkout();
@@ -110,6 +135,11 @@ class BookBloomApp {
     }
     
     async makeRequest(url, options = {}) {
+        const response = await this.makeRawRequest(url, options);
+        return response.json();
+    }
+    
+    async makeRawRequest(url, options = {}) {
         const defaultOptions = {
             headers: {
                 'Content-Type': 'application/json'
@@ -134,7 +164,7 @@ class BookBloomApp {
             throw new Error(errorMessage);
         }
         
-        return response.json();
+        return response;
     }
     
     showPage(pageId) {
@@ -170,6 +200,7 @@ class BookBloomApp {
         document.getElementById('login-link').classList.add('hidden');
         document.getElementById('profile-link').classList.remove('hidden');
         document.getElementById('logout-link').classList.remove('hidden');
+        this.connectEvents();
         // Re-render books if they exist to update button states
         if (this.books.length > 0) {
             this.renderBooks();
@@ -274,8 +305,16 @@ class BookBloomApp {
     }
     
     logout() {
+        if (this.authToken) {
+            // Let the server drop its cached session; the UI logs out regardless
+            this.makeRawRequest('/api/logout', { method: 'POST' }).catch(() => {});
+        }
+        this.disconnectEvents();
         this.authToken = null;
         localStorage.removeItem('authToken');
+        this.cart = [];
+        this.cartLoaded = false;
+        this.cartStale = false;
         this.showUnauthenticatedState();
         this.showPage('home-page');
         this.renderBooks(); // Re-render books to update button states
@@ -290,10 +329,15 @@ class BookBloomApp {
         try {
             loading.classList.remove('hidden');
             noBooks.classList.add('hidden');
+            document.getElementById('catalog-updated').classList.add('hidden');
             booksGrid.innerHTML = '';
+            this.setNextBooksCursor(null);
             
-            const url = search ? `/api/books?search=${encodeURIComponent(search)}` : '/api/books';
-            this.books = await this.makeRequest(url);
+            const params = this.filterParams();
+            if (search) params.set('search', search);
+            const response = await this.makeRawRequest(`/api/books?${params}`);
+            this.books = await response.json();
+            this.setNextBooksCursor(response.headers.get('X-Next-Cursor'));
             
             loading.classList.add('hidden');
             
@@ -309,6 +353,52 @@ class BookBloomApp {
         }
     }
     
+    async loadMoreBooks() {
+        if (!this.nextBooksCursor) return;
+        
+        try {
+            const params = this.filterParams();
+            params.set('cursor', this.nextBooksCursor);
+            const response = await this.makeRawRequest(`/api/books?${params}`);
+            this.books = this.books.concat(await response.json());
+            this.setNextBooksCursor(response.headers.get('X-Next-Cursor'));
+            this.renderBooks();
+        } catch (error) {
+            alert('Error loading more books: ' + error.message);
+        }
+    }
+    
+    filterParams() {
+        const params = new URLSearchParams();
+        document.querySelectorAll('.filter-bar select').forEach(select => {
+            if (select.value) params.set(select.dataset.param, select.value);
+        });
+        return params;
+    }
+    
+    async loadFacets() {
+        try {
+            const facets = await this.makeRequest('/api/books/facets');
+            const fill = (id, entries) => {
+                const select = document.getElementById(id);
+                const selected = select.value;
+                select.length = 1;  // keep the "any" option
+                entries.forEach(entry => select.add(new Option(`${entry.value} (${entry.count})`, entry.value)));
+                select.value = selected;
+            };
+            fill('category-filter', facets.category);
+            fill('state-filter', facets.state);
+            fill('price-filter', facets.price);
+        } catch (error) {
+            // Filters are optional; the catalog still works without them
+        }
+    }
+    
+    setNextBooksCursor(cursor) {
+        this.nextBooksCursor = cursor;
+        document.getElementById('load-more-btn').classList.toggle('hidden', !cursor);
+    }
+    
     renderBooks() {
         const booksGrid = document.getElementById('books-grid');
         
@@ -340,7 +430,7 @@ class BookBloomApp {
         }
         
         try {
-            await this.makeRequest('/api/cart/add', {
+            const response = await this.makeRequest('/api/cart/add', {
                 method: 'POST',
                 body: JSON.stringify({
                     book_id: bookId,
@@ -348,8 +438,8 @@ class BookBloomApp {
                 })
             });
             
+            this.applyCartDelta(response.cart_delta);
             alert('Book added to cart!');
-            this.updateCartCountFromServer();
         } catch (error) {
             alert('Error adding book to cart: ' + error.message);
         }
@@ -360,6 +450,8 @@ class BookBloomApp {
         
         try {
             this.cart = await this.makeRequest('/api/cart');
+            this.cartLoaded = true;
+            this.cartStale = false;
             this.renderCart();
             this.updateCartCount(this.cart.length);
         } catch (error) {
@@ -414,12 +506,11 @@ class BookBloomApp {
                 return;
             }
             
-            await this.makeRequest(`/api/cart/${bookId}`, {
-                method: 'PUT',
-                body: JSON.stringify({ quantity })
+            const response = await this.makeRequest(`/api/cart/${bookId}?quantity=${quantity}`, {
+                method: 'PUT'
             });
             
-            this.loadCart();
+            this.applyCartDelta(response.cart_delta);
         } catch (error) {
             alert('Error updating cart: ' + error.message);
         }
@@ -429,11 +520,11 @@ class BookBloomApp {
         if (!this.authToken) return;
         
         try {
-            await this.makeRequest(`/api/cart/${bookId}`, {
+            const response = await this.makeRequest(`/api/cart/${bookId}`, {
                 method: 'DELETE'
             });
             
-            this.loadCart();
+            this.applyCartDelta(response.cart_delta);
         } catch (error) {
             alert('Error removing item from cart: ' + error.message);
         }
@@ -451,20 +542,98 @@ class BookBloomApp {
             document.getElementById('order-total').textContent = response.total.toFixed(2);
             document.getElementById('checkout-modal').classList.remove('hidden');
             
-            this.loadCart(); // Refresh cart (should be empty now)
+            this.applyCartDelta(response.cart_delta);
         } catch (error) {
             alert('Checkout failed: ' + error.message);
         }
     }
     
-    async updateCartCountFromServer() {
-        if (!this.authToken) return;
-        
-        try {
-            const cart = await this.makeRequest('/api/cart');
-            this.updateCartCount(cart.length);
-        } catch (error) {
-            console.error('Error updating cart count:', error);
+    applyCartDelta(delta) {
+        // Deltas carry absolute line state, so the same one arriving from the
+        // response and from the event stream is applied harmlessly twice
+        if (!delta || !this.cartLoaded) {
+            this.loadCart();
+            return;
+        }
+        if (delta.op === 'set') {
+            const index = this.cart.findIndex(item => item.book.id === delta.book_id);
+            if (index === -1) {
+                this.cart.push(delta.item);
+            } else {
+                this.cart[index] = delta.item;
+            }
+        } else if (delta.op === 'remove') {
+            this.cart = this.cart.filter(item => !delta.book_ids.includes(item.book.id));
+        }
+        this.renderCart();
+        this.updateCartCount(this.cart.length);
+    }
+    
+    connectEvents() {
+        if (!this.authToken || this.events) return;
+        // fetch() rather than EventSource, which cannot send the Authorization header
+        const controller = new AbortController();
+        this.events = controller;
+        this.readEvents(controller)
+            .catch(() => { this.eventFailures = (this.eventFailures || 0) + 1; })
+            .finally(() => {
+                if (this.events !== controller) return;
+                this.events = null;
+                // Back off while the stream keeps failing (e.g. an expired token)
+                const delay = Math.min((this.eventRetryMs || 3000) * 2 ** (this.eventFailures || 0), 60000);
+                if (this.authToken) setTimeout(() => this.connectEvents(), delay);
+            });
+    }
+    
+    disconnectEvents() {
+        if (this.events) {
+            this.events.abort();
+            this.events = null;
+        }
+    }
+    
+    async readEvents(controller) {
+        const response = await this.makeRawRequest('/api/events', { signal: controller.signal });
+        this.eventFailures = 0;
+        // Events may have been missed while disconnected
+        this.loadCart();
+        const reader = response.body.pipeThrough(new TextDecoderStream()).getReader();
+        let buffer = '';
+        for (;;) {
+            const { value, done } = await reader.read();
+            if (done) return;
+            buffer += value;
+            let end;
+            while ((end = buffer.indexOf('\n\n')) !== -1) {
+                this.handleEvent(buffer.slice(0, end));
+                buffer = buffer.slice(end + 2);
+            }
+        }
+    }
+    
+    handleEvent(message) {
+        let type = 'message';
+        let data = '';
+        message.split('\n').forEach(line => {
+            if (line.startsWith('event: ')) type = line.slice(7);
+            else if (line.startsWith('data: ')) data += line.slice(6);
+            else if (line.startsWith('retry: ')) this.eventRetryMs = parseInt(line.slice(7), 10);
+        });
+        if (!data) return;  // keep-alive comment
+        const event = JSON.parse(data);
+        if (type === 'cart') {
+            this.applyCartDelta(event);
+        } else if (type === 'resync') {
+            this.loadCart();
+        } else if (type === 'catalog') {
+            // Prices or availability changed. Offer the latest listing rather
+            // than reloading it (and the pages loaded so far) under the reader
+            document.getElementById('catalog-updated').classList.remove('hidden');
+            if (this.cartLoaded) {
+                // Refetch the cart only if it is on screen; otherwise on next view
+                this.cartStale = true;
+                if (document.getElementById('cart-page').classList.contains('active')) this.loadCart();
+            }
         }
     }
     
@@ -2,9 +2,16 @@
 """
 BookBloom Application Runner
 Initializes database and starts the FastAPI server.
+
+    python run.py                          # development: auto-reload, one worker
+    python run.py --production             # one worker per core, uvloop/httptools
+    python run.py --production --workers 8 --access-log-sample 0.05
 """
 
-import asyncio
+import argparse
+import compileall
+import importlib.util
+import os
 import sys
 from pathlib import Path
 
@@ -14,27 +21,95 @@ bookbloom_path = project_root / "bookbloom"
 sys.path.insert(0, str(bookbloom_path))
 
 # pylint: disable=import-error,wrong-import-position
-from scripts.init_db import create_database
+from scripts.init_db import SCHEMA_VERSION, ensure_database
+from scripts.precompress_static import precompress_static
+
+
+def _fastest(module: str, fallback: str = "auto") -> str:
+    """Return `module` if it is installed (uvicorn[standard]), else uvicorn's default."""
+    return module if importlib.util.find_spec(module) is not None else fallback
+
+
+def parse_args(argv=None) -> argparse.Namespace:
+    """Parse command-line options; production defaults come from BOOKBLOOM_* env vars."""
+    parser = argparse.ArgumentParser(description="Run the BookBloom server.")
+    parser.add_argument("--production", action="store_true",
+                        default=os.environ.get("BOOKBLOOM_ENV") == "production",
+                        help="multi-worker mode without auto-reload (or BOOKBLOOM_ENV=production)")
+    parser.add_argument("--host", default=os.environ.get("BOOKBLOOM_HOST", "127.0.0.1"))
+    parser.add_argument("--port", type=int, default=int(os.environ.get("BOOKBLOOM_PORT", "8000")))
+    parser.add_argument("--workers", type=int,
+                        default=int(os.environ.get("BOOKBLOOM_WORKERS", str(os.cpu_count() or 1))),
+                        help="worker processes in production mode (default: CPU count)")
+    parser.add_argument("--access-log-sample", type=float,
+                        default=float(os.environ.get("BOOKBLOOM_ACCESS_LOG_SAMPLE", "0.01")),
+                        help="fraction of successful requests logged in production (0 disables)")
+    return parser.parse_args(argv)
+
+
+# Open /api/events streams would otherwise hold up reloads and shutdown until
+# they expire; clients reconnect to the new process on their own.
+GRACEFUL_SHUTDOWN_SECONDS = 5
 
 
-async def main():
+def server_options(args: argparse.Namespace) -> dict:
+    """Keyword arguments for uvicorn.run()."""
+    if not args.production:
+        return {"host": args.host, "port": args.port, "reload": True, "access_log": True,
+                "timeout_graceful_shutdown": GRACEFUL_SHUTDOWN_SECONDS}
+
+    # pylint: disable=import-outside-toplevel
+    from backend.access_log import build_log_config
+
+    options = {
+        "host": args.host,
+        "port": args.port,
+        "workers": max(1, args.workers),
+        "reload": False,
+        "loop": _fastest("uvloop"),
+        "http": _fastest("httptools"),
+        "access_log": args.access_log_sample > 0,
+        "proxy_headers": True,
+        "timeout_graceful_shutdown": GRACEFUL_SHUTDOWN_SECONDS,
+    }
+    if args.access_log_sample > 0:
+        options["log_config"] = build_log_config(args.access_log_sample)
+    return options
+
+
+def main(argv=None):
     """Initialize database and start the server."""
+    args = parse_args(argv)
     print("🌸 Starting BookBloom - Books Reborn, Knowledge Renewed")
     print("=" * 50)
 
-    # Initialize database
+    # Initialize database (once, before any worker starts)
     print("Initializing database...")
     try:
-        create_database()
-        print("✅ Database initialized successfully")
+        if ensure_database():
+            print("✅ Database initialized successfully")
+        else:
+            print(f"✅ Database schema is up to date (version {SCHEMA_VERSION})")
     except Exception as exc:  # pylint: disable=broad-except
         print(f"❌ Database initialization failed: {exc}")
         return 1
 
+    if args.production:
+        written = precompress_static()
+        print(f"✅ Static assets precompressed ({len(written)} variants updated)")
+        # Workers then load bytecode instead of compiling every module, even
+        # where PYTHONDONTWRITEBYTECODE is set (common in container images)
+        compileall.compile_dir(str(bookbloom_path), quiet=1)
+
+    options = server_options(args)
+
     # Start the server
     print("\n🚀 Starting FastAPI server...")
-    print("Server will be available at: http://127.0.0.1:8000")
-    print("API documentation: http://127.0.0.1:8000/docs")
+    if args.production:
+        print(f"Production mode: {options['workers']} workers, "
+              f"loop={options['loop']}, http={options['http']}")
+    print(f"Server will be available at: http://{args.host}:{args.port}")
+    print(f"API documentation: http://{args.host}:{args.port}/docs")
     print("\nPress Ctrl+C to stop the server")
     print("=" * 50)
 
@@ -42,21 +117,16 @@ async def main():
         # pylint: disable=import-outside-toplevel
         import uvicorn
 
-        uvicorn.run(
-            "backend.main:app",
-            host="127.0.0.1",
-            port=8000,
-            reload=True,
-            access_log=True
-        )
+        # Import string (not the app object) so reload and workers can re-import it
+        uvicorn.run("backend.main:app", **options)
     except KeyboardInterrupt:
         print("\n👋 BookBloom server stopped")
         return 0
     except Exception as exc:  # pylint: disable=broad-except
         print(f"❌ Server failed to start: {exc}")
         return 1
+    return 0
 
 
 if __name__ == "__main__":
-    exit_code = asyncio.run(main())
-    sys.exit(exit_code)
\ No newline at end of file
+    sys.exit(main())
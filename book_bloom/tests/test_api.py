@@ -0,0 +1,405 @@
+"""API tests for the BookBloom FastAPI application."""
+
+import os
+import re
+import sqlite3
+import sys
+
+import pytest
+from fastapi.testclient import TestClient
+
+# Make the bookbloom package importable the same way run.py does
+CURRENT_DIR = os.path.dirname(os.path.abspath(__file__))
+BOOKBLOOM_DIR = os.path.join(os.path.dirname(CURRENT_DIR), "bookbloom")
+if BOOKBLOOM_DIR not in sys.path:
+    sys.path.insert(0, BOOKBLOOM_DIR)
+
+# pylint: disable=import-error,wrong-import-position
+from backend.database import db  # noqa: E402
+from backend.main import app  # noqa: E402
+from scripts.init_db import create_database  # noqa: E402
+
+
+@pytest.fixture
+def client(tmp_path):
+    """Serve the app against a fresh sample database."""
+    original_path = db.db_path
+    db.db_path = create_database(str(tmp_path / "bookbloom.db"))
+    try:
+        with TestClient(app) as test_client:
+            yield test_client
+    finally:
+        db.db_path = original_path
+
+
+def test_list_books_keyset_pages_cover_catalog(client):
+    """Following X-Next-Cursor walks the whole catalog in (title, id) order."""
+    titles, cursor, pages = [], None, 0
+    while True:
+        params = {"limit": 3}
+        if cursor:
+            params["cursor"] = cursor
+        response = client.get("/api/books", params=params)
+        assert response.status_code == 200
+        assert response.headers["x-total-count"] == "10"
+        titles += [book["title"] for book in response.json()]
+        pages += 1
+        cursor = response.headers.get("x-next-cursor")
+        if not cursor:
+            break
+        assert 'rel="next"' in response.headers["link"]
+    assert pages == 4
+    assert titles == sorted(titles) and len(titles) == 10
+
+
+def test_list_books_field_projection_and_bad_input(client):
+    """fields= trims each row; unknown fields or cursors are rejected."""
+    response = client.get("/api/books", params={"fields": "title,price", "limit": 2})
+    assert response.status_code == 200
+    assert [set(book) for book in response.json()] == [{"title", "price"}] * 2
+
+    assert client.get("/api/books", params={"fields": "password_hash"}).status_code == 400
+    assert client.get("/api/books", params={"cursor": "not-a-cursor"}).status_code == 400
+
+
+def auth_headers(client, email="reader@example.com", password="secret123"):
+    """Register and log in a user; return bearer auth headers."""
+    client.post("/api/register", json={
+        "first_name": "Ada", "last_name": "Reader", "email": email, "password": password,
+    })
+    token = client.post("/api/login", json={"email": email, "password": password}).json()
+    return {"Authorization": f"Bearer {token['access_token']}"}
+
+
+def test_cart_and_checkout_fetch_books_in_one_query(client, monkeypatch):
+    """Cart views price every item with one bulk lookup; checkout prices in its INSERT."""
+    headers = auth_headers(client)
+    for book_id in (1, 2, 3, 4, 5):
+        client.post("/api/cart/add", json={"book_id": book_id, "quantity": 2}, headers=headers)
+
+    calls = []
+    original = db.get_books_by_ids
+
+    async def counting_get_books_by_ids(book_ids):
+        calls.append(list(book_ids))
+        return await original(book_ids)
+
+    async def fail_get_book_by_id(book_id):
+        raise AssertionError("cart paths must not look books up one by one")
+
+    monkeypatch.setattr(db, "get_books_by_ids", counting_get_books_by_ids)
+    monkeypatch.setattr(db, "get_book_by_id", fail_get_book_by_id)
+
+    cart = client.get("/api/cart", headers=headers).json()
+    order = client.post("/api/checkout", headers=headers).json()
+    assert [item["book"]["id"] for item in cart] == [1, 2, 3, 4, 5]
+    assert calls == [[1, 2, 3, 4, 5]]
+    assert order["total"] == pytest.approx(sum(float(item["subtotal"]) for item in cart))
+
+
+def test_checkout_persists_order_and_empties_cart(client):
+    """Checkout stores the order with its prices, and /api/orders lists it."""
+    headers = auth_headers(client)
+    client.post("/api/cart/add", json={"book_id": 1, "quantity": 2}, headers=headers)
+    client.post("/api/cart/add", json={"book_id": 7, "quantity": 1}, headers=headers)
+
+    order = client.post("/api/checkout", headers=headers).json()
+    assert isinstance(order["order_id"], int)
+    assert order["total"] == pytest.approx(2 * 12.99 + 15.99)
+    assert client.get("/api/cart", headers=headers).json() == []
+    assert client.post("/api/checkout", headers=headers).status_code == 400
+
+    orders = client.get("/api/orders", headers=headers).json()
+    assert [placed["id"] for placed in orders] == [order["order_id"]]
+    assert [(item["book_id"], item["quantity"], float(item["unit_price"]))
+            for item in orders[0]["items"]] == [(1, 2, 12.99), (7, 1, 15.99)]
+    assert client.get("/api/orders", headers=auth_headers(client, "other@example.com")).json() == []
+
+
+def test_cart_mutations_return_and_publish_deltas(client):
+    """Each cart change returns the delta it pushed to the user's event streams."""
+    from backend.events import hub, user_topic  # pylint: disable=import-outside-toplevel
+
+    headers = auth_headers(client)
+    user_id = client.get("/api/me", headers=headers).json()["id"]
+    with hub.subscribe(user_topic(user_id)) as subscription, hub.subscribe(user_topic(user_id + 1)) as other:
+        added = client.post("/api/cart/add", json={"book_id": 1, "quantity": 2}, headers=headers).json()
+        updated = client.put("/api/cart/1", params={"quantity": 3}, headers=headers).json()
+        client.post("/api/cart/add", json={"book_id": 7}, headers=headers)
+        removed = client.delete("/api/cart/7", headers=headers).json()
+        checked_out = client.post("/api/checkout", headers=headers).json()
+
+        assert added["cart_delta"]["op"] == "set" and added["cart_delta"]["quantity"] == 2
+        assert updated["cart_delta"]["item"]["quantity"] == 3
+        assert removed["cart_delta"] == {"type": "cart", "op": "remove", "book_ids": [7]}
+        assert checked_out["cart_delta"] == {"type": "cart", "op": "remove", "book_ids": [1]}
+        published = [subscription.queue.get_nowait() for _ in range(subscription.queue.qsize())]
+        assert len(published) == 5 and published[-1] == checked_out["cart_delta"]
+        assert other.queue.empty()
+
+    # A "set" item is exactly what GET /api/cart returns for that line
+    client.post("/api/cart/add", json={"book_id": 2, "quantity": 1}, headers=headers)
+    delta = client.post("/api/cart/add", json={"book_id": 2, "quantity": 1}, headers=headers).json()["cart_delta"]
+    assert client.get("/api/cart", headers=headers).json() == [delta["item"]]
+
+
+def test_checkout_with_redis_store_keeps_lines_added_meanwhile(client, monkeypatch):
+    """Outside the database, checkout removes only the ordered lines, like the SQLite path."""
+    # pylint: disable=import-outside-toplevel
+    from backend import main
+    from backend.carts import LocalRedis, RedisCartStore
+
+    monkeypatch.setattr(main, "cart_store", RedisCartStore(LocalRedis()))
+    headers = auth_headers(client)
+    user_id = client.get("/api/me", headers=headers).json()["id"]
+    client.post("/api/cart/add", json={"book_id": 1, "quantity": 2}, headers=headers)
+    client.post("/api/cart/add", json={"book_id": 7}, headers=headers)
+
+    place = main.order_writer.place
+
+    async def place_while_another_tab_adds(*args, **kwargs):
+        await main.cart_store.add(user_id, 2, 1)
+        return await place(*args, **kwargs)
+
+    monkeypatch.setattr(main.order_writer, "place", place_while_another_tab_adds)
+    order = client.post("/api/checkout", headers=headers).json()
+    assert order["cart_delta"] == {"type": "cart", "op": "remove", "book_ids": [1, 7]}
+    assert [(item["book"]["id"], item["quantity"]) for item in client.get("/api/cart", headers=headers).json()] == [(2, 1)]
+
+
+def test_checkout_with_redis_store_keeps_quantity_raised_meanwhile(client, monkeypatch):
+    """Copies added to an ordered line during checkout stay in the cart, unbilled."""
+    # pylint: disable=import-outside-toplevel
+    from backend import main
+    from backend.carts import LocalRedis, RedisCartStore
+
+    monkeypatch.setattr(main, "cart_store", RedisCartStore(LocalRedis()))
+    headers = auth_headers(client)
+    user_id = client.get("/api/me", headers=headers).json()["id"]
+    client.post("/api/cart/add", json={"book_id": 1, "quantity": 2}, headers=headers)
+
+    place = main.order_writer.place
+
+    async def place_while_another_tab_adds(*args, **kwargs):
+        await main.cart_store.add(user_id, 1, 3)
+        return await place(*args, **kwargs)
+
+    monkeypatch.setattr(main.order_writer, "place", place_while_another_tab_adds)
+    order = client.post("/api/checkout", headers=headers).json()
+    assert order["cart_delta"] is None
+    assert order["total"] == pytest.approx(2 * 12.99)
+    assert [(item["book"]["id"], item["quantity"]) for item in client.get("/api/cart", headers=headers).json()] == [(1, 3)]
+
+
+def test_current_user_cached_until_logout(client, monkeypatch):
+    """Repeat requests with one token skip the user lookup until logout evicts it."""
+    headers = auth_headers(client)
+    lookups = []
+    original = db.get_user_by_email
+
+    async def counting_get_user_by_email(email):
+        lookups.append(email)
+        return await original(email)
+
+    monkeypatch.setattr(db, "get_user_by_email", counting_get_user_by_email)
+
+    for _ in range(3):
+        assert client.get("/api/me", headers=headers).json()["email"] == "reader@example.com"
+    assert len(lookups) == 1
+
+    assert client.post("/api/logout", headers=headers).status_code == 200
+    client.get("/api/me", headers=headers)
+    assert len(lookups) == 2
+
+    assert client.get("/api/me", headers={"Authorization": "Bearer not-a-jwt"}).status_code == 401
+
+
+def test_user_change_evicts_every_cached_token(client):
+    """Re-registering a deleted account drops tokens cached for the old record."""
+    # pylint: disable=import-outside-toplevel
+    import sqlite3
+    from datetime import timedelta
+
+    from backend.auth import create_access_token, user_cache
+
+    first = auth_headers(client)
+    # A second token for the same account (another device)
+    second = {"Authorization": "Bearer " + create_access_token(
+        {"sub": "reader@example.com"}, expires_delta=timedelta(minutes=5))}
+    old_id = client.get("/api/me", headers=first).json()["id"]
+    client.get("/api/me", headers=second)
+    assert len(user_cache) == 2
+
+    with sqlite3.connect(db.db_path) as conn:
+        conn.execute("DELETE FROM users WHERE id = ?", (old_id,))
+    assert client.get("/api/me", headers=first).json()["id"] == old_id  # still cached
+    new_id = client.get("/api/me", headers=auth_headers(client)).json()["id"]
+
+    assert new_id != old_id
+    assert client.get("/api/me", headers=first).json()["id"] == new_id
+    assert client.get("/api/me", headers=second).json()["id"] == new_id
+
+
+def test_cart_persists_in_database_and_upserts_quantity(client):
+    """Cart lines live in SQLite, so a fresh store (another worker) sees them."""
+    from backend.carts import SQLiteCartStore  # pylint: disable=import-outside-toplevel
+
+    headers = auth_headers(client)
+    client.post("/api/cart/add", json={"book_id": 2, "quantity": 1}, headers=headers)
+    client.post("/api/cart/add", json={"book_id": 2, "quantity": 2}, headers=headers)
+    client.post("/api/cart/add", json={"book_id": 7}, headers=headers)
+    assert client.put("/api/cart/7", params={"quantity": 4}, headers=headers).status_code == 200
+    assert client.put("/api/cart/9", params={"quantity": 1}, headers=headers).status_code == 404
+    assert client.post("/api/cart/add", json={"book_id": 7, "quantity": -1},
+                       headers=headers).status_code == 400
+
+    user_id = client.get("/api/me", headers=headers).json()["id"]
+    lines = client.portal.call(SQLiteCartStore(db).items, user_id)
+    assert lines == [(2, 3), (7, 4)]
+
+    client.delete("/api/cart/2", headers=headers)
+    assert [item["book"]["id"] for item in client.get("/api/cart", headers=headers).json()] == [7]
+
+
+def test_list_books_fast_path_matches_model_serialization(client):
+    """orjson-encoded listings are byte-identical to serializing Book models."""
+    # pylint: disable=import-outside-toplevel
+    from fastapi.encoders import jsonable_encoder
+    from fastapi.responses import JSONResponse
+    from backend.models import Book
+
+    for params in ({"limit": 500}, {"search": "the"}):
+        response = client.get("/api/books", params=params)
+        assert response.headers["content-type"] == "application/json"
+        expected = JSONResponse(jsonable_encoder([Book(**book) for book in response.json()])).body
+        assert response.content == expected
+
+
+def test_catalog_etags_revalidate_until_a_book_changes(client):
+    """Unchanged catalog responses revalidate to 304; a book write changes the ETag."""
+    first = client.get("/api/books", params={"limit": 5})
+    etag = first.headers["etag"]
+    assert first.headers["cache-control"] == "no-cache" and "last-modified" in first.headers
+
+    cached = client.get("/api/books", params={"limit": 5}, headers={"If-None-Match": etag})
+    assert cached.status_code == 304 and cached.content == b""
+    assert client.get("/api/books", params={"limit": 6}, headers={"If-None-Match": etag}).status_code == 200
+
+    book = client.get("/api/books/3")
+    assert client.get("/api/books/3", headers={"If-None-Match": book.headers["etag"]}).status_code == 304
+
+    with sqlite3.connect(db.db_path) as conn:
+        conn.execute("UPDATE books SET price = 9.99 WHERE id = 3")
+    db.invalidate_books([3])
+
+    refreshed = client.get("/api/books", params={"limit": 5}, headers={"If-None-Match": etag})
+    assert refreshed.status_code == 200 and refreshed.headers["etag"] != etag
+    assert client.get("/api/books/3", headers={"If-None-Match": book.headers["etag"]}).json()["price"] == "9.99"
+
+
+def test_outside_book_write_refreshes_cached_body_and_etag(client, monkeypatch):
+    """A write by another process changes the book body, not just its ETag, once the version is re-read."""
+    headers = auth_headers(client)
+    client.post("/api/cart/add", json={"book_id": 1, "quantity": 2}, headers=headers)
+    before = client.get("/api/books/1")
+    assert before.json()["price"] == "12.99"
+    assert client.get("/api/cart", headers=headers).json()[0]["subtotal"] == "25.98"
+
+    with sqlite3.connect(db.db_path) as conn:
+        conn.execute("UPDATE books SET price = 99.99 WHERE id = 1")
+    # Stand-in for waiting out CATALOG_VERSION_TTL; no invalidate_books() call
+    monkeypatch.setattr(db.version_cache, "ttl", 0)
+    db.version_cache.clear()
+
+    after = client.get("/api/books/1", headers={"If-None-Match": before.headers["etag"]})
+    assert after.status_code == 200 and after.headers["etag"] != before.headers["etag"]
+    assert after.json()["price"] == "99.99"
+    assert client.get("/api/books/1", headers={"If-None-Match": after.headers["etag"]}).status_code == 304
+    assert client.get("/api/cart", headers=headers).json()[0]["subtotal"] == "199.98"
+
+
+def test_frontend_uses_fingerprinted_immutable_assets(client):
+    """index.html links assets by content hash; those URLs are cacheable for a year."""
+    page = client.get("/")
+    assert client.get("/", headers={"If-None-Match": page.headers["etag"]}).status_code == 304
+
+    script_url = re.search(r'src="(/static/app\.js\?v=\w+)"', page.text).group(1)
+    assert "immutable" in client.get(script_url).headers["cache-control"]
+    assert client.get("/static/app.js").headers["cache-control"] == "no-cache"
+
+
+def test_large_json_responses_are_compressed(client):
+    """JSON above the size threshold is gzip-encoded with a weak ETag; small bodies are not."""
+    listing = client.get("/api/books", params={"limit": 10}, headers={"Accept-Encoding": "gzip"})
+    assert listing.headers["content-encoding"] == "gzip"
+    assert listing.headers["etag"].startswith('W/"') and "Accept-Encoding" in listing.headers["vary"]
+    assert len(listing.json()) == 10
+
+    revalidated = client.get("/api/books", params={"limit": 10},
+                             headers={"Accept-Encoding": "gzip", "If-None-Match": listing.headers["etag"]})
+    assert revalidated.status_code == 304
+
+    small = client.get("/api/books/1", headers={"Accept-Encoding": "gzip"})
+    assert "content-encoding" not in small.headers
+
+
+def test_facets_and_filtered_listings(client):
+    """Facet counts come from the count table and match what the filters return."""
+    facets = client.get("/api/books/facets").json()
+    categories = {entry["value"]: entry["count"] for entry in facets["category"]}
+    assert categories == {"Fiction": 6, "Fantasy": 2, "Mystery": 1, "Romance": 1}
+    assert facets["price"] == [{"value": "10-20", "count": 10}]
+    assert [band["value"] for band in facets["price_bands"]] == ["under-10", "10-20", "20-50", "50-plus"]
+
+    fiction = client.get("/api/books", params={"category": "Fiction", "limit": 4})
+    assert fiction.headers["x-total-count"] == "6"
+    assert all(book["category"] == "Fiction" for book in fiction.json())
+    rest = client.get("/api/books", params={"category": "Fiction", "cursor": fiction.headers["x-next-cursor"]})
+    assert len(rest.json()) == 2
+
+    cheap_old = client.get("/api/books", params={"price_max": 13, "year_max": 1950}).json()
+    assert sorted(book["title"] for book in cheap_old) == ["Pride and Prejudice", "The Great Gatsby"]
+    assert [book["title"] for book in client.get(
+        "/api/books", params={"search": "the", "category": "Fantasy", "year_max": 1990}).json()] == ["The Hobbit"]
+    assert client.get("/api/books", params={"price_band": "cheap"}).status_code == 400
+
+    with sqlite3.connect(db.db_path) as conn:
+        conn.execute("UPDATE books SET category = 'Poetry', price = 60 WHERE id = 1")
+    db.invalidate_books([1])
+    facets = client.get("/api/books/facets").json()
+    assert {"value": "Poetry", "count": 1} in facets["category"]
+    assert {"value": "50-plus", "count": 1} in facets["price"]
+
+
+def test_metrics_record_route_latency_and_db_queries(client):
+    """/metrics reports per-route latency and the statements each request ran."""
+    metrics = client.get("/metrics")
+    assert metrics.status_code == 200
+    assert metrics.headers["content-type"].startswith("text/plain; version=0.0.4")
+
+    def samples():
+        text = client.get("/metrics").text
+        return dict(re.findall(r"^(\S+) (\S+)$", text, re.MULTILINE))
+
+    before = samples()
+    route = 'method="GET",route="/api/books/{book_id}"'
+    queries_key = f"bookbloom_db_queries_total{{{route}}}"
+    db.invalidate_books()
+    assert client.get("/api/books/4").status_code == 200
+    after = samples()
+    count_key = f"bookbloom_http_request_duration_seconds_count{{{route}}}"
+    assert int(after[count_key]) - int(before.get(count_key, 0)) == 1
+    # Catalog version plus the book row
+    assert int(after[queries_key]) - int(before.get(queries_key, 0)) == 2
+    assert f"bookbloom_http_requests_total{{{route},status=\"200\"}}" in after
+    assert after["bookbloom_http_requests_in_flight"] == "1"  # the scrape itself
+    assert 'bookbloom_cache_hits_total{cache="books"}' in after
+
+
+def test_login_rate_limit_returns_429_and_is_reported(client):
+    """A client past its login allowance gets 429 and the rejection shows in /metrics."""
+    credentials = {"email": "nobody@example.com", "password": "wrong-password"}
+    statuses = [client.post("/api/login", json=credentials).status_code for _ in range(11)]
+    assert statuses[:10] == [401] * 10
+    assert statuses[10] == 429
+    assert 'bookbloom_rate_limited_total{rule="login"} 1' in client.get("/metrics").text
@@ -0,0 +1,121 @@
+"""Tests for the BookBloom in-process cache."""
+
+import asyncio
+import os
+import sys
+
+# Make the bookbloom package importable the same way run.py does
+CURRENT_DIR = os.path.dirname(os.path.abspath(__file__))
+BOOKBLOOM_DIR = os.path.join(os.path.dirname(CURRENT_DIR), "bookbloom")
+if BOOKBLOOM_DIR not in sys.path:
+    sys.path.insert(0, BOOKBLOOM_DIR)
+
+# pylint: disable=import-error,wrong-import-position
+from backend.cache import AsyncTTLCache  # noqa: E402
+from backend.database import Database  # noqa: E402
+from scripts.init_db import create_database  # noqa: E402
+
+
+def test_concurrent_misses_share_one_load():
+    """Concurrent misses for one key run the loader once."""
+    cache = AsyncTTLCache(maxsize=4, ttl=60)
+    calls = []
+
+    async def loader():
+        calls.append(1)
+        await asyncio.sleep(0.01)
+        return "value"
+
+    async def scenario():
+        return await asyncio.gather(*(cache.get_or_load("k", loader) for _ in range(5)))
+
+    assert asyncio.run(scenario()) == ["value"] * 5
+    assert len(calls) == 1
+    assert (cache.misses, cache.coalesced) == (1, 4)
+
+
+def test_cancelled_loader_caller_does_not_fail_waiters():
+    """If the request that started a load goes away, waiters still get its result."""
+    cache = AsyncTTLCache(maxsize=4, ttl=60)
+    release = asyncio.Event()
+
+    async def loader():
+        await release.wait()
+        return "value"
+
+    async def scenario():
+        starter = asyncio.create_task(cache.get_or_load("k", loader))
+        await asyncio.sleep(0)
+        waiters = [asyncio.create_task(cache.get_or_load("k", loader)) for _ in range(3)]
+        await asyncio.sleep(0)
+        starter.cancel()
+        await asyncio.sleep(0)
+        release.set()
+        results = await asyncio.gather(*waiters)
+        return starter.cancelled(), results, cache.get("k")
+
+    assert asyncio.run(scenario()) == (True, ["value"] * 3, "value")
+
+
+def test_ttl_expiry_and_lru_eviction():
+    """Expired entries reload; the least recently used entry is evicted first."""
+    cache = AsyncTTLCache(maxsize=2, ttl=60)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    assert cache.get("a") == 1  # "b" is now least recently used
+    cache.set("c", 3)
+    assert cache.get("b") is None
+    assert cache.evictions == 1
+
+    expired = AsyncTTLCache(maxsize=2, ttl=0)
+    expired.set("a", 1)
+    assert expired.get("a") is None
+
+
+def test_invalidation_discards_in_flight_result():
+    """A load that started before invalidation does not repopulate the cache."""
+    cache = AsyncTTLCache(maxsize=4, ttl=60)
+
+    async def scenario():
+        started = asyncio.Event()
+
+        async def slow_loader():
+            started.set()
+            await asyncio.sleep(0.01)
+            return "stale"
+
+        task = asyncio.create_task(cache.get_or_load("k", slow_loader))
+        await started.wait()
+        cache.invalidate("k")
+        assert await task == "stale"
+
+    asyncio.run(scenario())
+    assert cache.get("k") is None
+
+
+def test_database_book_cache_and_invalidation(tmp_path):
+    """Book reads are cached until invalidate_books is called."""
+    database = Database(create_database(str(tmp_path / "bookbloom.db")))
+
+    async def scenario():
+        first = await database.get_book_by_id(1)
+        await database.get_book_by_id(1)
+        await database.get_books_by_ids([1, 2])
+        database.invalidate_books([1])
+        await database.get_book_by_id(1)
+        return first
+
+    assert asyncio.run(scenario())["id"] == 1
+    stats = database.cache_stats()["books"]
+    assert (stats["hits"], stats["misses"]) == (2, 3)
+
+
+def test_per_entry_ttl_and_invalidate_where():
+    """set() can shorten one entry's TTL; invalidate_where drops matching entries."""
+    cache = AsyncTTLCache(maxsize=4, ttl=60)
+    cache.set("short", 1, ttl=0)
+    cache.set("a", "alice")
+    cache.set("b", "bob")
+    assert cache.get("short") is None
+    assert cache.invalidate_where(lambda _key, value: value == "alice") == 1
+    assert (cache.get("a"), cache.get("b")) == (None, "bob")
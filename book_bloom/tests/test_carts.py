@@ -0,0 +1,100 @@
+"""Tests for the BookBloom cart stores."""
+
+import asyncio
+import os
+import sys
+
+import pytest
+
+# Make the bookbloom package importable the same way run.py does
+CURRENT_DIR = os.path.dirname(os.path.abspath(__file__))
+BOOKBLOOM_DIR = os.path.join(os.path.dirname(CURRENT_DIR), "bookbloom")
+if BOOKBLOOM_DIR not in sys.path:
+    sys.path.insert(0, BOOKBLOOM_DIR)
+
+# pylint: disable=import-error,wrong-import-position
+from backend.carts import CartStore, LocalRedis, RedisCartStore, SQLiteCartStore  # noqa: E402
+from backend.database import Database  # noqa: E402
+from scripts.init_db import create_database  # noqa: E402
+
+
+@pytest.mark.parametrize("backend", ["sqlite", "local"])
+def test_cart_store_concurrent_adds_and_updates(tmp_path, backend):
+    """Concurrent adds for one book accumulate; updates only touch existing lines."""
+    database = Database(create_database(str(tmp_path / "bookbloom.db")), pool_size=4)
+
+    async def scenario():
+        await database.connect()
+        try:
+            user = await database.create_user("Ada", "Reader", "ada@example.com", "secret123")
+            store = SQLiteCartStore(database) if backend == "sqlite" else RedisCartStore(LocalRedis())
+            added = await asyncio.gather(*(store.add(user["id"], 3, 1) for _ in range(20)))
+            assert sorted(added) == list(range(1, 21))  # each add sees its own new quantity
+            await store.add(user["id"], 5, 2)
+            assert await store.set_quantity(user["id"], 5, 7)
+            assert not await store.set_quantity(user["id"], 8, 1)
+            lines = sorted(await store.items(user["id"]))
+            await store.add(user["id"], 9, 1)
+            await store.add(user["id"], 8, 4)
+            # Line 8 was raised from 1 to 4 while checking out: 3 copies stay
+            assert await store.remove_ordered(user["id"], [(9, 1), (10, 1), (8, 1)]) == [(8, 3)]
+            assert await store.remove_ordered(user["id"], []) == []
+            await store.remove(user["id"], 8)
+            assert await store.remove(user["id"], 3)
+            assert not await store.remove(user["id"], 3)
+            await store.clear(user["id"])
+            return lines, await store.items(user["id"])
+        finally:
+            await database.disconnect()
+
+    assert asyncio.run(scenario()) == ([(3, 20), (5, 7)], [])
+
+
+class YieldingRedis:
+    """LocalRedis that yields before every command, like a network round trip."""
+
+    def __init__(self):
+        self._redis = LocalRedis()
+
+    def __getattr__(self, name):
+        command = getattr(self._redis, name)
+
+        async def call(*args):
+            await asyncio.sleep(0)
+            return await command(*args)
+        return call
+
+
+def test_redis_quantity_update_never_restores_a_removed_line():
+    """An update racing a delete or checkout leaves the line removed."""
+    store = RedisCartStore(YieldingRedis())
+
+    async def scenario():
+        await store.add(1, 4, 1)
+        updated, removed = await asyncio.gather(store.set_quantity(1, 4, 5), store.remove(1, 4))
+        assert updated and removed
+        await store.add(1, 6, 1)
+        left, updated = await asyncio.gather(store.remove_ordered(1, [(6, 1)]), store.set_quantity(1, 6, 3))
+        assert left == [] and not updated
+        return await store.items(1)
+
+    assert asyncio.run(scenario()) == []
+
+
+def test_incomplete_cart_backend_fails_when_built():
+    """A backend missing part of the interface cannot be instantiated."""
+    class NoClear(CartStore):  # pylint: disable=abstract-method
+        async def add(self, user_id, book_id, quantity):
+            return quantity
+
+        async def set_quantity(self, user_id, book_id, quantity):
+            return True
+
+        async def remove(self, user_id, book_id):
+            return True
+
+        async def items(self, user_id):
+            return []
+
+    with pytest.raises(TypeError, match="clear"):
+        NoClear()
@@ -0,0 +1,158 @@
+"""Tests for BookBloom database access (pooling, search)."""
+
+import asyncio
+import os
+import sqlite3
+import sys
+import threading
+
+import pytest
+
+# Make the bookbloom package importable the same way run.py does
+CURRENT_DIR = os.path.dirname(os.path.abspath(__file__))
+BOOKBLOOM_DIR = os.path.join(os.path.dirname(CURRENT_DIR), "bookbloom")
+if BOOKBLOOM_DIR not in sys.path:
+    sys.path.insert(0, BOOKBLOOM_DIR)
+
+# pylint: disable=import-error,wrong-import-position
+from backend import database as database_module  # noqa: E402
+from backend.database import Database  # noqa: E402
+from scripts.init_db import SCHEMA_VERSION, create_database, ensure_database, get_schema_version  # noqa: E402
+
+
+@pytest.fixture
+def db_path(tmp_path):
+    """Create a fresh sample database in a temporary directory."""
+    return create_database(str(tmp_path / "bookbloom.db"))
+
+
+def test_pool_reuses_connections_with_pragmas(db_path):
+    """Pooled connections stay open across calls and carry the WAL PRAGMAs."""
+
+    async def scenario():
+        database = Database(db_path, pool_size=2)
+        await database.connect()
+        try:
+            books = await asyncio.gather(*(database.get_book_by_id(i) for i in range(1, 11)))
+            async with database.connection() as conn:
+                async with conn.execute("PRAGMA journal_mode") as cursor:
+                    journal_mode = (await cursor.fetchone())[0]
+                async with conn.execute("PRAGMA synchronous") as cursor:
+                    synchronous = (await cursor.fetchone())[0]
+            opened = list(database.pool._connections)
+        finally:
+            await database.disconnect()
+        return books, journal_mode, synchronous, opened
+
+    books, journal_mode, synchronous, opened = asyncio.run(scenario())
+    assert all(book is not None for book in books)
+    assert journal_mode == "wal"
+    assert synchronous == 1  # NORMAL
+    assert len(opened) == 2
+
+
+def test_database_works_without_pool(db_path):
+    """Scripts that never open the pool still get one-off connections."""
+    database = Database(db_path)
+    books = asyncio.run(database.get_books("hobbit"))
+    assert [book["title"] for book in books] == ["The Hobbit"]
+
+
+def test_search_uses_ranked_prefix_fts_index(db_path):
+    """FTS search matches word prefixes in title or author and tracks writes."""
+    database = Database(db_path)
+    assert [b["title"] for b in asyncio.run(database.get_books("hob"))] == ["The Hobbit"]
+    assert [b["author"] for b in asyncio.run(database.get_books("TOLK"))] == ["J.R.R. Tolkien"]
+    assert asyncio.run(database.get_books("\"*")) == []
+
+    conn = sqlite3.connect(db_path)
+    conn.execute(
+        "INSERT INTO books (title, author, isbn) VALUES ('The Silmarillion', 'J.R.R. Tolkien', 'x1')"
+    )
+    conn.execute("UPDATE books SET title = 'There and Back Again' WHERE title = 'The Hobbit'")
+    conn.commit()
+    conn.close()
+
+    titles = [b["title"] for b in asyncio.run(database.get_books("tolkien"))]
+    assert sorted(titles) == ["The Silmarillion", "There and Back Again"]
+    assert asyncio.run(database.get_books("hobbit")) == []
+
+
+def test_get_books_by_ids_is_keyed_and_skips_unknown(db_path):
+    """Bulk lookup returns one entry per known id, regardless of duplicates."""
+    database = Database(db_path)
+    books = asyncio.run(database.get_books_by_ids([3, 1, 3, 999]))
+    assert sorted(books) == [1, 3]
+    assert books[3]["title"] == "1984"
+    assert asyncio.run(database.get_books_by_ids([])) == {}
+
+
+def test_book_count_estimate_seeks_both_ends_of_the_index(db_path):
+    """The estimate reads MIN and MAX with index seeks instead of scanning books."""
+    conn = sqlite3.connect(db_path)
+    plan = [row[3] for row in conn.execute("EXPLAIN QUERY PLAN " + database_module.ESTIMATE_BOOK_COUNT)]
+    conn.close()
+    assert not any(step.startswith("SCAN books") for step in plan)
+    assert [step for step in plan if step.startswith("SEARCH books")] == ["SEARCH books"] * 2
+    assert asyncio.run(Database(db_path).estimate_book_count()) == 10
+
+
+def test_password_work_runs_off_the_event_loop(db_path, monkeypatch):
+    """bcrypt hashing and verification run on the worker pool, not the loop thread."""
+    threads = []
+    original_verify = database_module.pwd_context.verify
+
+    def recording_verify(plain, hashed):
+        threads.append(threading.current_thread().name)
+        return original_verify(plain, hashed)
+
+    monkeypatch.setattr(database_module.pwd_context, "verify", recording_verify)
+    database = Database(db_path)
+
+    async def scenario():
+        user = await database.create_user("Ada", "Reader", "ada@example.com", "pw12345")
+        good = await database.check_password("pw12345", user["password_hash"])
+        bad = await database.check_password("wrong", user["password_hash"])
+        return good, bad
+
+    assert asyncio.run(scenario()) == (True, False)
+    assert threads and all(name.startswith("bookbloom-bcrypt") for name in threads)
+
+
+def test_ensure_database_skips_up_to_date_schema(tmp_path):
+    """Initialization runs for a new or outdated database and is skipped otherwise."""
+    path = str(tmp_path / "bookbloom.db")
+    assert ensure_database(path)
+    assert get_schema_version(path) == SCHEMA_VERSION
+    assert not ensure_database(path)
+
+    with sqlite3.connect(path) as conn:
+        conn.execute("PRAGMA user_version = 0")
+    assert ensure_database(path)
+    with sqlite3.connect(path) as conn:
+        assert conn.execute("SELECT COUNT(*) FROM books").fetchone()[0] == 10
+
+
+def test_price_band_and_year_filters_page_in_index_order(db_path):
+    """Band and single-year filters seek a (filter, title, id) index with no sort step."""
+    # pylint: disable=import-outside-toplevel
+    from backend.facets import BookFilter
+
+    conn = sqlite3.connect(db_path)
+    for book_filter in (BookFilter.from_params(price_band="10-20"),
+                        BookFilter.from_params(year_min=1997, year_max=1997)):
+        conditions, params = book_filter.where()
+        query = f"SELECT id FROM books WHERE {' AND '.join(conditions)} ORDER BY title, id LIMIT 5"
+        plan = [row[3] for row in conn.execute("EXPLAIN QUERY PLAN " + query, params)]
+        assert len(plan) == 1 and "_title" in plan[0], plan
+    assert conn.execute("SELECT COUNT(*) FROM books WHERE price_band = '10-20'").fetchone()[0] == 10
+
+    # A database from before the column existed gains it on upgrade
+    conn.execute("DROP INDEX idx_books_price_band_title")
+    conn.execute("ALTER TABLE books DROP COLUMN price_band")
+    conn.execute("PRAGMA user_version = 4")
+    conn.commit()
+    conn.close()
+    assert ensure_database(db_path)
+    with sqlite3.connect(db_path) as conn:
+        assert conn.execute("SELECT price_band FROM books WHERE id = 1").fetchone() == ("10-20",)
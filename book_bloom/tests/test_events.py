@@ -0,0 +1,119 @@
+"""Tests for BookBloom live updates (event hub and server-sent events)."""
+
+import asyncio
+import json
+import os
+import sys
+
+from starlette.applications import Starlette
+from starlette.responses import StreamingResponse
+from starlette.routing import Route
+from starlette.testclient import TestClient
+
+# Make the bookbloom package importable the same way run.py does
+CURRENT_DIR = os.path.dirname(os.path.abspath(__file__))
+BOOKBLOOM_DIR = os.path.join(os.path.dirname(CURRENT_DIR), "bookbloom")
+if BOOKBLOOM_DIR not in sys.path:
+    sys.path.insert(0, BOOKBLOOM_DIR)
+
+# pylint: disable=import-error,wrong-import-position
+from backend.compression import CompressionMiddleware  # noqa: E402
+from backend.events import (  # noqa: E402
+    CATALOG_TOPIC, CatalogWatcher, EventHub, cart_remove_event, event_stream, format_sse, user_topic
+)
+
+
+def test_hub_fans_out_per_user_and_resyncs_slow_streams():
+    """Events reach only their topic's subscribers; an overflowing queue collapses to a resync."""
+    hub = EventHub(queue_size=2)
+    first = hub.subscribe(user_topic(1), CATALOG_TOPIC)
+    second = hub.subscribe(user_topic(1))
+    other = hub.subscribe(user_topic(2))
+
+    assert hub.publish(user_topic(1), cart_remove_event([4])) == 2
+    assert hub.publish(CATALOG_TOPIC, {"type": "catalog", "version": 2}) == 1
+    assert other.queue.empty() and second.queue.qsize() == 1
+
+    hub.publish(user_topic(1), cart_remove_event([5]))  # first's queue is full now
+    assert first.queue.get_nowait() == {"type": "resync"} and first.queue.empty()
+    assert hub.overflows == 1
+
+    for subscription in (first, second, other):
+        subscription.close()
+    assert hub.subscriptions == 0
+    assert hub.publish(user_topic(1), cart_remove_event([4])) == 0
+
+
+def test_event_stream_sends_events_heartbeats_and_ends():
+    """The SSE body starts with a retry hint, keeps idle streams alive and unsubscribes at the end."""
+    hub = EventHub()
+
+    async def scenario():
+        subscription = hub.subscribe(user_topic(1))
+        stream = event_stream(subscription, heartbeat=0.01, max_age=10)
+        chunks = [await stream.__anext__(), await stream.__anext__()]
+        hub.publish(user_topic(1), cart_remove_event([3]))
+        chunks.append(await stream.__anext__())
+        hub.close_all()
+        chunks += [chunk async for chunk in stream]
+        return chunks
+
+    retry, keep_alive, event = asyncio.run(scenario())
+    assert retry.startswith(b"retry: ") and keep_alive == b": keep-alive\n\n"
+    assert event == format_sse(cart_remove_event([3]))
+    header, data = event.decode().strip().split("\n")
+    assert header == "event: cart" and json.loads(data[len("data: "):])["book_ids"] == [3]
+    assert hub.subscriptions == 0
+
+
+def test_shutdown_ends_streams_whose_queue_is_full():
+    """close_all ends a stream even when its reader has fallen behind."""
+    hub = EventHub(queue_size=2)
+
+    async def scenario():
+        subscription = hub.subscribe(user_topic(1))
+        stream = event_stream(subscription, heartbeat=10, max_age=10)
+        await stream.__anext__()
+        for book_id in range(2):
+            hub.publish(user_topic(1), cart_remove_event([book_id]))
+        assert subscription.queue.full()
+        hub.close_all()
+        hub.publish(user_topic(1), cart_remove_event([9]))
+        return [chunk async for chunk in stream]
+
+    assert asyncio.run(asyncio.wait_for(scenario(), 1)) == []
+    assert hub.subscriptions == 0
+
+
+def test_catalog_watcher_publishes_version_changes():
+    """Only a version that moved since the last read is published."""
+    hub = EventHub()
+    versions = iter([(1, "t1"), (1, "t1"), (2, "t2")])
+
+    async def read_version():
+        return next(versions)
+
+    async def scenario():
+        watcher = CatalogWatcher(hub, read_version)
+        with hub.subscribe(CATALOG_TOPIC) as subscription:
+            for _ in range(3):
+                await watcher.check()
+            return [subscription.queue.get_nowait() for _ in range(subscription.queue.qsize())]
+
+    assert asyncio.run(scenario()) == [{"type": "catalog", "version": 2, "updated_at": "t2"}]
+
+
+def test_compression_forwards_event_streams_unbuffered():
+    """Event streams pass through compression chunk by chunk and uncompressed."""
+    async def events(request):
+        async def body():
+            for number in range(3):
+                yield format_sse({"type": "tick", "n": number, "pad": "x" * 2000})
+        return StreamingResponse(body(), media_type="text/event-stream")
+
+    app = Starlette(routes=[Route("/api/events", events)])
+    app.add_middleware(CompressionMiddleware)
+    with TestClient(app).stream("GET", "/api/events", headers={"Accept-Encoding": "gzip"}) as response:
+        assert "content-encoding" not in response.headers
+        messages = [line for line in response.iter_lines() if line.startswith("event:")]
+    assert messages == ["event: tick"] * 3
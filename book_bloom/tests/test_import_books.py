@@ -0,0 +1,75 @@
+"""Tests for the BookBloom bulk import script."""
+
+import asyncio
+import json
+import os
+import sqlite3
+import sys
+
+# Make the bookbloom package importable the same way run.py does
+CURRENT_DIR = os.path.dirname(os.path.abspath(__file__))
+BOOKBLOOM_DIR = os.path.join(os.path.dirname(CURRENT_DIR), "bookbloom")
+if BOOKBLOOM_DIR not in sys.path:
+    sys.path.insert(0, BOOKBLOOM_DIR)
+
+# pylint: disable=import-error,wrong-import-position
+from backend.database import Database  # noqa: E402
+from scripts.import_books import import_books  # noqa: E402
+from scripts.init_db import create_database  # noqa: E402
+
+
+def test_import_upserts_on_isbn_and_rebuilds_indexes(tmp_path):
+    """CSV and JSONL feeds upsert on isbn; indexes, triggers and search survive the load."""
+    db_path = create_database(str(tmp_path / "bookbloom.db"))
+    with sqlite3.connect(db_path) as conn:
+        schema_before = sorted(conn.execute(
+            "SELECT type, name FROM sqlite_master WHERE tbl_name = 'books'").fetchall())
+        version_before = conn.execute("SELECT version FROM catalog_version").fetchone()[0]
+
+    csv_feed = tmp_path / "feed.csv"
+    csv_feed.write_text(
+        "title,author,isbn,year_of_release,price,category,state\n"
+        "Dune,Frank Herbert,9780441013593,1965,9.99,Science Fiction,Good\n"
+        ",Nobody,0000000000000,2000,1,Fiction,good\n"
+        "The Hobbit (Anniversary),J.R.R. Tolkien,9780547928227,1937,19.5,Fantasy,mint\n"
+    )
+    jsonl_feed = tmp_path / "feed.jsonl"
+    jsonl_feed.write_text("\n".join(json.dumps(record) for record in [
+        {"title": "Neuromancer", "author": "William Gibson", "isbn": "9780441569595", "price": 8.5},
+        {"title": "Dune Messiah", "author": "Frank Herbert", "isbn": "9780593098233"},
+    ]) + "\n")
+
+    csv_stats = import_books(str(csv_feed), db_path, batch_size=1, progress=lambda line: None)
+    jsonl_stats = import_books(str(jsonl_feed), db_path, progress=lambda line: None)
+    assert (csv_stats["read"], csv_stats["imported"], csv_stats["rejected"]) == (3, 2, 1)
+    assert jsonl_stats["imported"] == 2
+
+    with sqlite3.connect(db_path) as conn:
+        assert conn.execute("SELECT COUNT(*) FROM books").fetchone()[0] == 10 + 3
+        hobbit = conn.execute(
+            "SELECT title, price, state FROM books WHERE isbn = '9780547928227'").fetchone()
+        assert hobbit == ("The Hobbit (Anniversary)", 19.5, None)
+        assert sorted(conn.execute(
+            "SELECT type, name FROM sqlite_master WHERE tbl_name = 'books'").fetchall()) == schema_before
+        assert conn.execute("SELECT version FROM catalog_version").fetchone()[0] == version_before + 2
+
+    found = asyncio.run(Database(db_path).get_books("dune"))
+    assert [book["title"] for book in found] == ["Dune", "Dune Messiah"]
+
+
+def test_import_rejects_non_finite_numbers(tmp_path):
+    """NaN and infinite years or prices drop their row instead of aborting the import."""
+    db_path = create_database(str(tmp_path / "bookbloom.db"))
+    feed = tmp_path / "feed.csv"
+    feed.write_text(
+        "title,author,isbn,year_of_release,price,category,state\n"
+        "Dune,Frank Herbert,9780441013593,1965,9.99,Science Fiction,good\n"
+        "Bad Year,Someone,1111111111111,nan,5,Fiction,good\n"
+        "Big Year,Someone,2222222222222,inf,5,Fiction,good\n"
+        "Bad Price,Someone,3333333333333,2001,NaN,Fiction,good\n"
+        "Huge Year,Someone,4444444444444,1e300,5,Fiction,good\n"
+    )
+    stats = import_books(str(feed), db_path, progress=lambda line: None)
+    assert (stats["read"], stats["imported"], stats["rejected"]) == (5, 1, 4)
+    with sqlite3.connect(db_path) as conn:
+        assert conn.execute("SELECT COUNT(*) FROM books WHERE isbn = '9780441013593'").fetchone()[0] == 1
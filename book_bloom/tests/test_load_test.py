@@ -0,0 +1,76 @@
+"""Tests for the BookBloom load-testing harness (benchmarks/load_test.py) and benchmarks."""
+
+import asyncio
+import importlib.util
+import os
+import sqlite3
+
+CURRENT_DIR = os.path.dirname(os.path.abspath(__file__))
+LOAD_TEST_PATH = os.path.join(os.path.dirname(CURRENT_DIR), "benchmarks", "load_test.py")
+
+
+
+def load_benchmark(name):
+    # benchmarks/ is a directory of scripts, not a package
+    spec = importlib.util.spec_from_file_location(name, os.path.join(os.path.dirname(LOAD_TEST_PATH), f"{name}.py"))
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+load_test = load_benchmark("load_test")
+
+
+def test_every_scenario_runs_cleanly_in_process(tmp_path):
+    """A small seeded run exercises all scenarios without errors."""
+    # pylint: disable=import-error,import-outside-toplevel
+    from backend.database import db
+
+    db_path = load_test.seed_database(str(tmp_path / "load.db"), books=500, users=4, progress=lambda line: None)
+    with sqlite3.connect(db_path) as conn:
+        assert conn.execute("SELECT COUNT(*) FROM books").fetchone()[0] == 510
+        assert conn.execute("SELECT COUNT(*) FROM users").fetchone()[0] == 4
+
+    config = load_test.LoadConfig(requests=40, concurrency=2, logins=2, users=4)
+    original_path, db.db_path = db.db_path, db_path
+    try:
+        summaries = asyncio.run(load_test.run_in_process(list(load_test.SCENARIOS), config, progress=lambda line: None))
+    finally:
+        db.db_path = original_path
+
+    assert set(summaries) == set(load_test.SCENARIOS)
+    for summary in summaries.values():
+        assert summary["errors"] == 0
+        assert summary["requests"] > 0
+        assert summary["p50_ms"] <= summary["p95_ms"] <= summary["p99_ms"]
+
+
+def test_compare_flags_only_changes_beyond_tolerance():
+    """Throughput drops, latency rises and new errors are regressions; noise is not."""
+    def report(rps, p95, errors=0):
+        return {"scenarios": {"browse": {
+            "throughput_rps": rps, "p95_ms": p95, "p99_ms": p95 * 2, "errors": errors,
+        }}}
+
+    baseline = report(1000.0, 10.0)
+    assert not load_test.compare_results(baseline, report(900.0, 11.0))
+    regressions = load_test.compare_results(baseline, report(700.0, 15.0, errors=3))
+    assert len(regressions) == 4
+    assert regressions[0].startswith("browse: throughput")
+
+
+def test_login_burst_benchmark_runs_past_the_login_rate_limit(tmp_path):
+    """In-process benchmarks share one client address, so they run with rate limits off."""
+    # pylint: disable=import-error,import-outside-toplevel
+    from backend.database import db
+    from backend.rate_limit import admission
+    from scripts.init_db import create_database
+
+    bench_login_burst = load_benchmark("bench_login_burst")
+    enabled = admission.enabled
+    original_path, db.db_path = db.db_path, create_database(str(tmp_path / "burst.db"))
+    try:
+        latencies, _ = asyncio.run(bench_login_burst.bench(logins=12, catalog_clients=1))
+    finally:
+        db.db_path = original_path
+    assert latencies and admission.enabled == enabled
@@ -0,0 +1,64 @@
+"""Tests for the BookBloom request metrics."""
+
+import os
+import sys
+
+from starlette.applications import Starlette
+from starlette.responses import PlainTextResponse
+from starlette.routing import Route
+from starlette.testclient import TestClient
+
+# Make the bookbloom package importable the same way run.py does
+CURRENT_DIR = os.path.dirname(os.path.abspath(__file__))
+BOOKBLOOM_DIR = os.path.join(os.path.dirname(CURRENT_DIR), "bookbloom")
+if BOOKBLOOM_DIR not in sys.path:
+    sys.path.insert(0, BOOKBLOOM_DIR)
+
+# pylint: disable=import-error,wrong-import-position
+from backend.metrics import MetricsMiddleware, MetricsRegistry, record_query  # noqa: E402
+
+
+def make_client(registry, server_timing=False):
+    """A tiny app whose one route runs two 'queries'."""
+    async def endpoint(request):
+        record_query(0.004)
+        record_query(0.006)
+        return PlainTextResponse("ok")
+
+    app = Starlette(routes=[Route("/items/{item_id}", endpoint)])
+    app.add_middleware(MetricsMiddleware, metrics=registry, server_timing=server_timing)
+    return TestClient(app)
+
+
+def test_routes_are_labelled_by_template_and_histograms_are_cumulative():
+    """Paths collapse to their route template; unknown paths share one label."""
+    registry = MetricsRegistry()
+    client = make_client(registry)
+    for item_id in (1, 2, 3):
+        client.get(f"/items/{item_id}")
+    client.get("/missing")
+
+    text = registry.render()
+    route = 'method="GET",route="/items/{item_id}"'
+    assert f'bookbloom_http_requests_total{{{route},status="200"}} 3' in text
+    assert 'bookbloom_http_requests_total{method="GET",route="unmatched",status="404"} 1' in text
+    assert f'bookbloom_http_request_duration_seconds_bucket{{{route},le="+Inf"}} 3' in text
+    assert f"bookbloom_db_queries_total{{{route}}} 6" in text
+    assert f'bookbloom_db_queries_per_request_bucket{{{route},le="1"}} 0' in text
+    assert f'bookbloom_db_queries_per_request_bucket{{{route},le="2"}} 3' in text
+    assert "bookbloom_http_requests_in_flight 0" in text
+
+
+def test_server_timing_header_is_optional():
+    """Server-Timing reports database time and statement count when enabled."""
+    assert "server-timing" not in make_client(MetricsRegistry()).get("/items/1").headers
+
+    header = make_client(MetricsRegistry(), server_timing=True).get("/items/1").headers["server-timing"]
+    assert header.startswith('db;dur=10.00;desc="2 queries", app;dur=')
+
+
+def test_queries_outside_a_request_are_ignored():
+    """Startup and background statements do not leak into request metrics."""
+    registry = MetricsRegistry()
+    registry.record_query(0.5)
+    assert "bookbloom_db_queries_total{" not in registry.render()
@@ -0,0 +1,139 @@
+"""Tests for BookBloom order persistence and group commit."""
+
+import asyncio
+import os
+import sqlite3
+import sys
+
+import pytest
+
+# Make the bookbloom package importable the same way run.py does
+CURRENT_DIR = os.path.dirname(os.path.abspath(__file__))
+BOOKBLOOM_DIR = os.path.join(os.path.dirname(CURRENT_DIR), "bookbloom")
+if BOOKBLOOM_DIR not in sys.path:
+    sys.path.insert(0, BOOKBLOOM_DIR)
+
+# pylint: disable=import-error,wrong-import-position
+from backend.carts import SQLiteCartStore  # noqa: E402
+from backend.database import Database  # noqa: E402
+from backend.orders import EmptyOrderError, OrderWriter, OrderWriterStopped, PendingOrder  # noqa: E402
+from scripts.init_db import create_database  # noqa: E402
+
+
+def test_concurrent_checkouts_share_batched_commits(tmp_path):
+    """A burst of checkouts is written in a few transactions, each order intact."""
+    path = create_database(str(tmp_path / "bookbloom.db"))
+    with sqlite3.connect(path) as conn:
+        conn.executemany(
+            "INSERT INTO users (first_name, last_name, email, password_hash) VALUES ('Ada', 'Reader', ?, 'x')",
+            [(f"ada{n}@example.com",) for n in range(40)],
+        )
+    database = Database(path, pool_size=4)
+    writer = OrderWriter(database, batch_size=16, batch_window=0.01)
+    carts = SQLiteCartStore(database)
+
+    async def scenario():
+        await database.connect()
+        await writer.start()
+        try:
+            user_ids = list(range(1, 41))
+            for user_id in user_ids:
+                await carts.add(user_id, 3, 2)
+            orders = await asyncio.gather(*(writer.place(user_id) for user_id in user_ids))
+            with pytest.raises(EmptyOrderError):
+                await writer.place(1, [(999, 1)])
+            remaining = [await carts.items(user_id) for user_id in user_ids]
+            return orders, remaining
+        finally:
+            await writer.stop()
+            await database.disconnect()
+
+    orders, remaining = asyncio.run(scenario())
+    assert len({order["id"] for order in orders}) == 40
+    assert all(order["total"] == pytest.approx(2 * 13.99) for order in orders)
+    assert remaining == [[]] * 40
+    assert writer.stats()["orders"] == 40
+    assert writer.stats()["failures"] == 1
+    # 40 orders plus the failed one, in batches of up to 16
+    assert 3 <= writer.stats()["batches"] < 41
+
+    with sqlite3.connect(path) as conn:
+        assert conn.execute("SELECT COUNT(*), SUM(quantity) FROM order_items").fetchone() == (40, 80)
+        assert conn.execute("SELECT COUNT(*) FROM orders").fetchone() == (40,)
+
+
+def test_orders_without_a_running_writer_commit_individually(tmp_path):
+    """Outside the app lifespan each order is its own transaction."""
+    database = Database(create_database(str(tmp_path / "bookbloom.db")))
+    writer = OrderWriter(database)
+
+    async def scenario():
+        user = await database.create_user("Ada", "Reader", "ada@example.com", "secret123")
+        order = await writer.place(user["id"], [(1, 1), (2, 3)])
+        return order, await writer.get_orders(user["id"])
+
+    order, orders = asyncio.run(scenario())
+    assert order["total"] == pytest.approx(12.99 + 3 * 14.99)
+    assert orders[0]["id"] == order["id"] and len(orders[0]["items"]) == 2
+    assert writer.stats()["batches"] == 1
+
+
+def test_cart_is_read_and_emptied_inside_the_order_transaction(tmp_path):
+    """A quantity changed while the order waits for its batch is what gets ordered."""
+    database = Database(create_database(str(tmp_path / "bookbloom.db")))
+    writer = OrderWriter(database, batch_window=0.05)
+    carts = SQLiteCartStore(database)
+
+    async def scenario():
+        await database.connect()
+        await writer.start()
+        try:
+            user = await database.create_user("Ada", "Reader", "ada@example.com", "secret123")
+            await carts.add(user["id"], 3, 2)
+            placing = asyncio.ensure_future(writer.place(user["id"]))
+            await asyncio.sleep(0)
+            assert await carts.set_quantity(user["id"], 3, 5)
+            order = await placing
+            with pytest.raises(EmptyOrderError):
+                await writer.place(user["id"])
+            return order, await carts.items(user["id"])
+        finally:
+            await writer.stop()
+            await database.disconnect()
+
+    order, remaining = asyncio.run(scenario())
+    assert order["lines"] == [(3, 5)]
+    assert order["items"][0]["quantity"] == 5
+    assert order["total"] == pytest.approx(5 * 13.99)
+    assert remaining == []
+
+
+def test_stop_fails_orders_it_did_not_write(tmp_path):
+    """Checkouts arriving during shutdown fail instead of waiting forever."""
+    database = Database(create_database(str(tmp_path / "bookbloom.db")))
+    writer = OrderWriter(database, batch_window=0.01)
+
+    async def scenario():
+        await database.connect()
+        await writer.start()
+        try:
+            user = await database.create_user("Ada", "Reader", "ada@example.com", "secret123")
+            queued = asyncio.ensure_future(writer.place(user["id"], [(1, 1)]))
+            await asyncio.sleep(0)
+            # An order that slipped in behind the stop sentinel
+            late = PendingOrder(user["id"], [(2, 1)], asyncio.get_running_loop().create_future())
+            stopping = asyncio.ensure_future(writer.stop())
+            await asyncio.sleep(0)
+            writer._queue.put_nowait(late)  # pylint: disable=protected-access
+            with pytest.raises(OrderWriterStopped):
+                await writer.place(user["id"], [(3, 1)])
+            await stopping
+            with pytest.raises(OrderWriterStopped):
+                await late.future
+            return await queued, await writer.get_orders(user["id"])
+        finally:
+            await database.disconnect()
+
+    order, orders = asyncio.run(scenario())
+    assert [placed["id"] for placed in orders] == [order["id"]]
+    assert writer.stats()["failures"] == 1
@@ -0,0 +1,99 @@
+"""Tests for BookBloom rate limiting and admission control."""
+
+import asyncio
+import os
+import sys
+
+from starlette.applications import Starlette
+from starlette.responses import PlainTextResponse
+from starlette.routing import Route
+from starlette.testclient import TestClient
+
+# Make the bookbloom package importable the same way run.py does
+CURRENT_DIR = os.path.dirname(os.path.abspath(__file__))
+BOOKBLOOM_DIR = os.path.join(os.path.dirname(CURRENT_DIR), "bookbloom")
+if BOOKBLOOM_DIR not in sys.path:
+    sys.path.insert(0, BOOKBLOOM_DIR)
+
+# pylint: disable=import-error,wrong-import-position
+from backend.rate_limit import (  # noqa: E402
+    AdmissionController, AdmissionMiddleware, RateLimitRule, parse_rate
+)
+
+LOGIN = RateLimitRule("login", "POST", "/api/login", limit=3, period=60)
+SEARCH = RateLimitRule("search", "GET", "/api/books", limit=2, period=1, query_param="search")
+
+
+def test_token_bucket_bursts_then_refills_per_client():
+    """A client gets `limit` requests at once, then one per refill interval."""
+    controller = AdmissionController((LOGIN,), enabled=True)
+    assert [controller.take(LOGIN, "1.1.1.1", now=0) for _ in range(3)] == [0, 0, 0]
+    assert controller.take(LOGIN, "1.1.1.1", now=0) == 20  # one token per 20 s
+    assert controller.take(LOGIN, "2.2.2.2", now=0) == 0
+    assert controller.take(LOGIN, "1.1.1.1", now=20) == 0
+    assert controller.rate_limited == {"login": 1}
+
+    assert parse_rate("10/minute") == (10, 60.0)
+    assert parse_rate("off") is None
+
+
+def test_middleware_rejects_with_429_by_route_and_ignores_other_paths():
+    """Only matching requests spend tokens; a 429 carries Retry-After."""
+    async def endpoint(request):
+        return PlainTextResponse("ok")
+
+    controller = AdmissionController((SEARCH,), enabled=True)
+    app = Starlette(routes=[Route("/api/books", endpoint)])
+    app.add_middleware(AdmissionMiddleware, controller=controller)
+    client = TestClient(app)
+
+    statuses = [client.get("/api/books", params={"search": "tolkien"}).status_code for _ in range(3)]
+    assert statuses == [200, 200, 429]
+    limited = client.get("/api/books", params={"search": "tolkien"})
+    assert limited.headers["retry-after"] == "1"
+    assert client.get("/api/books").status_code == 200  # plain listing is not a search
+
+
+def test_concurrency_limit_queues_then_sheds_with_503():
+    """Past max_concurrency requests wait; past the queue or its timeout they get 503."""
+    controller = AdmissionController((), max_concurrency=2, max_queue=1, queue_timeout=0.05, enabled=True)
+    release = asyncio.Event()
+
+    async def endpoint(request):
+        await release.wait()
+        return PlainTextResponse("ok")
+
+    app = Starlette(routes=[Route("/slow", endpoint)])
+    app.add_middleware(AdmissionMiddleware, controller=controller)
+
+    async def call():
+        messages = []
+
+        async def receive():
+            return {"type": "http.request", "body": b"", "more_body": False}
+
+        async def send(message):
+            messages.append(message)
+
+        scope = {"type": "http", "method": "GET", "path": "/slow", "query_string": b"",
+                 "headers": [], "client": ("10.0.0.1", 1234)}
+        await app(scope, receive, send)
+        return messages[0]["status"]
+
+    async def scenario():
+        running = [asyncio.create_task(call()) for _ in range(2)]
+        await asyncio.sleep(0.01)
+        queued = asyncio.create_task(call())      # waits for a slot, then times out
+        await asyncio.sleep(0.01)
+        rejected = await call()                   # queue is full: shed at once
+        timed_out = await queued
+        assert controller.in_flight == 2
+        waiting = asyncio.create_task(call())     # gets the first slot released
+        await asyncio.sleep(0.01)
+        release.set()
+        return rejected, timed_out, await asyncio.gather(*running, waiting)
+
+    rejected, timed_out, served = asyncio.run(scenario())
+    assert (rejected, timed_out) == (503, 503)
+    assert served == [200, 200, 200]
+    assert controller.shed == 2 and controller.in_flight == 0
@@ -0,0 +1,51 @@
+"""Tests for BookBloom startup cost and schema checks."""
+
+import os
+import subprocess
+import sys
+
+from fastapi.testclient import TestClient
+
+# Make the bookbloom package importable the same way run.py does
+CURRENT_DIR = os.path.dirname(os.path.abspath(__file__))
+BOOKBLOOM_DIR = os.path.join(os.path.dirname(CURRENT_DIR), "bookbloom")
+if BOOKBLOOM_DIR not in sys.path:
+    sys.path.insert(0, BOOKBLOOM_DIR)
+
+# pylint: disable=import-error,wrong-import-position
+from backend.database import db  # noqa: E402
+from backend.main import app  # noqa: E402
+from scripts.init_db import SCHEMA_VERSION, get_schema_version  # noqa: E402
+
+
+def test_importing_the_app_defers_crypto_libraries():
+    """JWT and bcrypt libraries load on first use, not when a worker imports the app."""
+    probe = (
+        "import sys; import backend.main; "
+        "print(sorted(name for name in ('jose', 'passlib', 'bcrypt') if name in sys.modules))"
+    )
+    output = subprocess.run([sys.executable, "-c", probe], cwd=BOOKBLOOM_DIR, check=True,
+                            capture_output=True, text=True).stdout
+    assert output.strip().splitlines()[-1] == "[]"
+
+
+def test_invalid_email_is_rejected(tmp_path):
+    original_path, db.db_path = db.db_path, str(tmp_path / "fresh.db")
+    try:
+        with TestClient(app) as client:
+            response = client.post("/api/login", json={"email": "not-an-email", "password": "secret123"})
+    finally:
+        db.db_path = original_path
+    assert response.status_code == 422
+
+
+def test_lifespan_creates_a_missing_schema(tmp_path):
+    """Starting the app directly (without run.py) still gets a current schema."""
+    path = str(tmp_path / "fresh.db")
+    original_path, db.db_path = db.db_path, path
+    try:
+        with TestClient(app) as client:
+            assert client.get("/api/books/1").status_code == 200
+    finally:
+        db.db_path = original_path
+    assert get_schema_version(path) == SCHEMA_VERSION
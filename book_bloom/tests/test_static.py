@@ -0,0 +1,42 @@
+"""Tests for BookBloom static asset serving."""
+
+import gzip
+import os
+import sys
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+# Make the bookbloom package importable the same way run.py does
+CURRENT_DIR = os.path.dirname(os.path.abspath(__file__))
+BOOKBLOOM_DIR = os.path.join(os.path.dirname(CURRENT_DIR), "bookbloom")
+if BOOKBLOOM_DIR not in sys.path:
+    sys.path.insert(0, BOOKBLOOM_DIR)
+
+# pylint: disable=import-error,wrong-import-position
+from backend.http_cache import CachedStaticFiles  # noqa: E402
+from scripts.precompress_static import precompress_static  # noqa: E402
+
+
+def test_precompressed_variants_follow_accept_encoding(tmp_path):
+    """The build step writes .gz siblings that are served without compressing per request."""
+    script = "function greet() { return 'hello bookbloom'; }\n" * 200
+    (tmp_path / "app.js").write_text(script)
+
+    written = precompress_static(str(tmp_path))
+    assert str(tmp_path / "app.js.gz") in written
+    assert precompress_static(str(tmp_path)) == []  # up to date, nothing rewritten
+
+    app = FastAPI()
+    app.mount("/static", CachedStaticFiles(directory=str(tmp_path)), name="static")
+    client = TestClient(app)
+
+    raw = client.get("/static/app.js", headers={"Accept-Encoding": "gzip"})
+    assert raw.headers["content-encoding"] == "gzip"
+    assert raw.headers["content-type"].startswith("text/javascript")
+    assert int(raw.headers["content-length"]) == len(gzip.compress(script.encode(), 9, mtime=0))
+    assert raw.text == script
+    assert raw.headers["vary"] == "Accept-Encoding"
+
+    plain = client.get("/static/app.js", headers={"Accept-Encoding": "identity"})
+    assert "content-encoding" not in plain.headers and plain.text == script
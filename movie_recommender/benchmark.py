@@ -0,0 +1,205 @@
+"""Performance benchmark for the movie recommender.
+
+For each catalog size, generates a synthetic CSV (see generate_catalog.py) and
+measures `load_and_clean` wall time and peak traced memory, `build_ranking`
+time, and per-query latency of `top_n_by_genre` with and without the
+precomputed ranking tables. Results are written to JSON so runs can be
+compared across versions.
+
+Usage:
+    python benchmark.py --rows 100000 1000000 --output bench.json
+    python benchmark.py --rows 100000 --baseline bench.json
+"""
+
+from __future__ import annotations
+
+import argparse
+from datetime import datetime, timezone
+import json
+import platform
+from pathlib import Path
+import random
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from typing import Any
+
+import pandas as pd
+
+from generate_catalog import GENRE_WEIGHTS, generate_catalog
+from movie_recommender import MovieDataIO, build_ranking, top_n_by_genre
+
+
+def _percentile(samples: list[float], pct: float) -> float:
+    ordered = sorted(samples)
+    rank = max(0, min(len(ordered) - 1, round(pct / 100 * len(ordered)) - 1))
+    return ordered[rank]
+
+
+def _latency_summary(samples: list[float]) -> dict[str, float]:
+    return {
+        "p50_ms": round(_percentile(samples, 50) * 1000, 4),
+        "p99_ms": round(_percentile(samples, 99) * 1000, 4),
+        "mean_ms": round(sum(samples) / len(samples) * 1000, 4),
+    }
+
+
+def _git_revision() -> str | None:
+    try:
+        out = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True, text=True, check=True, cwd=Path(__file__).parent,
+        )
+    except (OSError, subprocess.CalledProcessError):
+        return None
+    return out.stdout.strip() or None
+
+
+def time_queries(fn, genres: list[str], queries: int, n: int) -> dict[str, float]:
+    """Run `fn(genre, n)` for `queries` random genres and summarize latency."""
+    rng = random.Random(0)
+    samples = []
+    for _ in range(queries):
+        genre = rng.choice(genres)
+        start = time.perf_counter()
+        fn(genre, n)
+        samples.append(time.perf_counter() - start)
+    return _latency_summary(samples)
+
+
+def benchmark_catalog(csv_path: Path, queries: int = 500, n: int = 5) -> dict[str, Any]:
+    """Measure load, ranking and query costs for one catalog file."""
+    io = MovieDataIO()
+
+    tracemalloc.start()
+    start = time.perf_counter()
+    result = io.load_and_clean(csv_path)
+    load_seconds = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    df = result.dataframe
+    start = time.perf_counter()
+    ranking = build_ranking(df)
+    ranking_seconds = time.perf_counter() - start
+
+    genres = list(GENRE_WEIGHTS)
+    return {
+        "raw_rows": result.raw_row_count,
+        "clean_rows": len(df),
+        "dropped_non_numeric_rating": result.dropped_non_numeric_rating,
+        "dropped_missing_required": result.dropped_missing_required,
+        "file_mb": round(csv_path.stat().st_size / 1e6, 2),
+        "load_and_clean_s": round(load_seconds, 4),
+        "load_peak_mb": round(peak / 1e6, 2),
+        "build_ranking_s": round(ranking_seconds, 4),
+        "top_n_by_genre": time_queries(
+            lambda g, k: top_n_by_genre(df, g, n=k), genres, queries, n
+        ),
+        "top_n_by_genre_ranked": time_queries(
+            lambda g, k: top_n_by_genre(df, g, n=k, ranking=ranking), genres, queries, n
+        ),
+    }
+
+
+def compare(current: dict[str, Any], baseline: dict[str, Any]) -> list[str]:
+    """Return human-readable ratios (current / baseline) for matching catalog sizes."""
+    lines = []
+    base_runs = {run["rows"]: run for run in baseline.get("runs", [])}
+    for run in current["runs"]:
+        base = base_runs.get(run["rows"])
+        if base is None:
+            continue
+        pairs = [
+            ("load_and_clean_s", run["load_and_clean_s"], base["load_and_clean_s"]),
+            ("load_peak_mb", run["load_peak_mb"], base["load_peak_mb"]),
+            (
+                "top_n_by_genre p50",
+                run["top_n_by_genre"]["p50_ms"],
+                base["top_n_by_genre"]["p50_ms"],
+            ),
+        ]
+        for name, now, then in pairs:
+            ratio = now / then if then else float("inf")
+            lines.append(f"rows={run['rows']:>10} {name:<20} {then:>10} -> {now:<10} ({ratio:.2f}x)")
+    return lines
+
+
+def _positive_int(text: str) -> int:
+    value = int(text)
+    if value < 1:
+        raise argparse.ArgumentTypeError(f"must be at least 1; got {value}")
+    return value
+
+
+def parse_args(argv: list[str] | None = None) -> argparse.Namespace:
+    """Parse CLI arguments for the benchmark."""
+    parser = argparse.ArgumentParser(description="Benchmark the movie recommender")
+    parser.add_argument(
+        "--rows",
+        type=_positive_int,
+        nargs="+",
+        default=[100_000],
+        help="Catalog sizes to benchmark (default: 100000)",
+    )
+    parser.add_argument("--queries", type=_positive_int, default=500, help="Queries per catalog (default: 500)")
+    parser.add_argument("--limit", type=int, default=5, help="n for top_n_by_genre (default: 5)")
+    parser.add_argument(
+        "--catalog-dir",
+        type=Path,
+        default=None,
+        help="Directory to keep/reuse generated catalogs (default: temporary)",
+    )
+    parser.add_argument("--output", type=Path, default=Path("bench.json"), help="JSON results path")
+    parser.add_argument("--baseline", type=Path, default=None, help="Previous JSON results to compare against")
+    return parser.parse_args(argv)
+
+
+def main(argv: list[str] | None = None) -> int:
+    """Entrypoint for the benchmark; returns a process exit code."""
+    args = parse_args(argv)
+    # Read before running: the baseline is often the file this run overwrites
+    baseline = None
+    if args.baseline:
+        try:
+            baseline = json.loads(args.baseline.read_text(encoding="utf-8"))
+        except (OSError, ValueError) as exc:
+            print(f"Error: could not read baseline: {exc}")
+            return 2
+
+    with tempfile.TemporaryDirectory() as tmp:
+        catalog_dir = args.catalog_dir or Path(tmp)
+        runs = []
+        for rows in args.rows:
+            csv_path = catalog_dir / f"movies_{rows}.csv"
+            if not csv_path.exists():
+                print(f"Generating {rows} rows -> {csv_path}")
+                generate_catalog(csv_path, rows)
+            run = {"rows": rows, **benchmark_catalog(csv_path, args.queries, args.limit)}
+            runs.append(run)
+            print(
+                f"rows={rows}: load {run['load_and_clean_s']}s, peak {run['load_peak_mb']} MB, "
+                f"query p50 {run['top_n_by_genre']['p50_ms']} ms "
+                f"(ranked {run['top_n_by_genre_ranked']['p50_ms']} ms)"
+            )
+
+    results = {
+        "created_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "git_revision": _git_revision(),
+        "python": platform.python_version(),
+        "pandas": pd.__version__,
+        "runs": runs,
+    }
+    args.output.write_text(json.dumps(results, indent=2) + "\n", encoding="utf-8")
+    print(f"Results written to {args.output}")
+
+    if baseline is not None:
+        for line in compare(results, baseline):
+            print(line)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
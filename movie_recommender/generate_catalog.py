@@ -0,0 +1,162 @@
+"""Synthetic movie catalog generator.
+
+Writes CSVs with the same schema as movies.csv at arbitrary scale (1e5–1e7
+rows), with skewed genre/language distributions and a configurable share of
+dirty rows that `MovieDataIO` must drop or normalize.
+
+Usage:
+    python generate_catalog.py --rows 1000000 --output movies_1m.csv
+"""
+
+from __future__ import annotations
+
+import argparse
+from pathlib import Path
+import sys
+
+import numpy as np
+import pandas as pd
+
+
+# Relative weights roughly follow the genre mix of large public catalogs.
+GENRE_WEIGHTS = {
+    "Drama": 22, "Comedy": 16, "Thriller": 8, "Action": 8, "Romance": 7,
+    "Documentary": 7, "Horror": 6, "Crime": 5, "Adventure": 4, "Family": 3,
+    "Animation": 3, "Sci-Fi": 3, "Mystery": 2, "Fantasy": 2, "Biography": 1,
+    "Historical": 1, "Musical": 1, "War": 1, "Western": 1, "Sport": 1, "Noir": 0.5,
+}
+LANGUAGE_WEIGHTS = {
+    "English": 55, "French": 6, "Spanish": 6, "Hindi": 5, "Japanese": 4,
+    "German": 4, "Italian": 3, "Korean": 3, "Mandarin": 3, "Telugu": 2,
+    "Tamil": 2, "Portuguese": 2, "Russian": 2, "Turkish": 1, "Hungarian": 1, "Swedish": 1,
+}
+TITLE_HEADS = [
+    "Myth", "Voyage", "Empire", "Song", "Flame", "Shadow", "Echo", "Return",
+    "Legend", "Secret", "Night", "Garden", "Storm", "Heart", "Road", "House",
+    "Ghost", "River", "Crown", "Winter",
+]
+TITLE_PLACES = [
+    "Caldera", "Solace", "Ravenna", "Nerida", "Kandara", "Avalon", "Marrow",
+    "Sable", "Orinoco", "Veridia", "Halcyon", "Ashford", "Lumen", "Tessaly",
+    "Brightwater", "Corvin", "Ember", "Quill", "Vesper", "Zarith",
+]
+FIRST_NAMES = [
+    "Elena", "Jonas", "Hiro", "Aisha", "Marco", "Priya", "Lena", "Omar",
+    "Sofia", "Kenji", "Amara", "Diego", "Ingrid", "Ravi", "Chloe", "Tariq",
+]
+LAST_NAMES = [
+    "Garcia", "Gupta", "Kim", "Khan", "Rossi", "Novak", "Silva", "Mensah",
+    "Tanaka", "Larsen", "Okafor", "Dubois", "Moreau", "Singh", "Costa", "Haddad",
+]
+COLUMNS = ["title", "genre", "rating", "year_release", "language", "director"]
+
+
+def _weighted_choice(rng: np.random.Generator, weights: dict[str, float], size: int) -> np.ndarray:
+    names = np.array(list(weights), dtype=object)
+    probs = np.array(list(weights.values()), dtype=float)
+    return names[rng.choice(len(names), size=size, p=probs / probs.sum())]
+
+
+def _pick(rng: np.random.Generator, words: list[str], size: int) -> np.ndarray:
+    return np.array(words, dtype=object)[rng.integers(0, len(words), size)]
+
+
+def generate_chunk(
+    rng: np.random.Generator,
+    size: int,
+    start_id: int,
+    dirty_fraction: float = 0.02,
+    votes: bool = False,
+) -> pd.DataFrame:
+    """Generate `size` rows; roughly `dirty_fraction` of them are malformed."""
+    serial = np.arange(start_id, start_id + size).astype(str).astype(object)
+    titles = _pick(rng, TITLE_HEADS, size) + " of " + _pick(rng, TITLE_PLACES, size) + " " + serial
+    # Ratings cluster around 6.5 like real user scores.
+    ratings = np.clip(rng.normal(6.5, 1.4, size), 0.0, 10.0).round(1)
+    years = rng.integers(1920, 2025, size)
+
+    df = pd.DataFrame(
+        {
+            "title": titles,
+            "genre": _weighted_choice(rng, GENRE_WEIGHTS, size),
+            "rating": ratings.astype(str).astype(object),
+            "year_release": years.astype(str).astype(object),
+            "language": _weighted_choice(rng, LANGUAGE_WEIGHTS, size),
+            "director": _pick(rng, FIRST_NAMES, size) + " " + _pick(rng, LAST_NAMES, size),
+        }
+    )
+    if votes:
+        df["votes"] = np.floor(rng.lognormal(5.0, 2.0, size)).astype(np.int64)
+
+    dirty = np.flatnonzero(rng.random(size) < dirty_fraction)
+    if len(dirty):
+        kinds = rng.integers(0, 5, len(dirty))
+        df.loc[dirty[kinds == 0], "rating"] = "n/a"  # non-numeric rating (dropped)
+        df.loc[dirty[kinds == 1], "year_release"] = ""  # missing year (dropped)
+        df.loc[dirty[kinds == 2], "title"] = "   "  # blank title after trim (dropped)
+        padded = dirty[kinds == 3]  # stray whitespace (kept after trim)
+        df.loc[padded, "genre"] = "  " + df.loc[padded, "genre"] + " "
+        shouted = dirty[kinds == 4]  # genre case variants (kept after normalization)
+        df.loc[shouted, "genre"] = df.loc[shouted, "genre"].str.upper()
+    return df
+
+
+def generate_catalog(
+    path: Path,
+    rows: int,
+    dirty_fraction: float = 0.02,
+    seed: int = 0,
+    chunk_rows: int = 500_000,
+    votes: bool = False,
+) -> int:
+    """Write a synthetic catalog of `rows` data rows to `path` in chunks; return rows written."""
+    if rows < 1:
+        raise ValueError(f"rows must be at least 1; got {rows}.")
+    rng = np.random.default_rng(seed)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    written = 0
+    with path.open("w", encoding="utf-8", newline="") as handle:
+        while written < rows:
+            size = min(chunk_rows, rows - written)
+            chunk = generate_chunk(rng, size, written, dirty_fraction, votes)
+            chunk.to_csv(handle, header=written == 0, index=False)
+            written += size
+    return written
+
+
+def parse_args(argv: list[str] | None = None) -> argparse.Namespace:
+    """Parse CLI arguments for the generator."""
+    parser = argparse.ArgumentParser(description="Generate a synthetic movies CSV")
+    parser.add_argument("--rows", type=int, default=100_000, help="Data rows to write (default: 100000)")
+    parser.add_argument("--output", type=Path, default=Path("movies_generated.csv"), help="Output CSV path")
+    parser.add_argument(
+        "--dirty-fraction",
+        type=float,
+        default=0.02,
+        help="Share of malformed rows (default: 0.02)",
+    )
+    parser.add_argument("--seed", type=int, default=0, help="Random seed (default: 0)")
+    parser.add_argument(
+        "--votes",
+        action="store_true",
+        help="Also write an optional 'votes' column for the weighted rating",
+    )
+    return parser.parse_args(argv)
+
+
+def main(argv: list[str] | None = None) -> int:
+    """Entrypoint for the generator; returns a process exit code."""
+    args = parse_args(argv)
+    try:
+        written = generate_catalog(
+            args.output, args.rows, args.dirty_fraction, args.seed, votes=args.votes
+        )
+    except (OSError, ValueError) as exc:
+        print(f"Error: {exc}")
+        return 2
+    print(f"Wrote {written} rows to {args.output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
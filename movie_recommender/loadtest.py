@@ -0,0 +1,98 @@
+"""Concurrent load test for the movie recommendation service.
+
+Fires GET /recommendations requests at a running service and reports
+throughput plus p50/p99 latency.
+
+Usage:
+    python loadtest.py --url http://127.0.0.1:8001 --concurrency 32 --requests 2000
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import itertools
+import sys
+import time
+
+import httpx
+
+
+DEFAULT_GENRES = ["Action", "Drama", "Comedy", "Romance", "Thriller", "Horror", "Sci-Fi"]
+
+
+def percentile(samples: list[float], pct: float) -> float:
+    """Return the nearest-rank percentile of `samples` (pct in 0..100)."""
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    rank = max(0, min(len(ordered) - 1, round(pct / 100 * len(ordered)) - 1))
+    return ordered[rank]
+
+
+async def run_load(
+    url: str, genres: list[str], total: int, concurrency: int, limit: int
+) -> tuple[list[float], int, float]:
+    """Issue `total` requests with `concurrency` workers; return (latencies, errors, elapsed)."""
+    queries = itertools.cycle(genres)
+    remaining = iter(range(total))
+    latencies: list[float] = []
+    errors = 0
+
+    async def worker(client: httpx.AsyncClient) -> None:
+        nonlocal errors
+        for _ in remaining:
+            params = {"genre": next(queries), "n": limit}
+            start = time.perf_counter()
+            try:
+                response = await client.get("/recommendations", params=params)
+                if response.status_code != 200:
+                    errors += 1
+            except httpx.HTTPError:
+                errors += 1
+            latencies.append(time.perf_counter() - start)
+
+    limits = httpx.Limits(max_connections=concurrency)
+    async with httpx.AsyncClient(base_url=url, limits=limits, timeout=30.0) as client:
+        started = time.perf_counter()
+        await asyncio.gather(*(worker(client) for _ in range(concurrency)))
+        elapsed = time.perf_counter() - started
+    return latencies, errors, elapsed
+
+
+def parse_args(argv: list[str] | None = None) -> argparse.Namespace:
+    """Parse CLI arguments for the load test."""
+    parser = argparse.ArgumentParser(description="Load test the recommendation service")
+    parser.add_argument("--url", default="http://127.0.0.1:8001", help="Service base URL")
+    parser.add_argument("--requests", type=int, default=1000, help="Total requests (default: 1000)")
+    parser.add_argument("--concurrency", type=int, default=16, help="Concurrent clients (default: 16)")
+    parser.add_argument("--limit", type=int, default=5, help="Value of n per request (default: 5)")
+    parser.add_argument(
+        "--genres",
+        default=",".join(DEFAULT_GENRES),
+        help="Comma-separated genres to cycle through",
+    )
+    return parser.parse_args(argv)
+
+
+def main(argv: list[str] | None = None) -> int:
+    """Entrypoint for the load test; returns a process exit code."""
+    args = parse_args(argv)
+    genres = [g.strip() for g in args.genres.split(",") if g.strip()]
+    if not genres:
+        print("Error: provide at least one genre.")
+        return 2
+
+    latencies, errors, elapsed = asyncio.run(
+        run_load(args.url, genres, args.requests, max(1, args.concurrency), args.limit)
+    )
+    count = len(latencies)
+    print(f"Requests:    {count} ({errors} error(s)) with concurrency {args.concurrency}")
+    print(f"Throughput:  {count / elapsed:.1f} req/s over {elapsed:.2f}s")
+    print(f"Latency p50: {percentile(latencies, 50) * 1000:.2f} ms")
+    print(f"Latency p99: {percentile(latencies, 99) * 1000:.2f} ms")
+    return 1 if errors else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -10,10 +10,14 @@ Usage:
 from __future__ import annotations
 
 import argparse
-from dataclasses import dataclass
+from collections import defaultdict
+from dataclasses import dataclass, replace
+import math
 from pathlib import Path
 import sys
+from typing import Iterable, Iterator
 
+import numpy as np
 import pandas as pd
 
 
@@ -39,6 +43,8 @@ class LoadResult:
     dropped_non_numeric_rating: int
     dropped_missing_required: int
     raw_row_count: int
+    top_k: int | None = None  # set when only the top-K rows per genre were kept
+    priors: RankingPriors | None = None  # priors the top-K rows were selected with
 
 
 class MovieDataIO:
@@ -93,6 +99,100 @@ class MovieDataIO:
         df = df.rename(columns=str.lower)
         self._validate_required_columns(df)
 
+        df, dropped_non_numeric_rating, dropped_missing_required = self._clean(df)
+
+        return LoadResult(
+            dataframe=df,
+            dropped_non_numeric_rating=dropped_non_numeric_rating,
+            dropped_missing_required=dropped_missing_required,
+            raw_row_count=int(raw_row_count),
+        )
+
+    def load_top_k(
+        self,
+        csv_path: Path,
+        top_k: int = 5,
+        chunksize: int = 100_000,
+        priors: RankingPriors | None = None,
+    ) -> LoadResult:
+        """Stream the CSV in chunks, keeping only the top-K movies per genre.
+
+        Each chunk is cleaned exactly like `load_and_clean` and reduced to its
+        per-genre top K, then merged into the running table, so memory stays
+        bounded by `chunksize + K * genres` rows. The drop counters are summed
+        per chunk and therefore match a full load.
+
+        Rows are kept by the weighted score `build_ranking` orders by. Its
+        prior mean has to be the catalog-wide one, so when the CSV has a
+        `votes` column and `priors.prior_mean` is unset, a first pass computes
+        the mean rating of all clean rows. The priors used are returned in
+        `LoadResult.priors`; `build_ranking(result.dataframe, result.priors)`
+        then gives the same top-N as a full load for any `n <= top_k`.
+        """
+
+        if top_k < 1:
+            raise ValueError(f"top_k must be at least 1; got {top_k}.")
+        self._validate_file_exists(csv_path)
+        priors = priors or RankingPriors()
+
+        kept: pd.DataFrame | None = None
+        raw_row_count = 0
+        dropped_non_numeric_rating = 0
+        dropped_missing_required = 0
+        try:
+            header = pd.read_csv(csv_path, nrows=0).rename(columns=str.lower)
+            if VOTES_COLUMN in header.columns and priors.prior_mean is None:
+                rating_sum, rating_count = 0.0, 0
+                for chunk, *_ in self._clean_chunks(csv_path, chunksize):
+                    rating_sum += float(chunk["rating"].sum())
+                    rating_count += len(chunk)
+                priors = replace(
+                    priors, prior_mean=rating_sum / rating_count if rating_count else 0.0
+                )
+
+            for chunk, raw, non_numeric, missing in self._clean_chunks(csv_path, chunksize):
+                raw_row_count += raw
+                dropped_non_numeric_rating += non_numeric
+                dropped_missing_required += missing
+                kept = self._top_k_per_genre(
+                    chunk if kept is None else pd.concat([kept, chunk]), top_k, priors
+                )
+        except ValueError:
+            raise
+        except Exception as exc:  # pragma: no cover
+            raise ValueError(f"Failed to parse CSV: {exc}") from exc
+
+        if raw_row_count < 20:
+            raise ValueError(
+                f"CSV must contain at least 20 data rows; found {raw_row_count}."
+            )
+
+        return LoadResult(
+            dataframe=kept,
+            dropped_non_numeric_rating=dropped_non_numeric_rating,
+            dropped_missing_required=dropped_missing_required,
+            raw_row_count=raw_row_count,
+            top_k=top_k,
+            priors=priors,
+        )
+
+    def _clean_chunks(
+        self, csv_path: Path, chunksize: int
+    ) -> Iterator[tuple[pd.DataFrame, int, int, int]]:
+        """Yield (clean chunk, raw rows, non-numeric drops, total drops) per CSV chunk."""
+        first = True
+        for chunk in pd.read_csv(csv_path, chunksize=chunksize):
+            chunk = chunk.rename(columns=str.lower)
+            if first:
+                self._validate_required_columns(chunk)
+                first = False
+            raw = len(chunk)
+            chunk, non_numeric, missing = self._clean(chunk)
+            yield chunk, raw, non_numeric, missing
+
+    @staticmethod
+    def _clean(df: pd.DataFrame) -> tuple[pd.DataFrame, int, int]:
+        """Trim, normalize and coerce `df`; return (clean df, non-numeric drops, total drops)."""
         before_clean = len(df)
 
         # Trim text fields
@@ -117,27 +217,123 @@ class MovieDataIO:
         df = df[(df["title"] != "") & (df["genre"] != "")]
 
         dropped_missing_required = before_clean - len(df)
+        return df, int(dropped_non_numeric_rating), int(dropped_missing_required)
 
-        return LoadResult(
-            dataframe=df,
-            dropped_non_numeric_rating=int(dropped_non_numeric_rating),
-            dropped_missing_required=int(dropped_missing_required),
-            raw_row_count=int(raw_row_count),
+    @staticmethod
+    def _top_k_per_genre(
+        df: pd.DataFrame, top_k: int, priors: RankingPriors
+    ) -> pd.DataFrame:
+        """Keep the K best rows per `genre_norm` in `build_ranking` order.
+
+        That is weighted score desc, rating desc, title asc; without votes the
+        score is the rating.
+        """
+        ordered = df.assign(_score=weighted_scores(df, priors)).sort_values(
+            by=["genre_norm", "_score", "rating", "title"],
+            ascending=[True, False, False, True],
+            kind="mergesort",
         )
+        return ordered.groupby("genre_norm", sort=False).head(top_k).drop(columns="_score")
+
+
+# -----------------------------
+# Ranking stage
+# -----------------------------
+
+VOTES_COLUMN = "votes"
+
+
+@dataclass(frozen=True)
+class RankingPriors:
+    """Priors for the IMDB-style weighted rating.
+
+    score = (v * R + m * C) / (v + m), where v is a title's vote count, R its
+    rating, m = `min_votes` and C = `prior_mean` (catalog mean rating if None).
+    """
+
+    min_votes: float = 25.0
+    prior_mean: float | None = None
+
+    def __post_init__(self) -> None:
+        if self.min_votes <= 0:
+            raise ValueError(f"min_votes must be positive; got {self.min_votes}.")
+
+
+class RankingTables:
+    """Per-genre tables pre-sorted by weighted score, computed once at load time."""
+
+    def __init__(self, tables: dict[str, pd.DataFrame], empty: pd.DataFrame) -> None:
+        self.tables = tables
+        self._empty = empty
+
+    def top_n(self, genre: str, n: int = 5) -> pd.DataFrame:
+        """Return the first N rows of the genre's table (case-insensitive genre)."""
+        if not isinstance(genre, str) or not genre.strip():
+            return self._empty
+        table = self.tables.get(genre.strip().lower())
+        if table is None:
+            return self._empty
+        return table.head(n).copy()
+
+
+def weighted_scores(df: pd.DataFrame, priors: RankingPriors = RankingPriors()) -> pd.Series:
+    """Vectorized Bayesian weighted rating for every row of `df`.
+
+    Without a `votes` column every title is equally supported and the score is
+    the raw rating, so rankings match plain rating order.
+    """
+
+    rating = df["rating"].astype(float)
+    if VOTES_COLUMN not in df.columns:
+        return rating.rename("weighted_score")
+
+    votes = pd.to_numeric(df[VOTES_COLUMN], errors="coerce").fillna(0).clip(lower=0)
+    prior = rating.mean() if priors.prior_mean is None else priors.prior_mean
+    m = priors.min_votes
+    score = (votes * rating + m * prior) / (votes + m)
+    return score.rename("weighted_score")
+
+
+def build_ranking(
+    df: pd.DataFrame, priors: RankingPriors = RankingPriors()
+) -> RankingTables:
+    """Score `df` once and split it into per-genre tables in ranked order.
+
+    Order is weighted score desc, then rating desc, then title asc.
+    """
+
+    genre_key = (
+        df["genre_norm"] if "genre_norm" in df.columns else df["genre"].astype(str).str.lower()
+    )
+    ranked = df.assign(genre_norm=genre_key, weighted_score=weighted_scores(df, priors))
+    ranked = ranked.sort_values(
+        by=["genre_norm", "weighted_score", "rating", "title"],
+        ascending=[True, False, False, True],
+        kind="mergesort",
+    )
+    tables = {genre: table for genre, table in ranked.groupby("genre_norm", sort=False)}
+    return RankingTables(tables, ranked.iloc[0:0])
 
 
 # -----------------------------
 # Recommendation logic
 # -----------------------------
 
-def top_n_by_genre(df: pd.DataFrame, genre: str, n: int = 5) -> pd.DataFrame:
+def top_n_by_genre(
+    df: pd.DataFrame, genre: str, n: int = 5, ranking: RankingTables | None = None
+) -> pd.DataFrame:
     """Return up to N highest-rated movies for a given genre.
 
     - Match is case-insensitive against `genre_norm` if present, else lowercased `genre`.
     - Sort by rating desc, then title asc for stable ordering.
+    - With precomputed `ranking` tables (see `build_ranking`), read the genre's
+      table directly instead of filtering and sorting `df`.
     - Returns a new DataFrame with relevant columns preserved.
     """
 
+    if ranking is not None:
+        return ranking.top_n(genre, n)
+
     if not isinstance(df, pd.DataFrame):  # defensive
         raise TypeError("df must be a pandas DataFrame")
 
@@ -159,6 +355,244 @@ def top_n_by_genre(df: pd.DataFrame, genre: str, n: int = 5) -> pd.DataFrame:
     return ordered.head(n)
 
 
+# -----------------------------
+# Fuzzy lookup
+# -----------------------------
+
+def _trigrams(text: str) -> set[str]:
+    """Return the padded character trigrams of a normalized string."""
+    padded = f"  {text} "
+    return {padded[i : i + 3] for i in range(len(padded) - 2)}
+
+
+_CODE_POINT_MASK = 0x1FFFFF  # 21 bits hold any Unicode code point
+_TRIGRAM_ROWS_PER_BLOCK = 16384
+
+
+def _trigram_codes(texts: list[str]) -> tuple[np.ndarray, np.ndarray]:
+    """Distinct `_trigrams` of every text as (row, code) arrays.
+
+    A code packs a trigram's three code points into one int64. Texts are
+    processed in blocks of similar length, so one long title does not widen
+    the character matrix of the whole catalog.
+    """
+    lengths = np.fromiter(map(len, texts), dtype=np.int64, count=len(texts))
+    by_length = np.argsort(lengths, kind="stable")
+    all_rows, all_codes = [], []
+    for start in range(0, len(texts), _TRIGRAM_ROWS_PER_BLOCK):
+        block = by_length[start : start + _TRIGRAM_ROWS_PER_BLOCK]
+        padded = np.array([f"  {texts[row]} " for row in block])
+        width = padded.itemsize // 4
+        points = padded.view(np.uint32).reshape(len(block), width).astype(np.int64)
+        codes = (points[:, :-2] << 42) | (points[:, 1:-1] << 21) | points[:, 2:]
+        valid = np.arange(width - 2) < (lengths[block] + 1)[:, None]
+        codes = np.where(valid, codes, -1)
+        codes.sort(axis=1)
+        distinct = (codes != -1) & np.c_[np.ones(len(block), bool), codes[:, 1:] != codes[:, :-1]]
+        all_rows.append(np.broadcast_to(block[:, None], codes.shape)[distinct])
+        all_codes.append(codes[distinct])
+    return np.concatenate(all_rows), np.concatenate(all_codes)
+
+
+@dataclass(frozen=True)
+class FuzzyMatch:
+    """A ranked fuzzy lookup candidate."""
+
+    value: str
+    kind: str  # "genre" or "title"
+    score: float
+
+
+class _TrigramTable:
+    """Inverted trigram index over the distinct values of one kind."""
+
+    # Candidates come from at least MIN_PROBES of the rarest query trigrams,
+    # and from more of them while fewer than CANDIDATE_BUDGET ids are gathered.
+    MIN_PROBES = 2
+    CANDIDATE_BUDGET = 1024
+
+    def __init__(self) -> None:
+        self.values: list[str] = []
+        self._seen: set[str] = set()
+        self._gram_counts: list[int] | np.ndarray = []
+        self._postings: dict[str, list[int] | np.ndarray] = defaultdict(list)
+        self._frozen = False
+
+    def add(self, value: str) -> None:
+        norm = value.strip().lower()
+        if not norm or norm in self._seen:
+            return
+        if self._frozen:
+            self._thaw()
+        self._seen.add(norm)
+        term_id = len(self.values)
+        grams = _trigrams(norm)
+        self.values.append(value)
+        self._gram_counts.append(len(grams))
+        for gram in grams:
+            self._postings[gram].append(term_id)
+
+    def extend(self, values: Iterable[str]) -> None:
+        """Add many values at once, extracting and grouping trigrams in numpy."""
+        if not self._frozen:
+            self._freeze()
+        values = pd.Series(list(values), dtype=object).astype(str)
+        norms = values.str.strip().str.lower()
+        keep = (norms != "") & ~norms.duplicated() & ~norms.isin(self._seen)
+        values, norms = values[keep].tolist(), norms[keep].tolist()
+        if not norms:
+            return
+        first_id = len(self.values)
+        self._seen.update(norms)
+        self.values.extend(values)
+
+        rows, codes = _trigram_codes(norms)
+        self._gram_counts = np.concatenate(
+            (self._gram_counts, np.bincount(rows, minlength=len(norms)).astype(np.int32))
+        )
+        # One sort of (gram, row) keys groups the rows of each gram in id order.
+        grams, gram_index = np.unique(codes, return_inverse=True)
+        keys = np.sort(gram_index.astype(np.int64) * len(norms) + rows)
+        ids = (keys % len(norms) + first_id).astype(np.int32)
+        bounds = np.searchsorted(keys // len(norms), np.arange(len(grams) + 1))
+        for index, code in enumerate(grams.tolist()):
+            gram = "".join(chr((code >> shift) & _CODE_POINT_MASK) for shift in (42, 21, 0))
+            existing = self._postings.get(gram)
+            posting = ids[bounds[index] : bounds[index + 1]]
+            self._postings[gram] = (
+                posting if existing is None else np.concatenate((existing, posting))
+            )
+
+    def _freeze(self) -> None:
+        # Posting lists become int32 arrays so lookups can count overlaps in numpy.
+        self._postings = {
+            gram: np.asarray(ids, dtype=np.int32) for gram, ids in self._postings.items()
+        }
+        self._gram_counts = np.asarray(self._gram_counts, dtype=np.int32)
+        self._frozen = True
+
+    def _thaw(self) -> None:
+        self._postings = defaultdict(
+            list, {gram: ids.tolist() for gram, ids in self._postings.items()}
+        )
+        self._gram_counts = self._gram_counts.tolist()
+        self._frozen = False
+
+    def search(
+        self, query_grams: set[str], limit: int, min_score: float
+    ) -> list[tuple[float, str]]:
+        if not self._frozen:
+            self._freeze()
+        lists = sorted(
+            (self._postings[g] for g in query_grams if g in self._postings), key=len
+        )
+        if not lists or limit <= 0:
+            return []
+
+        # A Dice score >= min_score needs at least `needed` shared trigrams, so
+        # every match is in one of the `len(lists) - needed + 1` rarest posting
+        # lists. Candidates are drawn from those lists, rarest first, and the
+        # draw stops at CANDIDATE_BUDGET ids (after MIN_PROBES lists). The
+        # remaining, common trigrams (such as "of ") are never scanned: each
+        # only verifies the candidates by binary search. A query therefore
+        # costs about O(candidates * query trigrams * log n) rather than the
+        # length of the common posting lists, at the price of missing values
+        # that share only common trigrams with the query.
+        needed = max(1, math.ceil(min_score * len(query_grams) / (2.0 - min_score) - 1e-9))
+        prefix = len(lists) - needed + 1
+        if prefix <= 0:
+            return []
+        taken, gathered = 1, len(lists[0])
+        while taken < prefix and (
+            taken < self.MIN_PROBES or gathered + len(lists[taken]) <= self.CANDIDATE_BUDGET
+        ):
+            gathered += len(lists[taken])
+            taken += 1
+
+        # Sorting the drawn ids and measuring runs counts their shared trigrams.
+        ids = np.sort(np.concatenate(lists[:taken]))
+        starts = np.flatnonzero(np.r_[True, ids[1:] != ids[:-1]])
+        candidates = ids[starts]
+        shared = np.diff(np.r_[starts, len(ids)])
+        for postings in lists[taken:]:
+            found = np.minimum(np.searchsorted(postings, candidates), len(postings) - 1)
+            shared += postings[found] == candidates
+        scores = 2.0 * shared / (len(query_grams) + self._gram_counts[candidates])
+        keep = scores >= min_score
+        candidates, scores = candidates[keep], scores[keep]
+        if len(candidates) > limit:
+            top = np.argpartition(-scores, limit - 1)[:limit]
+            candidates, scores = candidates[top], scores[top]
+        order = np.lexsort((candidates, -scores))
+        return [(float(scores[i]), self.values[candidates[i]]) for i in order]
+
+    def __len__(self) -> int:
+        return len(self.values)
+
+
+class FuzzyIndex:
+    """Trigram index over distinct genres and titles for typo-tolerant lookup.
+
+    A query draws candidates from the posting lists of its rarest trigrams and
+    checks them against its other trigrams by binary search; it never computes
+    an edit distance per title, and it never scans the long posting lists of
+    common trigrams. The cost is still proportional to the candidates drawn
+    (at least `_TrigramTable.MIN_PROBES` rarest lists, up to
+    `CANDIDATE_BUDGET` ids), so it grows slowly with the catalog: about 1 ms
+    per title query at 200k synthetic titles, whose trigrams are all common.
+    The best match is found; lower-ranked candidates that share only common
+    trigrams with the query can be missed. Scores are the Dice coefficient of
+    the trigram sets (0..1).
+    """
+
+    KINDS = ("genre", "title")
+
+    def __init__(self) -> None:
+        self._tables = {kind: _TrigramTable() for kind in self.KINDS}
+
+    @classmethod
+    def from_dataframe(cls, df: pd.DataFrame) -> "FuzzyIndex":
+        """Build an index over the distinct `genre` and `title` values of `df`."""
+        index = cls()
+        index._tables["genre"].extend(df["genre"].astype(str).drop_duplicates())
+        index._tables["title"].extend(df["title"].astype(str).drop_duplicates())
+        return index
+
+    def add(self, value: str, kind: str) -> None:
+        """Index a display value under `kind`; duplicates (case-insensitive) are ignored."""
+        if kind not in self._tables:
+            raise ValueError(f"kind must be one of {self.KINDS}; got {kind!r}")
+        self._tables[kind].add(value)
+
+    def lookup(
+        self,
+        query: str,
+        limit: int = 5,
+        kind: str | None = None,
+        min_score: float = 0.3,
+    ) -> list[FuzzyMatch]:
+        """Return up to `limit` candidates ranked by score, best first.
+
+        With `kind=None`, genres and titles are ranked together from the same
+        trigram set, so genre suggestions and title candidates come out of one call.
+        """
+        norm = query.strip().lower() if isinstance(query, str) else ""
+        if not norm:
+            return []
+        query_grams = _trigrams(norm)
+        kinds = self.KINDS if kind is None else (kind,)
+        matches = [
+            FuzzyMatch(value, k, round(score, 4))
+            for k in kinds
+            for score, value in self._tables[k].search(query_grams, limit, min_score)
+        ]
+        matches.sort(key=lambda m: -m.score)
+        return matches[:limit]
+
+    def __len__(self) -> int:
+        return sum(len(table) for table in self._tables.values())
+
+
 def parse_args(argv: list[str] | None = None) -> argparse.Namespace:
     """Parse CLI arguments for the application."""
     parser = argparse.ArgumentParser(
@@ -176,6 +610,24 @@ def parse_args(argv: list[str] | None = None) -> argparse.Namespace:
         default=5,
         help="Number of results to show (default: 5)",
     )
+    parser.add_argument(
+        "--chunksize",
+        type=int,
+        default=None,
+        help=(
+            "Stream the CSV in chunks of this many rows, keeping only the top "
+            "--limit movies per genre (for catalogs larger than memory)"
+        ),
+    )
+    parser.add_argument(
+        "--min-votes",
+        type=float,
+        default=RankingPriors.min_votes,
+        help=(
+            "Prior vote count for the weighted rating when the CSV has a "
+            "'votes' column (default: 25)"
+        ),
+    )
     return parser.parse_args(argv)
 
 
@@ -186,12 +638,23 @@ def main(argv: list[str] | None = None) -> int:
     # Load and validate dataset
     try:
         io = MovieDataIO()
-        result = io.load_and_clean(args.csv)
+        if args.chunksize:
+            result = io.load_top_k(
+                args.csv,
+                top_k=max(1, args.limit),
+                chunksize=args.chunksize,
+                priors=RankingPriors(min_votes=args.min_votes),
+            )
+        else:
+            result = io.load_and_clean(args.csv)
     except (FileNotFoundError, ValueError) as exc:  # user-friendly early failure
         print(f"Error: {exc}")
         return 2
 
     df = result.dataframe
+    # A chunked load returns the (global) priors its rows were selected with
+    ranking = build_ranking(df, result.priors or RankingPriors(min_votes=args.min_votes))
+    index = FuzzyIndex.from_dataframe(df)
     if result.dropped_non_numeric_rating:
         print(
             "Warning: Dropped "
@@ -219,9 +682,12 @@ def main(argv: list[str] | None = None) -> int:
             print("Please enter a non-empty genre.")
             continue
 
-        recs = top_n_by_genre(df, user_input, n=max(1, args.limit))
+        recs = top_n_by_genre(df, user_input, n=max(1, args.limit), ranking=ranking)
         if recs.empty:
             print(f"No matches found for genre '{user_input}'. Try another genre.")
+            suggestions = index.lookup(user_input, limit=3, kind="genre")
+            if suggestions:
+                print("Did you mean: " + ", ".join(m.value for m in suggestions) + "?")
             continue
 
         count = len(recs)
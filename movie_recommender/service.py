@@ -0,0 +1,281 @@
+"""Movie Recommendation HTTP service.
+
+- Serves `top_n_by_genre` over a small async FastAPI app.
+- The catalog is loaded once at startup and hot-reloaded when the CSV changes.
+- Responses are kept in an LRU cache keyed on (normalized genre, n) and carry
+  strong ETags so clients can revalidate with `If-None-Match`.
+
+Usage:
+    MOVIES_CSV=movies.csv uvicorn service:app --port 8001
+"""
+
+from __future__ import annotations
+
+import asyncio
+from collections import OrderedDict
+from contextlib import asynccontextmanager, suppress
+from dataclasses import dataclass
+import hashlib
+import json
+import os
+from pathlib import Path
+from typing import Any
+
+from fastapi import FastAPI, Query, Request, Response
+
+from movie_recommender import (
+    FuzzyIndex,
+    MovieDataIO,
+    RankingPriors,
+    build_ranking,
+    top_n_by_genre,
+)
+
+
+DEFAULT_CSV = Path(__file__).with_name("movies.csv")
+MAX_LIMIT = 100
+RESULT_COLUMNS = ("title", "genre", "rating", "year_release", "language", "director")
+
+
+# -----------------------------
+# Response cache
+# -----------------------------
+
+class ResponseCache:
+    """Bounded LRU mapping of (normalized genre, n) to (body, etag)."""
+
+    def __init__(self, maxsize: int = 256) -> None:
+        self.maxsize = maxsize
+        self._entries: OrderedDict[tuple[str, int], tuple[bytes, str]] = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: tuple[str, int]) -> tuple[bytes, str] | None:
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return entry
+
+    def put(self, key: tuple[str, int], entry: tuple[bytes, str]) -> None:
+        self._entries[key] = entry
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+# -----------------------------
+# Catalog state
+# -----------------------------
+
+@dataclass(frozen=True)
+class CatalogSnapshot:
+    """Everything derived from one version of the CSV, built off the event loop."""
+
+    dataframe: Any
+    ranking: Any
+    index: FuzzyIndex
+    signature: tuple[int, int]
+
+
+class Catalog:
+    """Holds the cleaned catalog and reloads it when the CSV changes on disk."""
+
+    def __init__(
+        self, csv_path: Path, cache: ResponseCache, priors: RankingPriors = RankingPriors()
+    ) -> None:
+        self.csv_path = csv_path
+        self.cache = cache
+        self.priors = priors
+        self.dataframe = None
+        self.ranking = None
+        self.index = FuzzyIndex()
+        self.version = 0
+        self._signature: tuple[int, int] | None = None
+        self._lock = asyncio.Lock()
+
+    def _stat_signature(self) -> tuple[int, int]:
+        stat = self.csv_path.stat()
+        return (stat.st_mtime_ns, stat.st_size)
+
+    def build(self) -> CatalogSnapshot:
+        """Load the CSV and build its ranking and index without touching `self`.
+
+        Safe to run in a worker thread; `install` the result on the event loop.
+        """
+        signature = self._stat_signature()
+        result = MovieDataIO().load_and_clean(self.csv_path)
+        return CatalogSnapshot(
+            dataframe=result.dataframe,
+            ranking=build_ranking(result.dataframe, self.priors),
+            index=FuzzyIndex.from_dataframe(result.dataframe),
+            signature=signature,
+        )
+
+    def install(self, snapshot: CatalogSnapshot) -> None:
+        """Swap in a built catalog and reset the response cache in one step.
+
+        Runs on the event loop with no await, so no request sees a mix of old
+        and new fields or caches an old body under the new version.
+        """
+        self.dataframe = snapshot.dataframe
+        self.ranking = snapshot.ranking
+        self.index = snapshot.index
+        self._signature = snapshot.signature
+        self.version += 1
+        self.cache.clear()
+
+    async def reload_if_changed(self) -> bool:
+        """Reload the catalog off the event loop if the file changed; return True if reloaded."""
+        async with self._lock:
+            try:
+                signature = self._stat_signature()
+            except FileNotFoundError:
+                return False
+            if signature == self._signature:
+                return False
+            try:
+                snapshot = await asyncio.to_thread(self.build)
+            except (FileNotFoundError, ValueError):
+                # Keep serving the last good catalog if the new file is invalid.
+                self._signature = signature
+                return False
+            self.install(snapshot)
+            return True
+
+
+def _normalize_genre(genre: str) -> str:
+    return genre.strip().lower()
+
+
+def _row_to_dict(row: Any) -> dict[str, Any]:
+    record = {}
+    for col in RESULT_COLUMNS:
+        value = getattr(row, col, None)
+        if col == "rating":
+            value = float(value)
+        elif col == "year_release":
+            value = int(value)
+        record[col] = value
+    return record
+
+
+def render_recommendations(catalog: Catalog, genre: str, n: int) -> tuple[bytes, str]:
+    """Build the JSON body and strong ETag for a lookup, using the LRU cache."""
+    key = (_normalize_genre(genre), n)
+    cached = catalog.cache.get(key)
+    if cached is not None:
+        return cached
+
+    recs = top_n_by_genre(catalog.dataframe, genre, n=n, ranking=catalog.ranking)
+    payload = {
+        "genre": key[0],
+        "limit": n,
+        "count": len(recs),
+        "results": [_row_to_dict(row) for row in recs.itertuples(index=False)],
+    }
+    if recs.empty:
+        payload["suggestions"] = [
+            m.value for m in catalog.index.lookup(genre, limit=3, kind="genre")
+        ]
+    body = json.dumps(payload, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+    digest = hashlib.sha1(body).hexdigest()[:16]
+    entry = (body, f'"{catalog.version}-{digest}"')
+    catalog.cache.put(key, entry)
+    return entry
+
+
+def _etag_matches(if_none_match: str | None, etag: str) -> bool:
+    if not if_none_match:
+        return False
+    candidates = {tag.strip() for tag in if_none_match.split(",")}
+    return "*" in candidates or etag in candidates
+
+
+# -----------------------------
+# Application
+# -----------------------------
+
+def create_app(
+    csv_path: Path | None = None,
+    cache_size: int = 256,
+    poll_interval: float = 2.0,
+) -> FastAPI:
+    """Create the service app; the catalog is loaded during lifespan startup."""
+    csv_path = Path(csv_path or os.environ.get("MOVIES_CSV", DEFAULT_CSV))
+    catalog = Catalog(csv_path, ResponseCache(cache_size))
+
+    async def watch_catalog() -> None:
+        while True:
+            await asyncio.sleep(poll_interval)
+            await catalog.reload_if_changed()
+
+    @asynccontextmanager
+    async def lifespan(_app: FastAPI):
+        catalog.install(await asyncio.to_thread(catalog.build))
+        watcher = asyncio.create_task(watch_catalog()) if poll_interval > 0 else None
+        try:
+            yield
+        finally:
+            if watcher is not None:
+                watcher.cancel()
+                with suppress(asyncio.CancelledError):
+                    await watcher
+
+    app = FastAPI(title="Movie Recommender API", lifespan=lifespan)
+    app.state.catalog = catalog
+
+    @app.get("/recommendations")
+    async def recommendations(
+        request: Request,
+        genre: str = Query(..., min_length=1),
+        n: int = Query(5, ge=1, le=MAX_LIMIT),
+    ) -> Response:
+        """Return up to N highest-rated movies for a genre."""
+        body, etag = render_recommendations(catalog, genre, n)
+        headers = {"ETag": etag, "Cache-Control": "no-cache"}
+        if _etag_matches(request.headers.get("if-none-match"), etag):
+            return Response(status_code=304, headers=headers)
+        return Response(content=body, media_type="application/json", headers=headers)
+
+    @app.get("/suggest")
+    async def suggest(
+        q: str = Query(..., min_length=1),
+        n: int = Query(5, ge=1, le=MAX_LIMIT),
+        kind: str | None = Query(None, pattern="^(genre|title)$"),
+    ) -> dict[str, Any]:
+        """Return typo-tolerant genre/title candidates for a (partial) query."""
+        matches = catalog.index.lookup(q, limit=n, kind=kind)
+        return {
+            "query": q,
+            "results": [
+                {"value": m.value, "kind": m.kind, "score": m.score} for m in matches
+            ],
+        }
+
+    @app.get("/health")
+    async def health() -> dict[str, Any]:
+        """Report catalog version, size and cache counters."""
+        return {
+            "status": "ok",
+            "catalog_version": catalog.version,
+            "rows": 0 if catalog.dataframe is None else len(catalog.dataframe),
+            "cache": {
+                "size": len(catalog.cache),
+                "hits": catalog.cache.hits,
+                "misses": catalog.cache.misses,
+            },
+        }
+
+    return app
+
+
+app = create_app()
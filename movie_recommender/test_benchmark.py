@@ -0,0 +1,51 @@
+import json
+from pathlib import Path
+
+import pandas as pd
+import pytest
+
+from benchmark import main as benchmark_main
+from generate_catalog import generate_catalog
+from movie_recommender import MovieDataIO
+
+
+def test_generate_catalog_schema_and_dirty_rows(tmp_path: Path):
+    """Generated catalogs keep the movies.csv schema and include droppable rows."""
+    path = tmp_path / "movies.csv"
+    written = generate_catalog(path, 2_000, dirty_fraction=0.1, seed=1, chunk_rows=700)
+    raw = pd.read_csv(path)
+    assert written == len(raw) == 2_000
+    assert list(raw.columns) == ["title", "genre", "rating", "year_release", "language", "director"]
+
+    result = MovieDataIO().load_and_clean(path)
+    assert result.dropped_non_numeric_rating > 0
+    assert 0 < result.dropped_missing_required < 400
+    assert result.dataframe["genre_norm"].str.strip().eq(result.dataframe["genre_norm"]).all()
+
+
+def test_benchmark_writes_json(tmp_path: Path, capsys):
+    """A tiny benchmark run writes comparable JSON results."""
+    output = tmp_path / "bench.json"
+    argv = ["--rows", "500", "--queries", "20", "--catalog-dir", str(tmp_path), "--output", str(output)]
+    assert benchmark_main(argv) == 0
+    run = json.loads(output.read_text())["runs"][0]
+    assert run["raw_rows"] == 500
+    assert run["top_n_by_genre"]["p50_ms"] >= 0
+
+    # Documented usage: the baseline is the file this run overwrites
+    baseline = json.loads(output.read_text())
+    baseline["runs"][0]["load_and_clean_s"] = 1234.5
+    output.write_text(json.dumps(baseline))
+    capsys.readouterr()
+    assert benchmark_main(argv + ["--baseline", str(output)]) == 0
+    assert "1234.5 ->" in capsys.readouterr().out
+    assert json.loads(output.read_text())["runs"][0]["load_and_clean_s"] != 1234.5
+
+
+def test_benchmark_rejects_zero_queries(tmp_path: Path, capsys):
+    """A query count below one is a usage error, not a crash after loading."""
+    with pytest.raises(SystemExit) as excinfo:
+        benchmark_main(["--rows", "500", "--queries", "0", "--output", str(tmp_path / "bench.json")])
+    assert excinfo.value.code == 2
+    assert "--queries: must be at least 1" in capsys.readouterr().err
+    assert not (tmp_path / "bench.json").exists()
@@ -3,7 +3,13 @@ from pathlib import Path
 import pandas as pd
 import pytest
 
-from movie_recommender import MovieDataIO, top_n_by_genre
+from movie_recommender import (
+    FuzzyIndex,
+    MovieDataIO,
+    RankingPriors,
+    build_ranking,
+    top_n_by_genre,
+)
 
 
 def write_csv(tmp_path: Path, rows):
@@ -91,3 +97,130 @@ def test_top_n_no_matches():
     )
     res = top_n_by_genre(df, "Comedy", n=3)
     assert res.empty
+
+
+def test_fuzzy_index_ranks_misspelled_genre():
+    """A misspelled genre resolves to the closest indexed genre first."""
+    df = pd.DataFrame(
+        [
+            {"title": "A", "genre": "Drama", "rating": 9.0},
+            {"title": "B", "genre": "Documentary", "rating": 8.0},
+            {"title": "C", "genre": "Action", "rating": 7.0},
+        ]
+    )
+    index = FuzzyIndex.from_dataframe(df)
+    matches = index.lookup("drmaa", kind="genre")
+    assert matches[0].value == "Drama"
+    assert all(m.kind == "genre" for m in matches)
+
+
+def test_fuzzy_index_matches_titles_and_skips_unrelated():
+    """Title lookups tolerate typos and unrelated queries return nothing."""
+    df = pd.DataFrame(
+        [
+            {"title": "Voyage of Solace", "genre": "Drama", "rating": 8.2},
+            {"title": "Empire of Nerida", "genre": "Action", "rating": 3.3},
+        ]
+    )
+    index = FuzzyIndex.from_dataframe(df)
+    assert index.lookup("voyag of solace", kind="title")[0].value == "Voyage of Solace"
+    assert index.lookup("zzzz") == []
+
+
+def test_fuzzy_index_bulk_build_matches_incremental_adds():
+    """from_dataframe's numpy build ranks exactly like values added one by one."""
+    titles = [f"{head} of {place} {i}" for i, (head, place) in enumerate(
+        [("Voyage", "Solace"), ("Empire", "Nerida"), ("Night", "Sable")] * 40
+    )] + ["Amélie", "AMÉLIE", "  ", "Zoë 東京物語"]
+    df = pd.DataFrame({"title": titles, "genre": ["Drama"] * len(titles), "rating": 5.0})
+    bulk = FuzzyIndex.from_dataframe(df)
+    incremental = FuzzyIndex()
+    incremental.add("Drama", "genre")
+    for title in titles:
+        incremental.add(title, "title")
+    assert len(bulk) == len(incremental)
+    for query in ("voyag of solace 3", "night of sable", "amelie", "東京", "drma"):
+        assert bulk.lookup(query) == incremental.lookup(query)
+    assert bulk.lookup("empir of nerida 7", kind="title")[0].value == "Empire of Nerida 7"
+
+
+def test_load_top_k_matches_full_load_across_chunks(tmp_path: Path):
+    """Chunked top-K loading keeps exact drop counters and identical top-N answers."""
+    rows = [
+        f"Movie{i},{'Action' if i % 2 else 'Drama'},{(i * 7) % 10}.5,2001,English,Dir{i}"
+        for i in range(60)
+    ]
+    rows[3] = "BadRating,Action,n/a,2019,English,Someone"
+    rows[10] = "NoYear,Drama,8.0,,English,Someone"
+    rows[41] = "BadBoth,Drama,oops,,English,Someone"
+    path = write_csv(tmp_path, rows)
+    io = MovieDataIO()
+
+    full = io.load_and_clean(path)
+    streamed = io.load_top_k(path, top_k=3, chunksize=7)
+
+    assert streamed.raw_row_count == full.raw_row_count == 60
+    assert streamed.dropped_non_numeric_rating == full.dropped_non_numeric_rating == 2
+    assert streamed.dropped_missing_required == full.dropped_missing_required == 3
+    assert len(streamed.dataframe) == 6
+    for genre in ("Action", "Drama"):
+        expected = top_n_by_genre(full.dataframe, genre, n=3)
+        actual = top_n_by_genre(streamed.dataframe, genre, n=3)
+        assert list(actual["title"]) == list(expected["title"])
+
+
+def test_ranking_tables_match_rating_order_without_votes():
+    """Without a votes column, precomputed tables reproduce rating desc, title asc."""
+    df = pd.DataFrame(
+        [
+            {"title": "B", "genre": "Action", "genre_norm": "action", "rating": 8.5},
+            {"title": "A", "genre": "Action", "genre_norm": "action", "rating": 8.5},
+            {"title": "C", "genre": "Drama", "genre_norm": "drama", "rating": 9.9},
+            {"title": "D", "genre": "Action", "genre_norm": "action", "rating": 9.0},
+        ]
+    )
+    ranking = build_ranking(df)
+    res = top_n_by_genre(df, " ACTION ", n=3, ranking=ranking)
+    assert list(res["title"]) == list(top_n_by_genre(df, "Action", n=3)["title"])
+    assert top_n_by_genre(df, "Comedy", ranking=ranking).empty
+
+
+def test_weighted_rating_demotes_poorly_supported_titles():
+    """A perfect score from a handful of votes ranks below a well-supported 8.8."""
+    df = pd.DataFrame(
+        [
+            {"title": "Cult", "genre": "Drama", "rating": 10.0, "votes": 3},
+            {"title": "Classic", "genre": "Drama", "rating": 8.8, "votes": 5000},
+            {"title": "Flop", "genre": "Drama", "rating": 4.0, "votes": 900},
+        ]
+    )
+    ranking = build_ranking(df, RankingPriors(min_votes=100, prior_mean=6.0))
+    res = top_n_by_genre(df, "drama", n=3, ranking=ranking)
+    assert list(res["title"]) == ["Classic", "Cult", "Flop"]
+    assert res.iloc[1]["weighted_score"] < 7.0
+
+
+def test_load_top_k_with_votes_matches_full_ranking(tmp_path: Path):
+    """With votes, chunked loading keeps the weighted top-K under the catalog-wide prior."""
+    path = tmp_path / "movies.csv"
+    lines = ["title,genre,rating,year_release,language,director,votes"]
+    for i in range(80):
+        genre = "Action" if i % 2 else "Drama"
+        # High raw ratings with few votes are interleaved with solid, popular titles
+        rating, votes = (9.5 + (i % 5) / 10, 2 + i % 3) if i % 4 == 0 else ((i * 7) % 40 / 10 + 5, 500 + i)
+        lines.append(f"Movie{i},{genre},{rating},2001,English,Dir{i},{votes}")
+    path.write_text("\n".join(lines) + "\n", encoding="utf-8")
+    io = MovieDataIO()
+    priors = RankingPriors(min_votes=50)
+
+    full_df = io.load_and_clean(path).dataframe
+    full = build_ranking(full_df, priors)
+    streamed = io.load_top_k(path, top_k=3, chunksize=9, priors=priors)
+    chunked = build_ranking(streamed.dataframe, streamed.priors)
+
+    assert streamed.priors.prior_mean == pytest.approx(full_df["rating"].mean())
+    for genre in ("Action", "Drama"):
+        expected = list(full.top_n(genre, 3)["title"])
+        assert list(chunked.top_n(genre, 3)["title"]) == expected
+        # Raw-rating selection would have kept the poorly supported 9.x titles
+        assert expected != list(top_n_by_genre(full_df, genre, n=3)["title"])
@@ -0,0 +1,85 @@
+import os
+from pathlib import Path
+
+from fastapi.testclient import TestClient
+
+from service import create_app
+from test_movie_recommender import gen_rows, write_csv
+
+
+def make_client(tmp_path: Path, rows=None):
+    """Create a service client over a temporary catalog (no background polling)."""
+    path = write_csv(tmp_path, rows or list(gen_rows(25)))
+    app = create_app(path, cache_size=4, poll_interval=0)
+    return app, path
+
+
+def test_recommendations_returns_top_n(tmp_path: Path):
+    """The endpoint returns ranked results for a case-insensitive genre."""
+    app, _ = make_client(tmp_path)
+    with TestClient(app) as client:
+        response = client.get("/recommendations", params={"genre": " action ", "n": 3})
+    assert response.status_code == 200
+    data = response.json()
+    assert data["count"] == 3
+    assert [r["rating"] for r in data["results"]] == [9.0, 9.0, 9.0]
+
+
+def test_repeat_lookup_hits_cache_and_honours_etag(tmp_path: Path):
+    """Normalized repeat queries share a cache entry and revalidate with 304."""
+    app, _ = make_client(tmp_path)
+    with TestClient(app) as client:
+        first = client.get("/recommendations", params={"genre": "Action", "n": 2})
+        second = client.get(
+            "/recommendations",
+            params={"genre": "ACTION", "n": 2},
+            headers={"If-None-Match": first.headers["etag"]},
+        )
+    assert second.status_code == 304
+    cache = app.state.catalog.cache
+    assert (cache.hits, cache.misses) == (1, 1)
+
+
+def test_catalog_hot_reloads_when_csv_changes(tmp_path: Path):
+    """Rewriting the CSV bumps the catalog version and invalidates the cache."""
+    app, path = make_client(tmp_path)
+    catalog = app.state.catalog
+    with TestClient(app) as client:
+        before = client.get("/recommendations", params={"genre": "Action"}).headers["etag"]
+        rows = list(gen_rows(25)) + ["Fresh,Action,9.9,2020,English,Someone"]
+        write_csv(tmp_path, rows)
+        stat = path.stat()
+        os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000))
+        assert client.portal.call(catalog.reload_if_changed)
+        after = client.get("/recommendations", params={"genre": "Action"})
+    assert after.headers["etag"] != before
+    assert after.json()["results"][0]["title"] == "Fresh"
+
+
+def test_reload_builds_off_the_catalog_and_swaps_in_one_step(tmp_path: Path):
+    """Building a new catalog leaves the served one and its cache alone until install."""
+    app, path = make_client(tmp_path)
+    catalog = app.state.catalog
+    with TestClient(app) as client:
+        before = client.get("/recommendations", params={"genre": "Action"})
+        write_csv(tmp_path, list(gen_rows(25)) + ["Fresh,Action,9.9,2020,English,Someone"])
+        snapshot = catalog.build()
+        assert catalog.version == 1 and len(catalog.cache) == 1
+        assert client.get("/recommendations", params={"genre": "Action"}).content == before.content
+
+        client.portal.call(catalog.install, snapshot)
+        assert catalog.version == 2 and len(catalog.cache) == 0
+        after = client.get("/recommendations", params={"genre": "Action"})
+    assert after.json()["results"][0]["title"] == "Fresh"
+    assert after.headers["etag"].startswith('"2-')
+
+
+def test_unknown_genre_includes_suggestions(tmp_path: Path):
+    """An empty result carries fuzzy genre suggestions; /suggest ranks titles too."""
+    app, _ = make_client(tmp_path)
+    with TestClient(app) as client:
+        data = client.get("/recommendations", params={"genre": "Acton"}).json()
+        suggest = client.get("/suggest", params={"q": "Title1", "kind": "title"}).json()
+    assert data["count"] == 0
+    assert data["suggestions"] == ["Action"]
+    assert suggest["results"][0]["value"] == "Title1"